@@ -1,11 +1,17 @@
+import math
+import time
 from abc import ABC, abstractmethod
-from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
+from decimal import Decimal, ROUND_HALF_UP, ROUND_HALF_EVEN, InvalidOperation, DivisionByZero, Overflow, Context, localcontext
 from app.logger import logger
-from app.config import CALCULATOR_MAX_INPUT_VALUE, CALCULATOR_PRECISION
+from app.config import CALCULATOR_MAX_INPUT_VALUE, CALCULATOR_PRECISION, CALCULATOR_MAX_RESULT_DIGITS
 from app.exceptions import ValidationError, OperationError
+from app.math_functions import nth_root, newton_root_digits, NEWTON_ROOT_MAX_DIGITS, integer_power, integer_power_digits, estimate_power_digits
+from app import math_functions
 from colorama import init, Fore, Style
 init(autoreset=True) 
 from app.input_validators import validate_nonzero, validate_nonnegative
+from app.operation_registry import registry
+from app.result_cache import shared_cache
 from app.logger import logger
 
 
@@ -14,9 +20,29 @@ from app.logger import logger
 # ABS class as template for calculation classes
 # ------------------------------------------------------------
 
+# significant digits reserved for the integer part of a result, on top of CALCULATOR_PRECISION decimals
+INTEGER_DIGITS = 28
+
+
+# fresh decimal context for one calculation: results never depend on the calling thread's context
+def calculation_context(digits: int) -> Context:
+    return Context(
+        prec=CALCULATOR_PRECISION + digits,
+        rounding=ROUND_HALF_EVEN,
+        traps=[InvalidOperation, DivisionByZero, Overflow]
+    )
+
 class CalculationTemplate(ABC):
 
-    operations_allowed = ['Percentage', 'Multiplication', 'Modulo', 'Root', 'Absolute Difference', 'Integer Division', 'Power']
+    # set from the operation's registry metadata when it is created through app.operation_registry
+    symbol = None
+    validators = ()
+
+    # operands the operation takes; functions of one value (exp, sin, ...) ignore b
+    operands = 2
+
+    # results worth keeping in the persistent result cache (app/result_cache.py): costly operations only
+    cacheable = False
 
     @abstractmethod
     def runOperation(self, a: Decimal, b: Decimal) -> Decimal: # pragma: no cover
@@ -36,6 +62,8 @@ class CalculationTemplate(ABC):
 
     # Ensure both operands (a and b) are within the allowed numeric limits 
     def check_decimals(self, a: Decimal, b: Decimal) -> tuple[Decimal, Decimal]:
+        for validator in self.validators:
+            validator(a, b)
         if a > CALCULATOR_MAX_INPUT_VALUE or b > CALCULATOR_MAX_INPUT_VALUE:
             logger.error(f"❌ {e} wrong inputs, Inputs must be ≤ {CALCULATOR_MAX_INPUT_VALUE}")
             raise ValidationError(f"❌ Inputs must be ≤ {CALCULATOR_MAX_INPUT_VALUE}") # pragma: no cover
@@ -58,17 +86,59 @@ class CalculationTemplate(ABC):
             logger.exception("❌ Result formatting failed.")
             raise OperationError(f"❌ Error formatting result: {e}")
     
+    # estimated integer digits of the result; operations whose output can explode override this
+    def estimate_result_digits(self, a: Decimal, b: Decimal) -> int:
+        return INTEGER_DIGITS
+
+    # reject inputs whose result would exceed the digit budget, before any CPU is spent on them
+    def check_cost(self, a: Decimal, b: Decimal) -> int:
+        digits = self.estimate_result_digits(a, b)
+        if digits > CALCULATOR_MAX_RESULT_DIGITS:
+            logger.error(f"❌ {self.__class__.__name__} rejected: {a}, {b} would produce about {digits} digits (budget {CALCULATOR_MAX_RESULT_DIGITS})")
+            raise ValidationError(f"❌ Result would have about {digits} digits, more than the allowed {CALCULATOR_MAX_RESULT_DIGITS}")
+        return max(digits, INTEGER_DIGITS)
+
     def calculate(self, a: Decimal, b: Decimal) -> Decimal:
-        try:
+        result, a, b = self._run(a, b, cached=True)
+        logger.info("✅ %s performed: %s %s %s = %s", self.__class__.__name__, a, self._operator_symbol(), b, result)
+        return result
 
-            a, b = self.check_decimals(a, b)
-            result = self.runOperation(a, b)
+    # calculate without the log line and the result cache, for bulk callers (vector mode, sweeps)
+    # that log one summary instead and would pay a cache lookup per element
+    def evaluate(self, a: Decimal, b: Decimal) -> Decimal:
+        return self._run(a, b)[0]
 
-            if isinstance(result, Decimal):
-                result = self.format_result(result)
+    # key of the result in the result cache: the rounding of _round_result and of the calculation context
+    def cache_key(self, a: Decimal, b: Decimal) -> tuple:
+        return (f"{type(self).__module__}.{type(self).__qualname__}", str(a), str(b), CALCULATOR_PRECISION,
+                f"{ROUND_HALF_UP}/{ROUND_HALF_EVEN}")
 
-            logger.info(f"✅ {self.__class__.__name__} performed: {a} {self._operator_symbol()} {b} = {result}")
-            return result
+    # result plus the rounded operands; cached=True looks the result up in the result cache first
+    def _run(self, a: Decimal, b: Decimal, cached: bool = False) -> tuple[Decimal, Decimal, Decimal]:
+        # outside the try block so the ValidationError reaches the caller as is
+        digits = self.check_cost(a, b)
+
+        try:
+
+            # local context: the global 28 digit default cannot hold results at high CALCULATOR_PRECISION,
+            # and decimal contexts are per thread, so each calculation brings its own
+            with localcontext(calculation_context(digits)):
+                a, b = self.check_decimals(a, b)
+                cache = shared_cache() if cached and self.cacheable else None
+                if cache is not None:
+                    result = cache.get(self.cache_key(a, b))
+                    if result is not None:
+                        return result, a, b
+
+                started = time.perf_counter()
+                result = self.runOperation(a, b)
+
+                if isinstance(result, Decimal):
+                    result = self.format_result(result)
+                    if cache is not None:
+                        cache.put(self.cache_key(a, b), result, time.perf_counter() - started)
+
+            return result, a, b
         
         except Exception as e:
             logger.exception("❌ Unexpected error during calculation.")
@@ -76,19 +146,7 @@ class CalculationTemplate(ABC):
 
     def _operator_symbol(self) -> str:
         """Symbol for logging purposes."""
-        mapping = {
-            "Addition": "+",
-            "Subtraction": "-",
-            "Multiplication": "*",
-            "Division": "/",
-            "IntegerDivision": "//",
-            "Modulo": "%",
-            "Power": "**",
-            "Root": "root",
-            "Percentage": "%",
-            "Absdifference": "|a-b|"
-        }
-        return mapping.get(self.__class__.__name__, "?")
+        return self.symbol or registry.symbol_for(type(self))
 
 ##################################################################################################################
 ################## create the classes fopr the math calculations
@@ -156,9 +214,25 @@ class Absdifference(CalculationTemplate):
     
 class Power(CalculationTemplate):
 
-    #method to execute the subtraction calculation
+    cacheable = True
+
+    def estimate_result_digits(self, a: Decimal, b: Decimal) -> int:
+        try:
+            return estimate_power_digits(a, b)
+        except (InvalidOperation, TypeError, ValueError, OverflowError):
+            # not a usable number, let the calculation itself report the problem
+            return INTEGER_DIGITS
+
+    #method to execute the power calculation
     def runOperation(self, a: Decimal, b: Decimal) -> Decimal:
         try:
+            # integer exponents: exact exponentiation by squaring, correctly rounded, as long as the
+            # exact intermediate stays within the digit budget
+            if b == b.to_integral_value() and integer_power_digits(a, int(b), CALCULATOR_PRECISION) <= CALCULATOR_MAX_RESULT_DIGITS:
+                return integer_power(a, int(b), CALCULATOR_PRECISION)
+
+            # fractional exponents, and integer ones whose exact intermediate would be too large
+            # (1.0001 ** -1000000), use Decimal's power, bounded by the calculation context
             return a ** b
         except Exception as e:   # catch all exceptions
             logger.error(f"❌ Power calculation failed: {a}^{b}")
@@ -167,15 +241,22 @@ class Power(CalculationTemplate):
 
 class Root(CalculationTemplate):
 
+    cacheable = True
+
     def check_decimals(self, a: Decimal, b: Decimal):
       
         validate_nonnegative(a, "Radicand")
         validate_nonzero(b, "Degree of root")
         return super().check_decimals(a, b)
 
-    #method to execute the subtraction calculation
+    #method to execute the root calculation
     def runOperation(self, a: Decimal, b: Decimal) -> Decimal:
         try:
+            # integer degrees use the exact integer Newton root, correctly rounded to CALCULATOR_PRECISION
+            if b == b.to_integral_value() and newton_root_digits(a, int(b), CALCULATOR_PRECISION) <= NEWTON_ROOT_MAX_DIGITS:
+                return nth_root(a, int(b), CALCULATOR_PRECISION)
+
+            # fractional (or enormous) degrees fall back to the generic log/exp power
             return a ** (Decimal("1") / b)
         except InvalidOperation as e:
             logger.exception("❌ Root calculation failed.")
@@ -197,5 +278,68 @@ class Modulo(CalculationTemplate):
         return a%b
 
 
-    
+##################################################################################################################
+################## functions of one operand
+##################################################################################################################
+class UnaryCalculation(CalculationTemplate):
+    '''
+    Function of a single operand (exp, ln, sin, ...): b is optional and ignored, history entries
+    leave operand2 empty and the log reads "Exp performed: exp(2.0000) = 7.3891".
+    '''
+    operands = 1
+    cacheable = True
+
+    def calculate(self, a: Decimal, b: Decimal = None) -> Decimal:
+        result, a, _ = self._run(a, Decimal(0), cached=True)
+        logger.info("✅ %s performed: %s(%s) = %s", self.__class__.__name__, self._operator_symbol(), a, result)
+        return result
+
+    def evaluate(self, a: Decimal, b: Decimal = None) -> Decimal:
+        return self._run(a, Decimal(0))[0]
 
+
+class Exp(UnaryCalculation):
+
+    def estimate_result_digits(self, a: Decimal, b: Decimal) -> int:
+        try:
+            return max(math.ceil(float(a) * math.log10(math.e)), 0) + 1
+        except (TypeError, ValueError, OverflowError):
+            return INTEGER_DIGITS
+
+    def runOperation(self, a: Decimal, b: Decimal) -> Decimal:
+        return math_functions.exp(a, CALCULATOR_PRECISION)
+
+
+class NaturalLog(UnaryCalculation):
+
+    def check_decimals(self, a: Decimal, b: Decimal):
+        validate_nonnegative(a, "Logarithm argument")
+        validate_nonzero(a, "Logarithm argument")
+        return super().check_decimals(a, b)
+
+    def runOperation(self, a: Decimal, b: Decimal) -> Decimal:
+        return math_functions.ln(a, CALCULATOR_PRECISION)
+
+
+class Log10(NaturalLog):
+
+    def runOperation(self, a: Decimal, b: Decimal) -> Decimal:
+        return math_functions.log10(a, CALCULATOR_PRECISION)
+
+
+class Sine(UnaryCalculation):
+
+    def runOperation(self, a: Decimal, b: Decimal) -> Decimal:
+        return math_functions.sin(a, CALCULATOR_PRECISION)
+
+
+class Cosine(UnaryCalculation):
+
+    def runOperation(self, a: Decimal, b: Decimal) -> Decimal:
+        return math_functions.cos(a, CALCULATOR_PRECISION)
+
+
+class ArcTangent(UnaryCalculation):
+
+    def runOperation(self, a: Decimal, b: Decimal) -> Decimal:
+        return math_functions.atan(a, CALCULATOR_PRECISION)
@@ -1,23 +1,29 @@
 from app.command_factory import CommandFactory
+from app.operation_registry import registry, menu_order
 from decimal import Decimal, InvalidOperation
 from app.observers import LoggingObserver, Subject, AutosaveObserver
 from datetime import datetime
 from app.memento import Originator, CareTaker
+from app.history_view import HistoryView, HISTORY_CHUNK_SIZE, EXPORT_FORMATS, export_history
+from app.session_snapshot import encode_state, decode_state, write_snapshot, read_snapshot
 from app.logger import logger
 from app.exceptions import OperationError, ValidationError, CommandError, HistoryError
 from colorama import init, Fore, Style
 from app.logger import logger
 from dotenv import load_dotenv
 import os
+import re
+import threading
 import uuid
-import pandas as pd
 from app.config import (
     CALCULATOR_MAX_HISTORY_SIZE, 
     CALCULATOR_AUTO_SAVE, 
     CALCULATOR_DEFAULT_ENCODING,
     CALCULATOR_HISTORY_DIR,
     CSV_HISTORY_FILE,
-    TXT_HISTORY_FILE
+    TXT_HISTORY_FILE,
+    CALCULATOR_SESSION_FILE,
+    CALCULATOR_HISTORY_PAGE_SIZE
 )
 from app.exceptions import FileAccessError, DataFormatError, HistoryError
 from colorama import init, Fore, Style
@@ -25,27 +31,32 @@ init(autoreset=True)
 
 class Calculator:
 
-    # define operations library
-    operations_dictionary = {'A':['Percentage', 'Percentage'], 
-                        'B': ['Modulo', 'Modulo'], 
-                        'C': ['Multiplication', 'Multiplication'], 
-                        'D': ['Root', 'Root'],
-                        'E': ['Absolute Difference', 'AbsDiff'],
-                        'F': ['Integer Division', 'IntDiff'],
-                        'G': ['Addition', 'add'],
-                        'H': ['Subtraction', 'subtract'],
-                        'I': ['Division', 'div'],
-                        'J': ['Power', 'power'],
-                        'K': ['Display history', 'hist'],
+    # define commands library; calculations come from the operation registry (built-ins and plugins)
+    commands_dictionary = {'K': ['Display history', 'hist'],
                         'L': ['Clear history', 'clear'],
                         'M': ['Undo previous operations', 'undo'],
                         'N': ['Redo current operation', 'redo'],
                         'O': ['Save calculation history', 'save'],
                         'P': ['Load calculation history', 'load'],
-                        'Q': ['Exit the program', 'exit']}
+                        'Q': ['Exit the program', 'exit'],
+                        'R': ['Show undo/redo memory stats', 'stats'],
+                        'S': ['Undo to a step or time', 'undoto'],
+                        'T': ['Reduce a list of operands (sum, mean, ...)', 'reduce'],
+                        'U': ['Vector / matrix mode', 'vector'],
+                        'V': ['Sweep an operation over ranges into a CSV table', 'sweep'],
+                        'W': ['Show memory usage and top allocations', 'mem']}
+
+    # menu letter -> [label, code] of every operation and command, e.g. 'G': ['Addition', 'add']
+    operations_dictionary = dict(sorted({**registry.menu(), **commands_dictionary}.items(), key=lambda item: menu_order(item[0])))
     
     # --------------------- CLASS CONSTRUCTOR ---------------------------
-    def __init__(self):
+    def __init__(self, observers=None, instance_id=None, wal=None):
+        '''
+        observers: shared observers to attach instead of creating this instance's own
+        LoggingObserver/AutosaveObserver (used by SessionManager to pool persistence).
+        instance_id: reuse an existing id, e.g. when a spilled session is restored.
+        wal: WriteAheadLog journaling every history change; call recover() to replay it.
+        '''
 
         # initialize originator
         self.originator = Originator()
@@ -57,27 +68,37 @@ class Calculator:
         self.subject = Subject()
 
         #get instance ID
-        self.instance_ID =  str(uuid.uuid4())
+        self.instance_ID = instance_id or str(uuid.uuid4())
+
+        # journal of state changes for crash recovery
+        self.wal = wal
 
-        # initialzie observers
-        self.logging_observer = LoggingObserver()
-        self.autosave_observer = AutosaveObserver()
+        # single writer at a time for history, undo/redo and the journal; reentrant because
+        # record_calculation holds it while calling add_operation
+        self._lock = threading.RLock()
+
+        # initialzie observers, unless shared ones are provided
+        if observers is None:
+            self.logging_observer = LoggingObserver()
+            self.autosave_observer = AutosaveObserver()
+            observers = [self.logging_observer, self.autosave_observer]
 
         # Attach observers
-        self.subject.attach(self.logging_observer )
-        self.subject.attach(self.autosave_observer)
+        for observer in observers:
+            self.subject.attach(observer)
 
     @classmethod
     def show_commands(cls):
         """Return a formatted string of all available commands."""
-        return "\n".join([f"{key:<2}: {value[0]}" for key, value in cls.operations_dictionary.items()])
+        width = max(map(len, cls.operations_dictionary))
+        return "\n".join([f"{key:<{width}}: {value[0]}" for key, value in cls.operations_dictionary.items()])
 
     @classmethod
     def get_operation_code(cls, user_input: str):
         """Return the operation code (short name) for a given input letter."""
         if user_input in cls.operations_dictionary:
             op_code = cls.operations_dictionary[user_input][1]
-            logger.info(f"✅ Determined operation code '{op_code}' for command '{user_input}'")
+            logger.info("✅ Determined operation code '%s' for command '%s'", op_code, user_input)
             return op_code
         else:
             logger.warning(f"❌ Invalid operation key: {user_input}")
@@ -93,33 +114,255 @@ class Calculator:
         except Exception as e:
             raise OperationError(f"❌ Calculator.py#2 -  Failed to create operation: {e}")
 
+    # ----------------- Reductions -----------------
+    def create_reduction(self, op_code: str):
+        """
+        Creates a reduction (sum, product, mean, min, max, stddev or a batch-capable operation).
+        """
+        # imported on first use, like the operation implementations
+        from app.reductions import create_reduction
+        try:
+            return create_reduction(op_code)
+        except Exception as e:
+            raise OperationError(f"❌ Calculator.py#3 -  Failed to create reduction: {e}")
+
+    # reduce a stream of operands and record it as one history entry: "timestamp,Sum,n=<count>,,result,id"
+    def reduce(self, op_code: str, operands):
+        reduction = self.create_reduction(op_code)
+        result, count = reduction.reduce(operands)
+        entry = self.record_entry(reduction.name, f"n={count}", "", result)
+        return result, count, entry
+
+    # ----------------- Vector mode -----------------
+
+    # element-wise operation, matrix product or reduction over arrays, recorded as one summarized history entry
+    def vector(self, op_code: str, a, b=None, axis=None):
+        '''
+        op_code: an operation of the registry (applied element-wise, with broadcasting), "matmul",
+        or a reduction (sum, product, mean, min, max, stddev) over the whole array or along `axis`.
+        a, b: text such as "1 2 3" or "1 2; 3 4", or (nested) lists.
+        '''
+        # imported on first use, numpy is only needed here
+        from app import vector_mode
+        try:
+            name, a, b, result = vector_mode.run(op_code, a, b, axis)
+        except (ValidationError, OperationError):
+            raise
+        except Exception as e:
+            raise OperationError(f"❌ Calculator.py#4 -  Vector operation failed: {e}")
+
+        operand_b = "" if b is None else vector_mode.summarize(b)
+        if axis is not None and b is None:
+            operand_b = f"axis={axis}"
+        entry = self.record_entry(name, vector_mode.summarize(a), operand_b, vector_mode.summarize(result))
+        return result, entry
+
+    # ----------------- Sweeps -----------------
+
+    # table of one operation over ranges of both operands, streamed to CSV and recorded as one history entry
+    def sweep(self, op_code: str, a_spec: str, b_spec: str, path=None, workers=None):
+        '''
+        a_spec, b_spec: "start:stop:step", an explicit list "1 2 5" or a single value.
+        path: CSV file to write, by default sweep_<op_code>_<timestamp>.csv in CALCULATOR_HISTORY_DIR.
+        Returns (path, rows, errors, entry); points that fail are written with their error.
+        '''
+        # imported on first use, like the operation implementations
+        from app.sweep import run_sweep
+        kwargs = {} if workers is None else {"workers": workers}
+        try:
+            operation, a_range, b_range, path, rows, errors = run_sweep(op_code, a_spec, b_spec, path, **kwargs)
+        except (ValidationError, OperationError, HistoryError):
+            raise
+        except Exception as e:
+            raise OperationError(f"❌ Calculator.py#5 -  Sweep failed: {e}")
+
+        result = f"{rows} rows ({errors} errors) in {os.path.basename(path)}"
+        entry = self.record_entry(f"{operation.__class__.__name__}Sweep", a_range, b_range, result)
+        return path, rows, errors, entry
+
     # ----------------- History / Undo / Redo -----------------
 
     # Add new operation to history stack
     def add_operation(self, message: str):
-        self.caretaker.save_memento(self.originator.create_memento())
-        self.originator.add_operation(message)
-
-    # perform undo
-    def undo(self):
+        with self._lock:
+            self.caretaker.save_memento(self.originator.create_memento())
+            self.originator.add_operation(message)
+            self.caretaker.record_operation(message, self.originator)
+            self._journal("add", entry=message)
+
+    # build the history entry for a finished calculation, store it and notify observers
+    def record_calculation(self, operation_obj, operand_a, operand_b, result) -> str:
+        return self.record_entry(operation_obj.__class__.__name__, operand_a, operand_b, result)
+
+    def record_entry(self, operation_name, operand_a, operand_b, result) -> str:
+        # under the lock, so timestamps, history order and observer order always agree
+        with self._lock:
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            # functions of one operand leave operand2 empty
+            operand_b = "" if operand_b is None else operand_b
+            log_message = f"{timestamp},{operation_name},{operand_a},{operand_b},{result},{self.instance_ID}"
+
+            self.add_operation(log_message)
+            self.notify_observers(log_message)
+            return log_message
+
+    # perform undo; strict (server) raises HistoryError instead of printing that there is nothing to undo
+    def undo(self, strict=False):
         logger.info("⚠️ Undo requested by user")
-        return self.caretaker.undo_memento(self.originator)
-
-    # perform redo
-    def redo(self):
+        with self._lock:
+            changed = bool(self.caretaker.stack_undo)
+            if strict and not changed:
+                raise HistoryError("❌ No operation to undo")
+            undone_op = self.caretaker.undo_memento(self.originator)
+            if changed:
+                self._journal("undo")
+            return undone_op
+
+    # perform redo; strict (server) raises HistoryError instead of printing that there is nothing to redo
+    def redo(self, strict=False):
         logger.info("⚠️ Redo requested by user")
-        return self.caretaker.redo_memento(self.originator)
+        with self._lock:
+            changed = bool(self.caretaker.stack_redo)
+            if strict and not changed:
+                raise HistoryError("❌ No operation to redo")
+            redone_op = self.caretaker.redo_memento(self.originator)
+            if changed:
+                self._journal("redo")
+            return redone_op
+
+    # jump back to a step number or to the last calculation at or before a timestamp
+    def undo_to(self, target: str):
+        '''
+        target: a step number (0 = empty history, n = after the n-th calculation) or a
+        timestamp in the history format, "YYYY-MM-DD HH:MM:SS" (a prefix such as "YYYY-MM-DD HH:MM" works too)
+        '''
+        target = str(target).strip()
+        logger.info(f"⚠️ Undo to '{target}' requested by user")
+        if not target:
+            raise HistoryError("❌ Enter a step number or a timestamp to undo to")
+
+        if target.isdigit():
+            location = {"step": int(target)}
+        elif re.fullmatch(r"\d{4}-\d{2}-\d{2}( \d{2}(:\d{2}(:\d{2})?)?)?", target):
+            # a timestamp prefix stands for the end of that day/hour/minute
+            location = {"timestamp": target + "\uffff"}
+        else:
+            logger.warning(f"❌ Invalid undo target: {target}")
+            raise HistoryError(f"❌ '{target}' is neither a step number nor a YYYY-MM-DD HH:MM:SS timestamp")
+
+        with self._lock:
+            steps_back = self.caretaker.undo_to(self.originator, **location)
+            # journaled as a step count: step numbers restart whenever the log is compacted
+            self._journal("undo_to", steps=steps_back)
+            return steps_back
+
+    # show depth and memory footprint of the undo/redo stacks
+    def show_undo_stats(self):
+        with self._lock:
+            stats = self.caretaker.stats()
+        print(f"↩️ Undo: {stats['undo_depth']}/{stats['max_undo_depth'] or '∞'} states, "
+              f"{stats['undo_bytes']}/{stats['undo_memory_budget'] or '∞'} bytes")
+        print(f"↪️ Redo: {stats['redo_depth']} states, {stats['redo_bytes']} bytes")
+        print(f"🗑️ Evicted undo states: {stats['evicted']}")
+        logger.info(f"✅ Undo/redo stats displayed: {stats}")
+        return stats
+
+    # ----------------- Memory diagnostics -----------------
+
+    # bytes held by history, timeline, undo, redo, observer buffers and caches, see app/diagnostics.py
+    def memory_report(self) -> dict:
+        # imported on first use, like the operation implementations
+        from app.diagnostics import memory_report
+        with self._lock:
+            return memory_report(self)
+
+    def show_memory(self):
+        """Print the memory report, then the top allocations and the change since the last call if tracemalloc is tracing."""
+        from app.diagnostics import tracer, format_bytes
+        report = self.memory_report()
+        lines = [f"🧠 Memory held: {format_bytes(report['total'])}"]
+        for part in ("history", "timeline", "undo", "redo"):
+            lines.append(f"   {part:<16} {format_bytes(report[part])}")
+        for name, size in report["observers"].items():
+            lines.append(f"   {name:<16} {format_bytes(size)}")
+        for name, cache in report["caches"].items():
+            size = "" if cache["bytes"] is None else f", {format_bytes(cache['bytes'])}"
+            lines.append(f"   {name}: {cache['entries']} entries{size}")
+
+        if tracer.tracing:
+            tracer.snapshot()
+            lines.append("🔎 Top allocations:")
+            lines += [f"   {format_bytes(size):>10} {count:>7} blocks  {where}" for where, size, count in tracer.top()]
+            changes = tracer.diff()
+            if changes:
+                lines.append("📈 Changed since the previous snapshot:")
+                lines += [f"   {'+' if change > 0 else ''}{format_bytes(change):>10} (now {format_bytes(size)})  {where}" for where, change, size in changes]
+        print("\n".join(lines))
+        logger.info(f"✅ Memory report displayed: {report}")
+        return report
+
+    # consistent copy of the history, safe to use while other threads keep calculating
+    def history_snapshot(self) -> list:
+        with self._lock:
+            return list(self.originator.history)
+
+    # lazy window over the history, see app/history_view.py
+    def history_view(self, offset=0, limit=None, reverse=False, operation=None, contains=None, where=None):
+        """
+        offset/limit: entries skipped and returned; reverse: newest first;
+        operation: only entries of this operation (e.g. "Power"); contains: only entries with this text;
+        where: only entries for which where(entry) is true.
+        """
+        return HistoryView(self.originator, self._lock, offset=offset, limit=limit, reverse=reverse,
+                           operation=operation, contains=contains, where=where)
 
-    # show history
-    def show_history(self):
-        if not self.originator.history:
+    # show history, one page at a time
+    def show_history(self, page_size=CALCULATOR_HISTORY_PAGE_SIZE, **filters):
+        """
+        Prints the history page by page, each page in a single write; between pages Enter shows the
+        next one and q stops. page_size 0 prints everything without pausing. filters: see history_view.
+        """
+        pages = self.history_view(**filters).pages(page_size or HISTORY_CHUNK_SIZE)
+        page = next(pages, None)
+        if page is None:
             print(f"⚠️ {Fore.YELLOW} No history available.{Style.RESET_ALL}")
             logger.warning("Attempted to display history but it is empty")
+            return 0
+
+        shown = 0
+        while page:
+            print("\n".join(map(str, page)))
+            shown += len(page)
+            page = next(pages, None)
+            if page and page_size:
+                answer = input(f"{Fore.CYAN}-- {shown} entries shown, Enter for more, q to stop -- {Style.RESET_ALL}")
+                if answer.strip().lower() == "q":
+                    break
+
+        logger.info(f"✅ History displayed: {shown} entries")
+        return shown
+
+    # stream the history (or part of it) to a CSV or JSON lines file, without copying it first
+    def export_history(self, path=None, fmt="csv", **filters):
+        """
+        path: file to write, by default history_export_<timestamp>.<fmt> in CALCULATOR_HISTORY_DIR.
+        fmt: "csv" (the history CSV format) or "jsonl". filters: see history_view.
+        Returns (path, entries written).
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise CommandError(f"❌ Calculator.py#6 - Unknown export format '{fmt}', use one of {list(EXPORT_FORMATS)}")
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = path or os.path.join(CALCULATOR_HISTORY_DIR, f"history_export_{timestamp}.{fmt}")
+        try:
+            written, skipped = export_history(self.history_view(**filters), path, fmt)
+        except OSError as e:
+            logger.error(f"❌ Failed to export history to {path}: {e}")
+            raise FileAccessError(f"❌ Failed to export history: {e}") from e
 
-        for op in self.originator.history:
-            print(op)
-
-        logger.info("✅ History displayed")
+        for entry in skipped:
+            logger.warning(f"❌ Skipping unproperly formatted entry: {entry}")
+        logger.info(f"✅ Exported {written} history entries to {path}")
+        return path, written
 
     # delete all history
     def delete_history(self):
@@ -146,7 +389,9 @@ class Calculator:
             if user_input in ("Y", "YES"):
 
                 # Delete history
-                self.caretaker.delete_saved_history(self.originator)
+                with self._lock:
+                    self.caretaker.delete_saved_history(self.originator)
+                    self._journal("clear")
                 logger.info("✅ User confirmed and deleted both in-memory and saved history.")
                 break
 
@@ -170,17 +415,126 @@ class Calculator:
     def notify_observers(self, final_message: str): # pragma: no cover
         self.subject.notify(final_message)
 
+    # ----------------- Write-ahead log -----------------
+
+    # append a state change to the write-ahead log, compacting it into a snapshot when it gets long
+    def _journal(self, op, **fields):
+        if self.wal is None:
+            return
+        self.wal.append(op, **fields)
+        if self.wal.needs_compaction():
+            self.wal.compact(encode_state(self.caretaker.export_state(self.originator)))
+
+    # apply one write-ahead log record to the history, without journaling it again
+    def _replay(self, record):
+        op = record.get("op")
+        if op == "add":
+            self.caretaker.save_memento(self.originator.create_memento())
+            self.originator.add_operation(record["entry"])
+            self.caretaker.record_operation(record["entry"], self.originator)
+        elif op == "undo":
+            self.caretaker.undo_memento(self.originator)
+        elif op == "redo":
+            self.caretaker.redo_memento(self.originator)
+        elif op == "undo_to":
+            for _ in range(record["steps"]):
+                self.caretaker.undo_memento(self.originator)
+        elif op == "clear":
+            self.originator.history.clear()
+            self.caretaker.stack_undo.clear()
+            self.caretaker.stack_redo.clear()
+            self.caretaker.timeline.reset()
+        elif op == "load":
+            self.caretaker.stack_undo.clear()
+            self.caretaker.stack_redo.clear()
+            self.originator.history.clear()
+            self.caretaker.timeline.reset()
+            for entry in record["entries"]:
+                self.originator.add_operation(entry, caretaker=self.caretaker)
+        elif op == "snapshot":
+            self.caretaker.import_state(self.originator, decode_state(record["state"]))
+        else:
+            raise DataFormatError(f"❌ Unknown write-ahead log record: {record}")
+
+    # rebuild history and undo/redo stacks left by a run that did not exit cleanly
+    def recover(self) -> int:
+        if self.wal is None:
+            return 0
+
+        with self._lock:
+            records = self.wal.read()
+            if not records:
+                return 0
+
+            try:
+                for record in records:
+                    self._replay(record)
+            except (KeyError, TypeError, AttributeError) as e:
+                logger.error(f"❌ Failed to replay write-ahead log: {e}")
+                raise DataFormatError(f"❌ Failed to replay write-ahead log: {e}") from e
+
+            # start this run from one snapshot of the recovered state
+            self.wal.compact(encode_state(self.caretaker.export_state(self.originator)))
+        logger.info(f"✅ Recovered {len(self.originator.history)} history entries from {len(records)} write-ahead log records")
+        return len(records)
+
+    # ----------------- Session resume -----------------
+
+    def _session_path(self, path=None):
+        return os.path.join(CALCULATOR_HISTORY_DIR, path or CALCULATOR_SESSION_FILE)
+
+    # write history and undo/redo to a session snapshot, for the next run to resume from
+    def save_session(self, path=None) -> bool:
+        with self._lock:
+            path = self._session_path(path)
+            state = self.caretaker.export_state(self.originator)
+            if not state["history"] and not state["undo"] and not state["redo"]:
+                # nothing to resume: do not leave an old session behind either
+                if os.path.exists(path):
+                    os.remove(path)
+                return False
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            write_snapshot(path, state)
+            logger.info(f"✅ Session saved to {path}: {len(state['history'])} entries, {len(state['undo'])} undo, {len(state['redo'])} redo")
+            return True
+
+    # continue where the previous run stopped; the snapshot is consumed, the write-ahead log takes over
+    def restore_session(self, path=None) -> bool:
+        with self._lock:
+            path = self._session_path(path)
+            if not os.path.exists(path):
+                return False
+            state = read_snapshot(path)
+            self.caretaker.import_state(self.originator, state)
+            self._journal("snapshot", state=encode_state(state))
+            os.remove(path)
+            logger.info(f"✅ Session resumed from {path}: {len(self.originator.history)} history entries")
+            return True
+
+    # write buffered history records of this instance's own observers (shared ones are closed by their owner)
+    # and drop the write-ahead log, a clean exit leaves nothing to recover
+    def close(self):
+        with self._lock:
+            if hasattr(self, "logging_observer"):
+                self.logging_observer.close()
+            if self.wal is not None:
+                self.wal.close()
+
     # method to load history from CSV
     def load_history(self): # pragma: no cover
-        if len(self.originator.history) >0:
-            logger.warning("❌ User attempted to override existing history, operation aborted")
-            raise CommandError("❌ existing history cannot be overridden; can load previous history only if no current history exists")
-        else:
-            self.caretaker.get_loaded_history(self.originator)
+        with self._lock:
+            if len(self.originator.history) >0:
+                logger.warning("❌ User attempted to override existing history, operation aborted")
+                raise CommandError("❌ existing history cannot be overridden; can load previous history only if no current history exists")
+            else:
+                self.caretaker.get_loaded_history(self.originator)
+                if self.originator.history:
+                    self._journal("load", entries=list(self.originator.history))
 
     # method to save the history to the CSV
     def save_history(self):
-        self.caretaker.save_history_to_csv(self.originator)
+        with self._lock:
+            self.caretaker.save_history_to_csv(self.originator)
 
 
 
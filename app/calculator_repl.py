@@ -1,11 +1,13 @@
 # calculator_repl.py
 from decimal import Decimal, InvalidOperation
-from datetime import datetime
 from colorama import Fore, Style, init
 from app.calculator import Calculator
-from app.exceptions import CommandError, ValidationError, OperationError, HistoryError
+from app.exceptions import CommandError, ValidationError, OperationError, HistoryError, FileAccessError
 from app.input_validators import get_validated_operand
+from app.operation_registry import registry
 from app.logger import logger
+from app.write_ahead_log import WriteAheadLog
+from app.config import CALCULATOR_WAL_ENABLED, CALCULATOR_RESUME_SESSION, CALCULATOR_WORKER_ENABLED, CALCULATOR_TRACEMALLOC
 
 init(autoreset=True)
 
@@ -13,16 +15,40 @@ init(autoreset=True)
 def main():
     try:
         # initialize calculator
-        calc = Calculator()
+        # trace allocations from the very start, for the memory report (W)
+        if CALCULATOR_TRACEMALLOC:
+            from app.diagnostics import tracer
+            tracer.start()
+
+        # crash recovery journal; another calculator may already own it
+        wal = None
+        if CALCULATOR_WAL_ENABLED:
+            try:
+                wal = WriteAheadLog()
+            except FileAccessError as e:
+                print(f"{Fore.YELLOW}⚠️ {e}: crash recovery is off for this calculator.{Style.RESET_ALL}")
+        calc = Calculator(wal=wal)
+        # calculations in a worker process with a time budget; started now so it is warm by the first one
+        worker = None
+        if CALCULATOR_WORKER_ENABLED:
+            from app.worker import WorkerSupervisor
+            worker = WorkerSupervisor()
         print(f"{Fore.CYAN}👋 Welcome to the Calculator app! Type 'help' to see available commands.{Style.RESET_ALL}")
 
+        # replay the state of a previous run that did not exit cleanly
+        if calc.recover():
+            print(f"{Fore.YELLOW}♻️ Previous session recovered: {len(calc.originator.history)} history entries restored.{Style.RESET_ALL}")
+        # or resume the history and undo/redo left by the previous clean exit
+        elif CALCULATOR_RESUME_SESSION and calc.restore_session():
+            print(f"{Fore.YELLOW}⏯️ Previous session resumed: {len(calc.originator.history)} history entries, undo/redo included.{Style.RESET_ALL}")
+
         while True:
             try:
                 # get user input
                 user_input = input(
                     f"{Fore.MAGENTA}👉 Select operation (type 'help' to list commands): {Style.RESET_ALL}"
                 ).strip().upper()
-                logger.info(f"user input entered {user_input}")
+                logger.info("user input entered %s", user_input)
                 
                 # --------------------- HELP COMMAND ----------------------------
                 if user_input == "HELP":
@@ -39,6 +65,11 @@ def main():
 
                 # ------------------ EXIT ------------------
                 if op_code == "exit":
+                    if CALCULATOR_RESUME_SESSION:
+                        calc.save_session()
+                    calc.close()
+                    if worker:
+                        worker.close()
                     logger.info("👋  Application closed!")
                     print("Application closing. Goodbye!! 👋 ")
                     break
@@ -72,6 +103,72 @@ def main():
                         print(f"↪️ Redo performed: {redone_op}")
                     continue
 
+                # ------------------ UNDO TO STEP / TIME ------------------
+                if op_code == "undoto":
+                    timeline = calc.caretaker.timeline
+                    target = input(
+                        f"Undo to step ({timeline.base_step}-{timeline.position}) or time (YYYY-MM-DD HH:MM:SS): "
+                    )
+                    steps_back = calc.undo_to(target)
+                    print(f"↩️ Undo performed: {steps_back} operations undone")
+                    continue
+
+                # ------------------ UNDO/REDO STATS ------------------
+                if op_code == "stats":
+                    calc.show_undo_stats()
+                    continue
+
+                # ------------------ MEMORY ------------------
+                if op_code == "mem":
+                    calc.show_memory()
+                    from app.diagnostics import tracer
+                    if not tracer.tracing:
+                        answer = input(f"{Fore.CYAN}Trace allocations from now on to see where memory goes (slower)? (y/N): {Style.RESET_ALL}")
+                        if answer.strip().lower() in ("y", "yes"):
+                            tracer.start()
+                            tracer.snapshot()
+                            print(f"{Fore.YELLOW}🔎 Tracing allocations; show memory again to see the top allocations and what changed.{Style.RESET_ALL}")
+                    continue
+
+                # ------------------ REDUCE ------------------
+                if op_code == "reduce":
+                    # imported here, like the calculations, only once a reduction is asked for
+                    from app.reductions import split_operands
+                    reduction = input("Reduction (sum, product, mean, min, max, stddev): ").strip().lower()
+                    print("Enter operands, several per line if you like; an empty line finishes.")
+                    # operands are read and reduced one at a time, nothing is kept but the running result
+                    lines = iter(lambda: input("> ").strip(), "")
+                    result, count, _ = calc.reduce(reduction, split_operands(lines))
+                    print(f"{Fore.GREEN}✅ Result of {reduction} over {count} operands = {result}{Style.RESET_ALL}")
+                    continue
+
+                # ------------------ VECTOR MODE ------------------
+                if op_code == "vector":
+                    vector_op = input("Operation (add, multiplication, power, ..., matmul, sum, mean, ...): ").strip().lower()
+                    operand_a = input("First operand (e.g. 1 2 3, or 1 2; 3 4 for a matrix): ")
+                    operand_b = None
+                    # reductions and functions of one operand (sin, exp, ...) take no second operand
+                    from app.reductions import REDUCTIONS
+                    unary = vector_op in registry and registry.create(vector_op).operands == 1
+                    if vector_op not in REDUCTIONS and not unary:
+                        operand_b = input("Second operand (a single number applies to every element): ")
+                    result, _ = calc.vector(vector_op, operand_a, operand_b)
+                    # imported here, numpy is only loaded once vector mode is used
+                    from app.vector_mode import format_array
+                    print(f"{Fore.GREEN}✅ Result of {vector_op}:{Style.RESET_ALL}\n{format_array(result)}")
+                    continue
+
+                # ------------------ SWEEP ------------------
+                if op_code == "sweep":
+                    sweep_op = input("Operation (add, power, root, ...): ").strip().lower()
+                    a_spec = input("First operand, start:stop:step or a list (e.g. 1:1000:0.5): ")
+                    b_spec = input("Second operand, start:stop:step or a list (e.g. 3): ")
+                    path, rows, errors, _ = calc.sweep(sweep_op, a_spec, b_spec)
+                    print(f"{Fore.GREEN}✅ Sweep of {sweep_op}: {rows} rows written to {path}{Style.RESET_ALL}")
+                    if errors:
+                        print(f"⚠️ {Fore.YELLOW}{errors} points failed, see the error column{Style.RESET_ALL}")
+                    continue
+
                 # ------------------ LOAD ------------------
                 if op_code == "load":
                     calc.load_history()
@@ -83,21 +180,28 @@ def main():
                 print(f"{Fore.YELLOW}Operation Selected: {operation_obj.__class__.__name__}{Style.RESET_ALL}")
 
                 #-------------------VALIDATE OPERANDS---------------
-                operand_a = get_validated_operand("Enter first operand: ")
-                operand_b = get_validated_operand("Enter second operand: ")             
+                if operation_obj.operands == 1:
+                    operand_a = get_validated_operand("Enter operand: ")
+                    operand_b = None
+                else:
+                    operand_a = get_validated_operand("Enter first operand: ")
+                    operand_b = get_validated_operand("Enter second operand: ")             
 
 
                 # ---------------------- Perform calculation ---------------------
-                result = operation_obj.calculate(operand_a, operand_b)
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                log_message = f"{timestamp},{operation_obj.__class__.__name__},{operand_a},{operand_b},{result},{calc.instance_ID}"
+                if worker:
+                    result = worker.calculate(operation_obj, operand_a, operand_b)
+                else:
+                    result = operation_obj.calculate(operand_a, operand_b)
 
                 # ----------------------- Update calculator state and observers -------------------
-                calc.add_operation(log_message)
-                calc.notify_observers(log_message)
+                calc.record_calculation(operation_obj, operand_a, operand_b, result)
 
 
-                print(f"{Fore.GREEN}✅ Result of {op_code} with operands {operand_a} and {operand_b} = {result}{Style.RESET_ALL}")
+                if operand_b is None:
+                    print(f"{Fore.GREEN}✅ Result of {op_code} with operand {operand_a} = {result}{Style.RESET_ALL}")
+                else:
+                    print(f"{Fore.GREEN}✅ Result of {op_code} with operands {operand_a} and {operand_b} = {result}{Style.RESET_ALL}")
 
 
             # ------------------ EXCEPTIONS ------------------
@@ -1,5 +1,4 @@
-from app.calculation import Percentage, IntegerDivision, Modulo, Root, Absdifference, Multiplication, Addition, Division, Subtraction, Power
-from app.calculation import CalculationTemplate
+from app.operation_registry import registry
 from app.logger import logger
 from app.exceptions import CommandError
 
@@ -11,32 +10,16 @@ class CommandFactory:
 
     #create operation object based on user input, also handles operation mismatches
     def createOperationObject(self):
+        '''
+        Operations come from app.operation_registry: the built-in ones plus any plugin. The
+        implementation of an operation is imported the first time it is created.
+        '''
         try:
-            if self.user_input == 'percentage':
-                return Percentage()
-            elif self.user_input == 'add':
-                return Addition()
-            elif self.user_input == 'subtract':
-                return Subtraction()
-            elif self.user_input == 'div':
-                return Division()
-            elif self.user_input == 'intdiff':
-                return IntegerDivision()
-            elif self.user_input == 'modulo':
-                return Modulo()
-            elif self.user_input == 'root':
-                return Root()
-            elif self.user_input == 'absdiff':
-                return Absdifference()
-            elif self.user_input == 'multiplication':
-                return Multiplication()
-            elif self.user_input == 'power':
-                return Power()
-            else:
+            if self.user_input not in registry:
                 logger.error(f"❌ Value error: Command {self.user_input} not allowed")
-                raise CommandError(f"❌ Command '{self.user_input}' not allowed. Allowed commands: {CalculationTemplate.operations_allowed}"
+                raise CommandError(f"❌ Command '{self.user_input}' not allowed. Allowed commands: {registry.names()}"
                 )
+            return registry.create(self.user_input)
         except Exception as e:
             logger.exception(f"❌ Failed to create operation object for '{self.user_input}': {e}")
             raise
-        
\ No newline at end of file
@@ -29,6 +29,14 @@ LOG_HISTORY_FILE = os.getenv("LOG_HISTORY_FILE", "event_log.txt")
 TXT_HISTORY_FILE = os.getenv("TXT_HISTORY_FILE", "history_log.json")
 CSV_CARETAKER_HISTORY_FILE = os.getenv("CSV_CARETAKER_HISTORY_FILE", "caretaker_history.csv")  # memento source of truth
 
+# Operation plugins: *.py files defining register(registry), see app/operation_registry.py
+CALCULATOR_PLUGIN_DIR = os.getenv("CALCULATOR_PLUGIN_DIR", "plugins")
+
+# Event log, see app/logger.py
+CALCULATOR_LOG_LEVEL = os.getenv("CALCULATOR_LOG_LEVEL", "INFO").upper()
+CALCULATOR_LOG_MAX_BYTES = int(os.getenv("CALCULATOR_LOG_MAX_BYTES", "5242880"))  # rotate after this size, 0 = never
+CALCULATOR_LOG_BACKUP_COUNT = int(os.getenv("CALCULATOR_LOG_BACKUP_COUNT", "3"))  # rotated files kept
+
 # File columns
 DEFAULT_COLUMNS = ["timestamp", "operation", "operand1", "operand2", "result", "instance_id"]
 CSV_COLUMNS = os.getenv("CSV_COLUMNS")
@@ -40,8 +48,68 @@ else:
 # History Settings
 CALCULATOR_MAX_HISTORY_SIZE = int(os.getenv("CALCULATOR_MAX_HISTORY_SIZE", "100"))
 CALCULATOR_AUTO_SAVE = os.getenv("CALCULATOR_AUTO_SAVE", "true").lower() == "true"
+CALCULATOR_MAX_UNDO_DEPTH = int(os.getenv("CALCULATOR_MAX_UNDO_DEPTH", "100"))  # undo states kept, 0 = unbounded
+CALCULATOR_UNDO_MEMORY_BUDGET = int(os.getenv("CALCULATOR_UNDO_MEMORY_BUDGET", "10485760"))  # bytes, 0 = unbounded
+CALCULATOR_CHECKPOINT_INTERVAL = int(os.getenv("CALCULATOR_CHECKPOINT_INTERVAL", "10"))  # steps between full history checkpoints
+CALCULATOR_HISTORY_PAGE_SIZE = int(os.getenv("CALCULATOR_HISTORY_PAGE_SIZE", "20"))  # entries per page of the history display, 0 = no paging
+
+# Write-ahead log (crash recovery of history and undo/redo)
+CALCULATOR_WAL_ENABLED = os.getenv("CALCULATOR_WAL_ENABLED", "true").lower() == "true"
+CALCULATOR_WAL_FILE = os.getenv("CALCULATOR_WAL_FILE", "calculator_wal.jsonl")  # inside CALCULATOR_HISTORY_DIR
+CALCULATOR_WAL_FSYNC = os.getenv("CALCULATOR_WAL_FSYNC", "false").lower() == "true"  # fsync every record, survives power loss
+CALCULATOR_WAL_COMPACT_RECORDS = int(os.getenv("CALCULATOR_WAL_COMPACT_RECORDS", "1000"))  # records before rewriting as a snapshot
+
+# Session resume (history and undo/redo kept across a clean exit)
+CALCULATOR_RESUME_SESSION = os.getenv("CALCULATOR_RESUME_SESSION", "true").lower() == "true"
+CALCULATOR_SESSION_FILE = os.getenv("CALCULATOR_SESSION_FILE", "calculator_session.json")  # inside CALCULATOR_HISTORY_DIR
+
+# History log writes (LoggingObserver group commit)
+CALCULATOR_LOG_BATCH_SIZE = int(os.getenv("CALCULATOR_LOG_BATCH_SIZE", "32"))  # records written per batch
+CALCULATOR_LOG_FLUSH_INTERVAL = float(os.getenv("CALCULATOR_LOG_FLUSH_INTERVAL", "1.0"))  # seconds before a partial batch is written
+CALCULATOR_LOG_FSYNC = os.getenv("CALCULATOR_LOG_FSYNC", "batch").lower()  # none / batch / every
+
+# Shared observer pipeline and sessions (server mode)
+CALCULATOR_OBSERVER_BATCH_SIZE = int(os.getenv("CALCULATOR_OBSERVER_BATCH_SIZE", "100"))
+CALCULATOR_OBSERVER_FLUSH_INTERVAL = float(os.getenv("CALCULATOR_OBSERVER_FLUSH_INTERVAL", "1.0"))  # seconds
+CALCULATOR_MAX_SESSIONS = int(os.getenv("CALCULATOR_MAX_SESSIONS", "1000"))  # sessions kept in memory
+CALCULATOR_SESSION_IDLE_TIMEOUT = float(os.getenv("CALCULATOR_SESSION_IDLE_TIMEOUT", "300"))  # seconds before spilling to disk
+CALCULATOR_SESSION_SWEEP_INTERVAL = float(os.getenv("CALCULATOR_SESSION_SWEEP_INTERVAL", "30"))  # seconds between idle checks, 0 = off
+CALCULATOR_SESSION_DIR = os.getenv("CALCULATOR_SESSION_DIR", "sessions")  # inside CALCULATOR_HISTORY_DIR
 
 # Calculation Settings
 CALCULATOR_PRECISION = int(os.getenv("CALCULATOR_PRECISION", "4"))
 CALCULATOR_MAX_INPUT_VALUE = Decimal(os.getenv("CALCULATOR_MAX_INPUT_VALUE", "1000"))
 CALCULATOR_DEFAULT_ENCODING = os.getenv("CALCULATOR_DEFAULT_ENCODING", "utf-8")
+CALCULATOR_MAX_RESULT_DIGITS = int(os.getenv("CALCULATOR_MAX_RESULT_DIGITS", "10000"))  # cost budget, estimated result digits
+CALCULATOR_VECTOR_MAX_ELEMENTS = int(os.getenv("CALCULATOR_VECTOR_MAX_ELEMENTS", "100000"))  # elements of a vector mode operand or result
+
+# Sweeps (tables of one operation over ranges of operands, streamed to CSV)
+CALCULATOR_SWEEP_MAX_POINTS = int(os.getenv("CALCULATOR_SWEEP_MAX_POINTS", "1000000"))  # rows of one sweep
+CALCULATOR_SWEEP_CHUNK_SIZE = int(os.getenv("CALCULATOR_SWEEP_CHUNK_SIZE", "1000"))  # rows evaluated and written at a time
+CALCULATOR_SWEEP_WORKERS = int(os.getenv("CALCULATOR_SWEEP_WORKERS", "1"))  # worker processes, 1 = evaluate in this process
+
+# Memory diagnostics (tracemalloc top allocations, see app/diagnostics.py)
+CALCULATOR_TRACEMALLOC = os.getenv("CALCULATOR_TRACEMALLOC", "false").lower() == "true"  # trace allocations from start-up
+CALCULATOR_TRACEMALLOC_FRAMES = int(os.getenv("CALCULATOR_TRACEMALLOC_FRAMES", "1"))  # stack frames kept per allocation
+CALCULATOR_TRACEMALLOC_TOP = int(os.getenv("CALCULATOR_TRACEMALLOC_TOP", "10"))  # allocation sites shown
+
+# Persistent result cache shared by calculator processes (see app/result_cache.py)
+CALCULATOR_RESULT_CACHE_ENABLED = os.getenv("CALCULATOR_RESULT_CACHE_ENABLED", "false").lower() == "true"
+CALCULATOR_RESULT_CACHE_FILE = os.getenv("CALCULATOR_RESULT_CACHE_FILE", "result_cache.sqlite3")  # inside CALCULATOR_HISTORY_DIR
+CALCULATOR_RESULT_CACHE_MAX_ENTRIES = int(os.getenv("CALCULATOR_RESULT_CACHE_MAX_ENTRIES", "100000"))  # LRU eviction beyond this
+CALCULATOR_RESULT_CACHE_MAX_BYTES = int(os.getenv("CALCULATOR_RESULT_CACHE_MAX_BYTES", "67108864"))  # keys + results, 64 MiB
+CALCULATOR_RESULT_CACHE_MIN_SECONDS = float(os.getenv("CALCULATOR_RESULT_CACHE_MIN_SECONDS", "0.001"))  # faster results are not stored
+CALCULATOR_RESULT_CACHE_BUSY_TIMEOUT = float(os.getenv("CALCULATOR_RESULT_CACHE_BUSY_TIMEOUT", "5"))  # seconds to wait for a locked file
+
+# Calculation worker processes (time budget per operation, hung calculations killed)
+CALCULATOR_WORKER_ENABLED = os.getenv("CALCULATOR_WORKER_ENABLED", "false").lower() == "true"
+CALCULATOR_WORKER_PROCESSES = int(os.getenv("CALCULATOR_WORKER_PROCESSES", "1"))  # calculations run at the same time
+CALCULATOR_OPERATION_TIMEOUT = float(os.getenv("CALCULATOR_OPERATION_TIMEOUT", "10"))  # seconds per operation, 0 = no limit
+CALCULATOR_WORKER_START_TIMEOUT = float(os.getenv("CALCULATOR_WORKER_START_TIMEOUT", "30"))  # seconds for a new worker to warm up
+
+# Server Settings
+CALCULATOR_SERVER_HOST = os.getenv("CALCULATOR_SERVER_HOST", "127.0.0.1")
+CALCULATOR_SERVER_PORT = int(os.getenv("CALCULATOR_SERVER_PORT", "8765"))
+CALCULATOR_SERVER_WORKERS = int(os.getenv("CALCULATOR_SERVER_WORKERS", "4"))  # threads running calculations off the event loop
+CALCULATOR_SERVER_PIPELINE_DEPTH = int(os.getenv("CALCULATOR_SERVER_PIPELINE_DEPTH", "64"))  # queued requests per connection
+CALCULATOR_SERVER_MAX_REQUEST_BYTES = int(os.getenv("CALCULATOR_SERVER_MAX_REQUEST_BYTES", "8388608"))  # longest request line
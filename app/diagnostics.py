@@ -0,0 +1,187 @@
+# app/diagnostics.py
+import sys
+import tracemalloc
+from collections import deque
+from decimal import Decimal
+from app.logger import logger
+from app.ring_buffer import RingBuffer
+from app.config import CALCULATOR_TRACEMALLOC_FRAMES, CALCULATOR_TRACEMALLOC_TOP
+
+# observer attributes that hold pending records or cached rows
+OBSERVER_BUFFERS = ("buffer", "_df", "_new_rows")
+
+
+##############################################################
+############### Object sizes
+##############################################################
+def deep_sizeof(obj, seen=None) -> int:
+    '''
+    Bytes held by obj and everything it references: containers, strings, Decimals, DataFrames and
+    the attributes of the calculator's own objects (classes defined in app.*). Objects of other
+    libraries (locks, files, loggers) count for their own size only.
+
+    `seen` holds the ids already counted: pass the same set to several calls and an object
+    reachable from more than one of them is counted once, by the first call that reaches it.
+    '''
+    seen = set() if seen is None else seen
+    total = 0
+    # pandas objects only exist once something imported pandas: never import it just to measure
+    pd = sys.modules.get("pandas")
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+
+        if pd is not None and isinstance(current, (pd.DataFrame, pd.Series)):
+            total += int(current.memory_usage(deep=True).sum()) if isinstance(current, pd.DataFrame) else int(current.memory_usage(deep=True))
+            continue
+        total += sys.getsizeof(current)
+
+        if isinstance(current, (str, bytes, int, float, Decimal)) or current is None:
+            continue
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset, deque)):
+            stack.extend(current)
+        elif isinstance(current, RingBuffer):
+            stack.append(current._items)
+        elif type(current).__module__.startswith("app.") and hasattr(current, "__dict__"):
+            stack.append(vars(current))
+    return total
+
+
+# entries and (when they can be measured) bytes of the caches kept by the process
+def cache_report(seen=None) -> dict:
+    seen = set() if seen is None else seen
+    from app import math_functions
+    from app.operation_registry import registry
+
+    caches = {}
+    # lru_cache does not expose its values: entries only
+    for cached in (math_functions._pi, math_functions._ln2, math_functions._ln10, math_functions._inverse_factorials):
+        caches[f"math_functions.{cached.__name__}"] = {"entries": cached.cache_info().currsize, "bytes": None}
+    specs = list(registry._specs.values())
+    caches["operation_registry"] = {"entries": len(specs), "bytes": deep_sizeof(specs, seen)}
+    # the result cache lives on disk: entries only, and only if this process has opened it
+    from app import result_cache
+    if result_cache._shared is not None:
+        caches["result_cache"] = {"entries": result_cache._shared.stats()["entries"], "bytes": None}
+    return caches
+
+
+##############################################################
+############### Memory report
+##############################################################
+def memory_report(calculator) -> dict:
+    '''
+    Bytes held by each part of a Calculator's state:
+
+        {"history": ..., "timeline": ..., "undo": ..., "redo": ..., "observers": {...},
+         "caches": {...}, "total": ...}
+
+    Parts are measured in that order with one shared `seen` set, so entries shared by the history
+    and the mementos are counted once, in the history; "undo" is what the undo stack adds on top.
+    Call under the calculator's lock (Calculator.memory_report does).
+    '''
+    seen = set()
+    caretaker = calculator.caretaker
+    report = {
+        "history": deep_sizeof(calculator.originator.history, seen),
+        "timeline": deep_sizeof(caretaker.timeline, seen),
+        "undo": deep_sizeof(caretaker.stack_undo, seen),
+        "redo": deep_sizeof(caretaker.stack_redo, seen),
+    }
+
+    observers = {}
+    for observer in _observers(calculator.subject.observers):
+        size = sum(deep_sizeof(getattr(observer, name), seen) for name in OBSERVER_BUFFERS if hasattr(observer, name))
+        name = type(observer).__name__
+        observers[name] = observers.get(name, 0) + size
+    report["observers"] = observers
+
+    report["caches"] = cache_report(seen)
+    report["total"] = (report["history"] + report["timeline"] + report["undo"] + report["redo"]
+                       + sum(observers.values()) + sum(cache["bytes"] or 0 for cache in report["caches"].values()))
+    return report
+
+
+# observers, including the ones a BatchingObserver forwards to
+def _observers(observers):
+    for observer in observers:
+        yield observer
+        yield from _observers(getattr(observer, "observers", ()))
+
+
+def format_bytes(size) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024 or unit == "MiB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+##############################################################
+############### MemoryTracer
+##############################################################
+class MemoryTracer:
+    '''
+    Top allocations by source line, from tracemalloc snapshots.
+
+    start() begins tracing (which slows allocations down while it is on); every snapshot() is
+    kept as the baseline of the next one, so top() shows where memory is held now and diff()
+    what changed between the last two snapshots, e.g. before and after a burst of calculations.
+    '''
+    # frames of the tracing machinery and of the memory report itself
+    IGNORED = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    )
+
+    def __init__(self, frames=CALCULATOR_TRACEMALLOC_FRAMES):
+        self.frames = frames
+        self.previous = None
+        self.current = None
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            logger.info(f"✅ tracemalloc started ({self.frames} frame(s) per allocation)")
+
+    def stop(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info("✅ tracemalloc stopped")
+        self.previous = self.current = None
+
+    def snapshot(self):
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not tracing, call start() first")
+        self.previous, self.current = self.current, tracemalloc.take_snapshot().filter_traces(self.IGNORED)
+        return self.current
+
+    # [(location, bytes, blocks)] of the largest allocations in the last snapshot
+    def top(self, limit=CALCULATOR_TRACEMALLOC_TOP):
+        if self.current is None:
+            return []
+        stats = self.current.statistics("lineno")[:limit]
+        return [(str(stat.traceback), stat.size, stat.count) for stat in stats]
+
+    # [(location, bytes difference, bytes now)] between the last two snapshots, largest changes first
+    def diff(self, limit=CALCULATOR_TRACEMALLOC_TOP):
+        if self.previous is None or self.current is None:
+            return []
+        stats = self.current.compare_to(self.previous, "lineno")[:limit]
+        return [(str(stat.traceback), stat.size_diff, stat.size) for stat in stats if stat.size_diff]
+
+
+# shared by the REPL and programmatic callers, so snapshots taken by one are diffed by the other
+tracer = MemoryTracer()
@@ -0,0 +1,75 @@
+# app/history_csv.py
+import csv
+import os
+from app.config import CSV_COLUMNS, CALCULATOR_DEFAULT_ENCODING
+
+
+##############################################################
+############### History CSV codec
+##############################################################
+'''
+Streaming codec between history entries and the history CSV, on top of the stdlib csv module.
+
+A history entry is the string "timestamp,operation,operand1,operand2,result,instance_id"; on disk
+it is one CSV row under a CSV_COLUMNS header. Rows are written and parsed one at a time, with no
+intermediate table, and the output is the same bytes pandas' to_csv(index=False) writes:
+minimal quoting and "\\n" line endings.
+'''
+
+
+# entry string -> list of column values, or None if it does not have one value per column
+def entry_to_row(entry):
+    parts = str(entry).split(",")
+    if len(parts) != len(CSV_COLUMNS):
+        return None
+    return parts
+
+
+# CSV row (dict keyed by column) -> entry string
+def row_to_entry(row):
+    return ",".join(str(row[column]) for column in CSV_COLUMNS)
+
+
+# write one row per entry to an open file, returns the entries that were skipped as malformed
+def _write_rows(file, entries):
+    writer = csv.writer(file, lineterminator="\n")
+    skipped = []
+    for entry in entries:
+        row = entry_to_row(entry)
+        if row is None:
+            skipped.append(entry)
+            continue
+        writer.writerow(row)
+    return skipped
+
+
+# replace the file with the header and one row per entry: written to a temporary file that is
+# renamed over the old one, so a crash leaves either the old or the new file, never half of one
+def write_history_csv(path, entries):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding=CALCULATOR_DEFAULT_ENCODING, newline="") as file:
+        csv.writer(file, lineterminator="\n").writerow(CSV_COLUMNS)
+        skipped = _write_rows(file, entries)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+    return skipped
+
+
+# add rows for the entries at the end of an existing file
+def append_history_csv(path, entries):
+    with open(path, "a", encoding=CALCULATOR_DEFAULT_ENCODING, newline="") as file:
+        return _write_rows(file, entries)
+
+
+# yield the entry of every row, the header must contain every column in CSV_COLUMNS
+def read_history_csv(path):
+    with open(path, encoding=CALCULATOR_DEFAULT_ENCODING, newline="") as file:
+        reader = csv.DictReader(file)
+        missing = [column for column in CSV_COLUMNS if column not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"missing columns {missing} in {path}")
+        for line, row in enumerate(reader, start=2):
+            if None in row or None in row.values():
+                raise ValueError(f"row {line} of {path} does not have {len(reader.fieldnames)} columns")
+            yield row_to_entry(row)
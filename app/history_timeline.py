@@ -0,0 +1,128 @@
+# app/history_timeline.py
+import sys
+from app.logger import logger
+from app.exceptions import HistoryError
+from app.ring_buffer import RingBuffer
+from app.config import CALCULATOR_MAX_HISTORY_SIZE, CALCULATOR_CHECKPOINT_INTERVAL
+
+
+##############################################################
+############### HistoryTimeline
+##############################################################
+class HistoryTimeline:
+    '''
+    Checkpoint/replay model of the history, used to jump back to any past step in one go.
+
+    Step n is the history after the n-th calculation since the last reset. The timeline stores a
+    full checkpoint of the history every checkpoint_interval steps, and only the added entry for
+    the steps in between. The history at any step is rebuilt from the nearest checkpoint at or
+    before it, replaying at most checkpoint_interval - 1 entries.
+
+    step 0 ─ 1 ─ 2 ─ ... ─ 10 ─ 11 ─ ... ─ 20 ─ 21 ─ 22  (position)
+    [ckpt]                [ckpt]           [ckpt]
+    '''
+    def __init__(self, checkpoint_interval=CALCULATOR_CHECKPOINT_INTERVAL, max_steps=None):
+        self.checkpoint_interval = max(1, checkpoint_interval)
+        self.max_steps = max_steps
+        self.reset()
+
+    # forget every step, the given history becomes step 0
+    def reset(self, history=()):
+        self.base_step = 0
+        self.position = 0
+        self.checkpoints = {0: tuple(history)}
+        # entries[i] and timestamps[i] belong to step base_step + 1 + i
+        self.entries = []
+        self.timestamps = []
+
+    @property
+    def last_step(self):
+        return self.base_step + len(self.entries)
+
+    # ----------------- Recording -----------------
+
+    # a calculation was added after `position`: steps after it (the redo branch) are dropped
+    def record(self, entry, history):
+        if self.position < self.base_step:
+            # undone past the oldest recorded step: the new history starts a fresh timeline
+            self.reset(history)
+            return
+
+        self._truncate(self.position)
+        self.entries.append(entry)
+        self.timestamps.append(str(entry).split(",", 1)[0])
+        self.position = self.last_step
+
+        if self.position % self.checkpoint_interval == 0:
+            self.checkpoints[self.position] = tuple(history)
+        self._prune()
+
+    def undo(self):
+        self.position -= 1
+
+    def redo(self):
+        self.position += 1
+
+    def _truncate(self, step):
+        if step >= self.last_step:
+            return
+        keep = max(0, step - self.base_step)
+        del self.entries[keep:]
+        del self.timestamps[keep:]
+        for checkpoint in [c for c in self.checkpoints if c > step]:
+            del self.checkpoints[checkpoint]
+
+    # drop whole checkpoint blocks that are older than max_steps behind the current position
+    def _prune(self):
+        if not self.max_steps:
+            return
+        oldest_needed = self.position - self.max_steps
+        while True:
+            next_checkpoint = self.base_step - self.base_step % self.checkpoint_interval + self.checkpoint_interval
+            if next_checkpoint > oldest_needed or next_checkpoint not in self.checkpoints:
+                return
+            del self.checkpoints[self.base_step]
+            del self.entries[:next_checkpoint - self.base_step]
+            del self.timestamps[:next_checkpoint - self.base_step]
+            self.base_step = next_checkpoint
+
+    # ----------------- Lookup -----------------
+
+    # history at `step`: nearest checkpoint, then replay of the entries after it
+    def state_at(self, step):
+        if not self.base_step <= step <= self.last_step:
+            raise HistoryError(f"❌ Step {step} is not available, steps {self.base_step}-{self.last_step} are")
+
+        checkpoint = max(self.base_step, step - step % self.checkpoint_interval)
+        history = RingBuffer(self.checkpoints[checkpoint], maxlen=CALCULATOR_MAX_HISTORY_SIZE)
+        for index in range(checkpoint - self.base_step, step - self.base_step):
+            history.append(self.entries[index])
+        return list(history)
+
+    # latest step at or before `position` whose calculation happened at or before `timestamp`
+    def step_at(self, timestamp):
+        for step in range(self.position, self.base_step, -1):
+            if self.timestamps[step - self.base_step - 1] <= timestamp:
+                return step
+        return self.base_step
+
+
+##############################################################
+############### TimelineMemento
+##############################################################
+class TimelineMemento:
+    '''
+    Memento for a step of a HistoryTimeline: costs a few bytes on the redo stack and is only
+    rebuilt (checkpoint + replay) if it is actually restored.
+    '''
+    def __init__(self, timeline, step):
+        self.timeline = timeline
+        self.step = step
+        self.size = sys.getsizeof(self)
+
+    def get_state(self):
+        try:
+            return self.timeline.state_at(self.step)
+        except HistoryError as e:
+            logger.error(f"❌ Failed to get memento state: {e}")
+            raise
@@ -0,0 +1,179 @@
+# app/history_view.py
+import csv
+import json
+import os
+from itertools import islice
+from app.history_csv import _write_rows
+from app.config import CSV_COLUMNS, CALCULATOR_DEFAULT_ENCODING
+
+# entries copied out of the history per lock acquisition while iterating
+HISTORY_CHUNK_SIZE = 256
+
+# export formats of export_history
+EXPORT_FORMATS = ("csv", "jsonl")
+
+
+##############################################################
+############### HistoryView
+##############################################################
+class HistoryView:
+    '''
+    Lazy, read-only window over an Originator's history: offset/limit, newest first with
+    reverse=True, and filtering on the operation name, a substring or any predicate.
+
+    Nothing is copied up front. Iterating takes the lock for one chunk of HISTORY_CHUNK_SIZE entries
+    at a time, so other threads keep calculating while a long history is displayed or exported.
+    Entries added meanwhile are picked up if they land after the current position; an undo,
+    which replaces the history, continues the iteration at the same position of the new one.
+
+        calculator.history_view(operation="Power", reverse=True, limit=10)   # the last 10 powers
+    '''
+    def __init__(self, originator, lock, offset=0, limit=None, reverse=False, operation=None, contains=None, where=None):
+        self.originator = originator
+        self.lock = lock
+        self.offset = max(int(offset), 0)
+        self.limit = None if limit is None else max(int(limit), 0)
+        self.reverse = reverse
+        self.operation = operation.lower() if operation else None
+        self.contains = contains
+        self.where = where
+
+    @property
+    def filtered(self):
+        return bool(self.operation or self.contains or self.where)
+
+    def _matches(self, entry):
+        if self.operation:
+            fields = str(entry).split(",")
+            if len(fields) < 2 or fields[1].lower() != self.operation:
+                return False
+        if self.contains and self.contains not in str(entry):
+            return False
+        return self.where is None or self.where(entry)
+
+    # chunks of entries in view order, starting `start` entries in, copied under the lock
+    def _chunks(self, start=0):
+        position, source, iterator = start, None, None
+        while True:
+            with self.lock:
+                history = self.originator.history
+                chunk = None
+                if history is source and iterator is not None:
+                    try:
+                        chunk = list(islice(iterator, HISTORY_CHUNK_SIZE))
+                    except RuntimeError:
+                        # the deque changed under the iterator: start a new one at the same position
+                        chunk = None
+                if chunk is None:
+                    source = history
+                    ordered = reversed(history) if self.reverse else iter(history)
+                    iterator = islice(ordered, position, None)
+                    chunk = list(islice(iterator, HISTORY_CHUNK_SIZE))
+            if not chunk:
+                return
+            position += len(chunk)
+            yield chunk
+
+    def __iter__(self):
+        if self.limit == 0:
+            return
+        # without a filter the offset is a position, skipped without copying the entries before it
+        skip = self.offset if self.filtered else 0
+        produced = 0
+        for chunk in self._chunks(0 if self.filtered else self.offset):
+            for entry in chunk:
+                if self.filtered:
+                    if not self._matches(entry):
+                        continue
+                    if skip:
+                        skip -= 1
+                        continue
+                yield entry
+                produced += 1
+                if self.limit is not None and produced >= self.limit:
+                    return
+
+    # entries of the view, as a list
+    def list(self) -> list:
+        return list(self)
+
+    # number of entries the view yields
+    def count(self) -> int:
+        return sum(1 for _ in self)
+
+    # page `number` (from 1) of `size` entries
+    def page(self, number, size) -> list:
+        start = (max(int(number), 1) - 1) * size
+        if self.limit is not None:
+            # a page never reaches past the end of the view
+            size = max(min(size, self.limit - start), 0)
+        return HistoryView(self.originator, self.lock, offset=self.offset + start, limit=size, reverse=self.reverse,
+                           operation=self.operation, contains=self.contains, where=self.where).list()
+
+    # successive pages of `size` entries, each read when the previous one has been consumed
+    def pages(self, size):
+        page = []
+        for entry in self:
+            page.append(entry)
+            if len(page) == size:
+                yield page
+                page = []
+        if page:
+            yield page
+
+
+##############################################################
+############### Streaming exporters
+##############################################################
+
+# CSV_COLUMNS header and one row per entry, the format of the history CSV
+def _export_csv(file, entries):
+    csv.writer(file, lineterminator="\n").writerow(CSV_COLUMNS)
+    return _write_rows(file, entries)
+
+
+# one JSON object per line, keyed by CSV_COLUMNS
+def _export_jsonl(file, entries):
+    skipped = []
+    for entry in entries:
+        fields = str(entry).split(",")
+        if len(fields) != len(CSV_COLUMNS):
+            skipped.append(entry)
+            continue
+        file.write(json.dumps(dict(zip(CSV_COLUMNS, fields))) + "\n")
+    return skipped
+
+
+class _Counted:
+    # iterable counting the entries it hands out
+    def __init__(self, entries):
+        self.entries = entries
+        self.count = 0
+
+    def __iter__(self):
+        for entry in self.entries:
+            self.count += 1
+            yield entry
+
+
+def export_history(view, path, fmt="csv"):
+    '''
+    Streams the entries of a HistoryView to `path` as CSV or JSON lines, one chunk at a time.
+    Written to a temporary file renamed when complete. Returns (written, skipped entries).
+    '''
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"unknown export format '{fmt}', use one of {EXPORT_FORMATS}")
+    writer = _export_csv if fmt == "csv" else _export_jsonl
+    counted = _Counted(view)
+
+    tmp_path = path + ".tmp"
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    try:
+        with open(tmp_path, "w", encoding=CALCULATOR_DEFAULT_ENCODING, newline="") as file:
+            skipped = writer(file, counted)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return counted.count - len(skipped), skipped
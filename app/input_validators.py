@@ -39,6 +39,26 @@ def get_validated_operand(prompt: str) -> Decimal:
         if operand is not None:
             return operand
 
+def parse_operand(raw) -> Decimal:
+    """
+    Convert a non-interactive operand (server requests, files) to Decimal.
+    Raises ValidationError instead of prompting again.
+    """
+    try:
+        value = Decimal(str(raw).strip())
+    except (InvalidOperation, ValueError):
+        logger.info(f"❌ Invalid operand '{raw}'")
+        raise ValidationError(f"❌ Invalid number '{raw}'")
+
+    if not value.is_finite():
+        raise ValidationError(f"❌ Invalid number '{raw}'")
+
+    if abs(value) > CALCULATOR_MAX_INPUT_VALUE:
+        logger.warning(f"❌ Value too large: {value}")
+        raise ValidationError(f"❌ Value too large. Max allowed: {CALCULATOR_MAX_INPUT_VALUE}")
+
+    return value
+
 def validate_nonzero(value: Decimal, var_name: str = "value"):
     """Ensure a given Decimal value is not zero."""
     if value == 0:
@@ -1,6 +1,12 @@
+import atexit
 import logging
+import multiprocessing
 import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from dotenv import load_dotenv
+from app.config import CALCULATOR_LOG_LEVEL, CALCULATOR_LOG_MAX_BYTES, CALCULATOR_LOG_BACKUP_COUNT
 
 load_dotenv()
 
@@ -11,16 +17,86 @@ LOG_FILE = os.path.join(LOG_DIR, LOG_FILE)
 
 os.makedirs(LOG_DIR, exist_ok=True)
 
+
+class DeferredQueueHandler(QueueHandler):
+    '''
+    QueueHandler that leaves formatting to the listener thread.
+
+    The stock QueueHandler formats every record on the calling thread before queueing it; this one
+    queues the record as it is, so a %-style call such as logger.info("added %s", entry) only costs
+    the caller a record and a queue put. Log arguments must therefore not be mutated after the call.
+    Records carrying a traceback are still formatted here, tracebacks do not outlive their thread.
+    '''
+    def prepare(self, record):
+        if record.exc_info or record.stack_info:
+            return super().prepare(record)
+        return record
+
+
+# wait until every queued record has been written by the listener thread
+def flush_logs():
+    for handler in logger.handlers:
+        # a multiprocessing queue (in a child process) has no join: its records are the parent's to write
+        if isinstance(handler, QueueHandler) and hasattr(handler.queue, "join"):
+            handler.queue.join()
+
+
 # Create a single logger
 logger = logging.getLogger("calculator")
-logger.setLevel(logging.INFO)
+level = getattr(logging, CALCULATOR_LOG_LEVEL, None)
+logger.setLevel(level if isinstance(level, int) else logging.INFO)
+
+# processes started by multiprocessing (calculation workers, sweep processes) never open the log
+# file themselves: several processes rotating one file lose records. They send their records to
+# the parent with forward_logs_to(child_log_queue()). The name is already set while a spawned
+# child imports this module, multiprocessing.parent_process() is not
+CHILD_PROCESS = multiprocessing.current_process().name != "MainProcess"
+
+listener = None
 
 # Prevent duplicate handlers if imported multiple times
-if not logger.hasHandlers():
-    file_handler = logging.FileHandler(LOG_FILE)
+if not logger.hasHandlers() and not CHILD_PROCESS:
+    # the file is written by a background listener, callers only put records on the queue
+    file_handler = RotatingFileHandler(LOG_FILE, maxBytes=CALCULATOR_LOG_MAX_BYTES, backupCount=CALCULATOR_LOG_BACKUP_COUNT, delay=True)
     formatter = logging.Formatter(
         "%(asctime)s [%(levelname)s] %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S"
     )
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
\ No newline at end of file
+
+    log_queue = queue.Queue()
+    listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    logger.addHandler(DeferredQueueHandler(log_queue))
+    listener.start()
+
+    # write what is still queued when the program exits
+    atexit.register(listener.stop)
+
+
+# queue of the records of child processes, written by this process' handlers; created on first use
+_child_queue = None
+_child_lock = threading.Lock()
+
+
+def child_log_queue():
+    '''
+    Queue to pass to a child process, which calls forward_logs_to() with it. A second listener
+    thread writes what arrives to the same file handler, so the file only has one writer process.
+    '''
+    global _child_queue
+    with _child_lock:
+        if _child_queue is None:
+            _child_queue = multiprocessing.get_context("spawn").Queue()
+            handlers = listener.handlers if listener is not None else ()
+            child_listener = QueueListener(_child_queue, *handlers, respect_handler_level=True)
+            child_listener.start()
+            atexit.register(child_listener.stop)
+        return _child_queue
+
+
+# in a child process: send every record to the parent's child_log_queue()
+def forward_logs_to(log_queue):
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    # the stock QueueHandler: it formats the message, so the record pickles whatever its arguments
+    logger.addHandler(QueueHandler(log_queue))
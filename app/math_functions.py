@@ -0,0 +1,453 @@
+# app/math_functions.py
+import math
+from functools import lru_cache
+from decimal import Decimal, ROUND_HALF_UP, Context, localcontext
+from app.exceptions import OperationError
+
+# Below this many result bits the float estimate is close enough to finish with a couple of correction steps
+_FLOAT_GUESS_BITS = 40
+
+# Scaled radicands larger than this (in digits) fall back to the generic Decimal power
+NEWTON_ROOT_MAX_DIGITS = 200_000
+
+
+#################################################################
+############ Integer helpers
+#################################################################
+def integer_nth_root(n: int, k: int) -> int:
+    '''
+    Returns floor(n ** (1/k)) computed exactly on Python integers.
+
+    Small results start from a float estimate; larger ones recurse on the top half of the
+    bits (precision doubling) so the Newton iteration starts from an overestimate that is
+    already correct to about half the digits and only needs one or two full-size steps.
+    '''
+    if n < 0:
+        raise ValueError("integer_nth_root requires a non-negative radicand")
+    if k < 1:
+        raise ValueError("integer_nth_root requires a positive degree")
+    if n < 2 or k == 1:
+        return n
+    if k == 2:
+        return math.isqrt(n)
+
+    result_bits = n.bit_length() // k + 1
+
+    if result_bits <= _FLOAT_GUESS_BITS:
+        x = int(math.exp(math.log(n) / k))
+        # float error is a few units at most, fix it up exactly
+        while x ** k > n:
+            x -= 1
+        while (x + 1) ** k <= n:
+            x += 1
+        return x
+
+    # root of the top bits gives an overestimate correct to roughly half the result bits
+    shift = result_bits // 2
+    x = (integer_nth_root(n >> (k * shift), k) + 1) << shift
+
+    # Newton from above decreases monotonically until it reaches floor(n ** (1/k))
+    while True:
+        y = ((k - 1) * x + n // x ** (k - 1)) // k
+        if y >= x:
+            return x
+        x = y
+
+
+def _round_half_up_scaled(scaled: int) -> int:
+    '''Drops the single guard digit of a floored, non-negative scaled value rounding half up.'''
+    quotient, guard = divmod(scaled, 10)
+    return quotient + (1 if guard >= 5 else 0)
+
+
+def _to_decimal(coefficient: int, places: int) -> Decimal:
+    '''Builds coefficient * 10**-places exactly, whatever the active context precision is.'''
+    with localcontext() as ctx:
+        # bit_length based digit count, str() of a huge int is slow and capped in recent Pythons
+        ctx.prec = max(ctx.prec, abs(coefficient).bit_length() * 30103 // 100000 + places + 2)
+        return Decimal(coefficient).scaleb(-places)
+
+
+#################################################################
+############ Roots
+#################################################################
+def _as_fraction(value: Decimal) -> tuple[int, int]:
+    # exact numerator/denominator of a finite, non-negative Decimal
+    _, digits, exponent = value.as_tuple()
+    coefficient = int("".join(map(str, digits))) if digits else 0
+    if exponent >= 0:
+        return coefficient * 10 ** exponent, 1
+    return coefficient, 10 ** -exponent
+
+
+def _exact_root(value: Decimal, k: int):
+    '''Returns the exact k-th root of value if it is a finite decimal, otherwise None.'''
+    _, digits, exponent = value.normalize().as_tuple()
+    coefficient = int("".join(map(str, digits)))
+
+    # move the leftover exponent into the coefficient so the exponent divides by k
+    remainder = exponent % k
+    coefficient *= 10 ** remainder
+    exponent -= remainder
+
+    root = integer_nth_root(coefficient, k)
+    if root ** k != coefficient:
+        return None
+    return Decimal(root).scaleb(exponent // k)
+
+
+def nth_root(value: Decimal, degree: int, places: int) -> Decimal:
+    '''
+    k-th root of a non-negative Decimal, correctly rounded (half up) to `places` decimals.
+
+    Perfect powers such as 27 or 0.0016 are detected first and returned exactly. Everything
+    else is computed as floor(root * 10**(places + 1)) with an integer Newton iteration, and
+    the extra guard digit decides the rounding, so the result never comes back as 2.9999.
+    Negative degrees return the reciprocal root.
+    '''
+    if value < 0:
+        raise OperationError(f"❌ Cannot take root of negative value {value}")
+    if degree == 0:
+        raise OperationError("❌ Degree of root cannot be zero")
+
+    k = abs(degree)
+
+    if value == 0:
+        if degree < 0:
+            raise OperationError("❌ Cannot take a negative degree root of zero")
+        return _to_decimal(0, places)
+
+    # fast path: perfect powers have an exact, finite answer
+    if degree > 0:
+        with localcontext() as ctx:
+            ctx.prec = max(ctx.prec, len(value.as_tuple().digits) + places + 2)
+            exact = _exact_root(value, k)
+            if exact is not None:
+                return exact.quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP)
+
+    numerator, denominator = _as_fraction(value)
+    if degree < 0:
+        numerator, denominator = denominator, numerator
+
+    # floor(root * 10**guard_places) == floor(root(numerator * 10**(k*guard_places) / denominator))
+    guard_places = places + 1
+    scaled = (numerator * 10 ** (k * guard_places)) // denominator
+    return _to_decimal(_round_half_up_scaled(integer_nth_root(scaled, k)), places)
+
+
+def newton_root_digits(value: Decimal, degree: int, places: int) -> int:
+    '''Rough size, in digits, of the scaled radicand nth_root would work on.'''
+    adjusted = abs(value.adjusted()) + 1 if value else 1
+    return abs(degree) * (places + 1) + adjusted
+
+
+#################################################################
+############ Powers
+#################################################################
+def estimate_power_digits(base: Decimal, exponent: Decimal) -> int:
+    '''
+    Upper estimate of the number of integer digits of base ** exponent.
+
+    Uses a 16 digit log10, so it costs the same for 2 ** 3 and 0.0001 ** -50000 and can be
+    checked before any real work is done.
+    '''
+    if base == 0 or exponent == 0:
+        return 1
+    magnitude = float(exponent) * float(abs(base).log10(Context(prec=16)))
+    if magnitude <= 0:
+        return 1
+    return math.ceil(magnitude) + 1
+
+
+def integer_power_digits(value: Decimal, exponent: int, places: int) -> int:
+    '''
+    Rough size, in digits, of the exact integers integer_power would work on: the coefficient
+    raised to |exponent| and, for negative exponents, the power of ten it is divided into.
+    Large even when the result is small, e.g. 1.0001 ** -1000000.
+    '''
+    _, digits, value_exponent = value.as_tuple()
+    size = len(digits) * abs(exponent)
+    if exponent < 0:
+        size += abs(value_exponent * exponent)
+    return size + places
+
+
+def integer_power(value: Decimal, exponent: int, places: int) -> Decimal:
+    '''
+    value ** exponent for an integer exponent, correctly rounded (half up) to `places` decimals.
+
+    The coefficient is raised with Python's exact integer exponentiation by squaring, so there
+    is no intermediate rounding; negative exponents are evaluated as an exact fraction.
+    '''
+    sign, digits, value_exponent = value.as_tuple()
+    coefficient = int("".join(map(str, digits))) if digits else 0
+    negative = bool(sign) and exponent % 2 == 1
+
+    if exponent >= 0:
+        # exact: (c * 10**e) ** n == c**n * 10**(e*n)
+        power = coefficient ** exponent
+        scale = value_exponent * exponent
+        with localcontext() as ctx:
+            ctx.prec = max(ctx.prec, power.bit_length() * 30103 // 100000 + max(scale, 0) + places + 2)
+            result = Decimal(-power if negative else power).scaleb(scale)
+            return result.quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP)
+
+    if coefficient == 0:
+        raise OperationError("❌ Cannot raise zero to a negative power")
+
+    # 1 / (c * 10**e) ** n as the fraction denominator / numerator, floored with one guard digit
+    n = -exponent
+    scale = value_exponent * n
+    numerator = coefficient ** n * 10 ** max(scale, 0)
+    denominator = 10 ** max(-scale, 0)
+    scaled = (denominator * 10 ** (places + 1)) // numerator
+    magnitude = _round_half_up_scaled(scaled)
+    return _to_decimal(-magnitude if negative else magnitude, places)
+
+
+
+#################################################################
+############ Transcendental functions
+#################################################################
+'''
+exp, ln, log10, sin, cos and atan of a Decimal, rounded half up to `places` decimals.
+
+Everything runs on fixed point integers (value * 10**w), where Python's big integer arithmetic is
+much cheaper than Decimal's. Each function first reduces its argument (multiples of ln2 or pi/2,
+square roots, half angles) so its series converges in a few terms, then undoes the reduction.
+The constants this needs, pi, ln2, ln10 and the 1/n! series coefficients, are computed once per
+working precision and cached, so repeated calls at the same precision only pay for the series.
+'''
+
+# digits carried beyond the requested places, absorb the error of reductions and series truncation
+TRANSCENDENTAL_GUARD_DIGITS = 10
+
+# working precisions whose constants are kept
+_CONSTANT_CACHE_SIZE = 64
+
+
+def _to_fixed(value: Decimal, w: int) -> int:
+    '''value * 10**w as an integer, rounded half up.'''
+    sign, digits, exponent = value.as_tuple()
+    coefficient = int("".join(map(str, digits))) if digits else 0
+    shift = exponent + w
+    if shift >= 0:
+        fixed = coefficient * 10 ** shift
+    else:
+        fixed = _round_half_up_scaled(coefficient // 10 ** (-shift - 1))
+    return -fixed if sign else fixed
+
+
+def _from_fixed(fixed: int, w: int, places: int) -> Decimal:
+    '''Fixed point value with w digits -> Decimal rounded half up (away from zero) to `places`.'''
+    magnitude = _round_half_up_scaled(abs(fixed) // 10 ** (w - places - 1))
+    return _to_decimal(-magnitude if fixed < 0 else magnitude, places)
+
+
+def _reduction_steps(w: int) -> int:
+    # halvings / square roots before a series: balances their cost against the terms they save
+    return max(math.isqrt(w) // 2, 1)
+
+
+def _atan_inverse(n: int, one: int) -> int:
+    '''atan(1/n) in fixed point, for Machin's formula.'''
+    term = one // n
+    n2 = n * n
+    total, k, sign = term, 1, 1
+    while term:
+        term //= n2
+        k += 2
+        sign = -sign
+        total += sign * (term // k)
+    return total
+
+
+def _atanh_inverse(n: int, one: int) -> int:
+    '''atanh(1/n) in fixed point.'''
+    term = one // n
+    n2 = n * n
+    total, k = term, 1
+    while term:
+        term //= n2
+        k += 2
+        total += term // k
+    return total
+
+
+@lru_cache(maxsize=_CONSTANT_CACHE_SIZE)
+def _pi(w: int) -> int:
+    # Machin: pi = 16 atan(1/5) - 4 atan(1/239), with guard digits for the truncated terms
+    one = 10 ** (w + TRANSCENDENTAL_GUARD_DIGITS)
+    return (16 * _atan_inverse(5, one) - 4 * _atan_inverse(239, one)) // 10 ** TRANSCENDENTAL_GUARD_DIGITS
+
+
+@lru_cache(maxsize=_CONSTANT_CACHE_SIZE)
+def _ln2(w: int) -> int:
+    # ln2 = 2 atanh(1/3)
+    one = 10 ** (w + TRANSCENDENTAL_GUARD_DIGITS)
+    return 2 * _atanh_inverse(3, one) // 10 ** TRANSCENDENTAL_GUARD_DIGITS
+
+
+@lru_cache(maxsize=_CONSTANT_CACHE_SIZE)
+def _ln10(w: int) -> int:
+    # ln10 = 3 ln2 + ln(1.25), and ln(1.25) = 2 atanh(1/9)
+    one = 10 ** (w + TRANSCENDENTAL_GUARD_DIGITS)
+    return (3 * _ln2(w + TRANSCENDENTAL_GUARD_DIGITS) + 2 * _atanh_inverse(9, one)) // 10 ** TRANSCENDENTAL_GUARD_DIGITS
+
+
+@lru_cache(maxsize=_CONSTANT_CACHE_SIZE)
+def _inverse_factorials(w: int, bound: float) -> tuple:
+    '''
+    1/n! in fixed point, for n = 0 .. N where bound**N / N! < 10**-w: enough terms of the exp,
+    sin and cos series for any reduced argument up to `bound`.
+    '''
+    coefficients = [10 ** w]
+    log_term = 0.0
+    while log_term > -w - 1:
+        n = len(coefficients)
+        coefficients.append(coefficients[-1] // n)
+        log_term += math.log10(bound) - math.log10(n)
+    return tuple(coefficients)
+
+
+def _exp_fixed(x: int, w: int) -> int:
+    one = 10 ** w
+    ln2 = _ln2(w)
+    # x = k ln2 + r with |r| <= ln2 / 2, then r / 2**s
+    k = (x + ln2 // 2) // ln2
+    steps = _reduction_steps(w)
+    r = (x - k * ln2) >> steps
+
+    # Horner on the cached coefficients, then square back up: exp(r) ** (2**s)
+    coefficients = _inverse_factorials(w, 0.35 / 2 ** steps)
+    result = coefficients[-1]
+    for coefficient in reversed(coefficients[:-1]):
+        result = coefficient + result * r // one
+    for _ in range(steps):
+        result = result * result // one
+    return result << k if k >= 0 else result >> -k
+
+
+def _ln_fixed(x: int, w: int) -> int:
+    one = 10 ** w
+    # x = m * 2**k with m in [0.5, 2)
+    k = x.bit_length() - one.bit_length()
+    m = x >> k if k >= 0 else x << -k
+
+    # ln(m) = 2**s ln(m ** (1 / 2**s)), then ln(m) = 2 atanh((m - 1) / (m + 1))
+    steps = _reduction_steps(w)
+    for _ in range(steps):
+        m = math.isqrt(m * one)
+    # the series runs on |z|: floor division of a negative term would never reach 0
+    z = abs(m - one) * one // (m + one)
+    z2 = z * z // one
+    total, term, n = z, z, 1
+    while term:
+        term = term * z2 // one
+        n += 2
+        total += term // n
+    if m < one:
+        total = -total
+    return k * _ln2(w) + (2 * total << steps)
+
+
+def _sin_cos_fixed(x: int, w: int) -> tuple[int, int]:
+    one = 10 ** w
+    # x = q pi/2 + r with |r| <= pi/4; pi carries the digits the multiple of pi/2 needs
+    extra = len(str(abs(x) // one)) + 1
+    half_pi = _pi(w + extra) // 2
+    x_wide = x * 10 ** extra
+    q = (x_wide + half_pi // 2) // half_pi
+    steps = _reduction_steps(w)
+    r = ((x_wide - q * half_pi) // 10 ** extra) >> steps
+
+    # both series in r**2 on the cached 1/n! coefficients, then double the angle s times
+    coefficients = _inverse_factorials(w, 0.8 / 2 ** steps)
+    r2 = r * r // one
+    sine, cosine = 0, 0
+    for n in range(len(coefficients) - 1, -1, -1):
+        term = coefficients[n] if n % 4 < 2 else -coefficients[n]
+        if n % 2:
+            sine = term + sine * r2 // one
+        else:
+            cosine = term + cosine * r2 // one
+    sine = sine * r // one
+    for _ in range(steps):
+        sine, cosine = 2 * sine * cosine // one, (cosine * cosine - sine * sine) // one
+
+    return [(sine, cosine), (cosine, -sine), (-sine, -cosine), (-cosine, sine)][q % 4]
+
+
+def _atan_fixed(x: int, w: int) -> int:
+    one = 10 ** w
+    if x < 0:
+        return -_atan_fixed(-x, w)
+    if x > one:
+        # atan(x) = pi/2 - atan(1/x)
+        return _pi(w) // 2 - _atan_fixed(one * one // x, w)
+
+    # atan(t) = 2 atan(t / (1 + sqrt(1 + t**2))), s times, then the alternating series
+    steps = _reduction_steps(w)
+    for _ in range(steps):
+        x = x * one // (one + math.isqrt(one * one + x * x))
+    x2 = x * x // one
+    total, term, n, sign = x, x, 1, 1
+    while term:
+        term = term * x2 // one
+        n += 2
+        sign = -sign
+        total += sign * (term // n)
+    return total << steps
+
+
+def _working_digits(places: int, value: Decimal = None) -> int:
+    # small arguments keep their significant digits in fixed point too
+    small = max(-value.adjusted(), 0) if value else 0
+    return places + TRANSCENDENTAL_GUARD_DIGITS + small
+
+
+def exp(value: Decimal, places: int) -> Decimal:
+    '''e ** value rounded half up to `places` decimals.'''
+    # the fixed point result must also hold every integer digit of e ** value
+    integer_digits = max(math.ceil(float(value) * math.log10(math.e)), 0) + 1
+    w = places + TRANSCENDENTAL_GUARD_DIGITS + integer_digits
+    return _from_fixed(_exp_fixed(_to_fixed(value, w), w), w, places)
+
+
+def ln(value: Decimal, places: int) -> Decimal:
+    '''Natural logarithm of a positive Decimal, rounded half up to `places` decimals.'''
+    if value <= 0:
+        raise OperationError(f"❌ Logarithm is only defined for positive values, got {value}")
+    w = _working_digits(places, value)
+    return _from_fixed(_ln_fixed(_to_fixed(value, w), w), w, places)
+
+
+def log10(value: Decimal, places: int) -> Decimal:
+    '''Base 10 logarithm of a positive Decimal, rounded half up to `places` decimals.'''
+    if value <= 0:
+        raise OperationError(f"❌ Logarithm is only defined for positive values, got {value}")
+    # exact powers of ten would otherwise land a guard digit away from a rounding tie
+    _, digits, exponent = value.normalize().as_tuple()
+    if digits == (1,):
+        return _to_decimal(exponent * 10 ** places, places)
+    w = _working_digits(places, value)
+    one = 10 ** w
+    return _from_fixed(_ln_fixed(_to_fixed(value, w), w) * one // _ln10(w), w, places)
+
+
+def sin(value: Decimal, places: int) -> Decimal:
+    '''Sine of an angle in radians, rounded half up to `places` decimals.'''
+    w = _working_digits(places, value)
+    return _from_fixed(_sin_cos_fixed(_to_fixed(value, w), w)[0], w, places)
+
+
+def cos(value: Decimal, places: int) -> Decimal:
+    '''Cosine of an angle in radians, rounded half up to `places` decimals.'''
+    w = _working_digits(places)
+    return _from_fixed(_sin_cos_fixed(_to_fixed(value, w), w)[1], w, places)
+
+
+def atan(value: Decimal, places: int) -> Decimal:
+    '''Arc tangent in radians, rounded half up to `places` decimals.'''
+    w = _working_digits(places, value)
+    return _from_fixed(_atan_fixed(_to_fixed(value, w), w), w, places)
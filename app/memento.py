@@ -1,11 +1,21 @@
-from copy import deepcopy
-import pandas as pd
+import logging
 import os
+import sys
 from app.logger import logger
 from app.exceptions import HistoryError, FileAccessError, DataFormatError
 from colorama import init, Fore, Style
 
-from app.config import CSV_CARETAKER_HISTORY_FILE, CALCULATOR_HISTORY_DIR, CSV_COLUMNS, CALCULATOR_MAX_HISTORY_SIZE
+from app.ring_buffer import RingBuffer
+from app.history_timeline import HistoryTimeline, TimelineMemento
+from app.session_snapshot import state_delta
+from app.history_csv import read_history_csv, write_history_csv, append_history_csv, row_to_entry
+from app.config import (
+    CSV_CARETAKER_HISTORY_FILE,
+    CALCULATOR_HISTORY_DIR,
+    CALCULATOR_MAX_HISTORY_SIZE,
+    CALCULATOR_MAX_UNDO_DEPTH,
+    CALCULATOR_UNDO_MEMORY_BUDGET
+)
 init(autoreset=True) 
 
 #################################################################
@@ -13,13 +23,18 @@ init(autoreset=True)
 #################################################################
 class MementoCalculator:
     #hold snapshop in time
-    def __init__(self, state):
+    # copy=False takes ownership of a list nobody else holds, instead of copying it
+    def __init__(self, state, copy=True):
         try:
 
-            # state set as private variable, deecopy will prevent that the history is modified outside
+            # state set as private variable, the copy prevents that the history is modified outside;
+            # entries are immutable strings, so copying the list is enough
             '''self._state holds a snapshot of the entire history up to the moment the memento is created
             _state: [5+2=7, 3*4=12, 10-1=9]   <-- snapshot of history at this point'''
-            self._state = deepcopy(state)
+            self._state = list(state) if copy else state
+
+            # approximate memory footprint in bytes, used by the caretaker's undo memory budget
+            self.size = sys.getsizeof(self._state) + sum(map(sys.getsizeof, self._state))
             logger.info("✅ Memento succesfully created")
         
         except Exception as e:
@@ -38,19 +53,55 @@ class MementoCalculator:
         IE: M2.get_state() returns ["5 + 2 = 7", "3 * 4 = 12"]
         '''
         try:
-            return deepcopy(self._state)
+            return list(self._state)
         except Exception as e:
             logger.error(f"❌ Failed to get memento state: {e}")
             raise HistoryError(f"❌ Failed to get memento state: {e}") from e
 
+#################################################################
+############ HistoryDiff class
+#################################################################
+class HistoryDiff:
+    '''
+    Summary of a history change for the debug log: "5 -> 4 entries, 1 removed, 0 added".
+    Comparing the histories is O(n), so it is only logged at DEBUG, and computed when the record is
+    formatted. The two histories must not change after they are handed over.
+    '''
+    def __init__(self, old, new):
+        self.old = old
+        self.new = new
+
+    def __str__(self):
+        head, drop, keep, tail = state_delta(list(self.old), list(self.new))
+        return f"{len(self.old)} -> {len(self.new)} entries, {len(self.old) - keep} removed, {len(head) + len(tail)} added"
+
+
 #################################################################
 ############ Originator class
 #################################################################
 class Originator: 
     #the object whose state we want to track, holds the current history and creates or restores mementos
     def __init__(self):
+        # version of the history, bumped once on every change, to tell states apart in the log
+        self.version = 0
         #self.history holds a list of mementos, M1, M2, M3,...
-        self.history = []
+        self._history = RingBuffer(maxlen=CALCULATOR_MAX_HISTORY_SIZE)
+
+    @property
+    def history(self):
+        return self._history
+
+    @history.setter
+    def history(self, entries):
+        '''
+        history is a ring buffer capped at CALCULATOR_MAX_HISTORY_SIZE: appending to a full history
+        evicts the oldest entry in O(1) instead of copying the whole list.
+        Lists assigned to it are wrapped (and trimmed to the most recent entries).
+        '''
+        if isinstance(entries, (list, tuple, RingBuffer)):
+            entries = RingBuffer(entries, maxlen=CALCULATOR_MAX_HISTORY_SIZE)
+        self._history = entries
+        self.version += 1
 
     def create_memento(self):
         # create a new memento that reflect the current history state up to that point in time
@@ -64,7 +115,8 @@ class Originator:
         M3: ["5 + 2 = 7", "3 * 4 = 12", "10 - 1 = 9"]
         '''
         try:
-            return MementoCalculator(self.history)
+            # one copy of the history, owned by the memento
+            return MementoCalculator(list(self.history), copy=False)
         
         except HistoryError as e:
             logger.error(f"❌ Cannot create memento: {e}")
@@ -78,16 +130,16 @@ class Originator:
             if caretaker:
                 caretaker.save_memento(self.create_memento())
 
-            # Add the new operation
-            self.history.append(message)
-            logger.info(f"✅ Operation added to history: {message}")
+            # Add the new operation, the ring buffer drops the oldest one once history is full
+            evicted = self.history.append(message)
+            self.version += 1
+            logger.info("✅ Operation added to history: %s", message)
+
+            if caretaker:
+                caretaker.record_operation(message, self)
 
-            # Trim history if it exceeds max size
-            if len(self.history) > CALCULATOR_MAX_HISTORY_SIZE:
-                excess = len(self.history) - CALCULATOR_MAX_HISTORY_SIZE
-                # keep only the most recent entries
-                self.history = self.history[excess:]  
-                logger.info(f"⚠️ History exceeded max size; removed oldest {excess} operations")
+            if evicted:
+                logger.info("⚠️ History exceeded max size; removed oldest %d operations", len(evicted))
 
         except Exception as e:
             logger.error(f"❌ Failed to add operation to history: {e}")
@@ -101,9 +153,15 @@ class Originator:
         '''
         try:
 
-            old_history = self.history.copy()
-            self.history = memento.get_state()
-            logger.info(f"✅ History restored from memento. Previous: {old_history}, New: {self.history}")
+            # the replaced buffer and the memento's copy are never modified again: the log can keep them
+            old_history, old_version = self.history, self.version
+            new_state = memento.get_state()
+            self.history = new_state
+            logger.info("✅ History restored from memento: version %d -> %d, %d -> %d entries",
+                        old_version, self.version, len(old_history), len(new_state))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("History change: %s", HistoryDiff(old_history, new_state))
+                logger.debug("History before restore: %s, after: %s", old_history, new_state)
 
         except Exception as e:
             logger.error(f"❌ Failed to restore memento: {e}")
@@ -120,20 +178,34 @@ class CareTaker:
     Its job is to store Mementos and let the Originator restore them later.
     It's like a history manager: it keeps track of all the snapshots taken.
     '''
-    def __init__(self):
+    def __init__(self, max_undo_depth=CALCULATOR_MAX_UNDO_DEPTH, undo_memory_budget=CALCULATOR_UNDO_MEMORY_BUDGET):
         '''
         An undo stack is basically a history of previous states stored in a last-in, first-out (LIFO) structure,
         usually implemented as a list or stack. Its purpose is to let you go backward in time—undo actions you’ve performed.
         
         How it works: when you perform operations normally. The undo stack grows; the redo stack is empty.
+
+        The undo stack is a ring buffer: beyond max_undo_depth mementos, or undo_memory_budget bytes,
+        the oldest mementos are evicted so a long-running session stays within a fixed memory envelope.
         '''
-        self.stack_undo = []
+        self.max_undo_depth = max_undo_depth
+        self.undo_memory_budget = undo_memory_budget
+        self.stack_undo = self._new_stack()
 
         '''
         The redo stack keeps track of states you can return to after an undo. It's as “forward history”: after you undo something,
         redo lets you reapply that change. Without a redo stack, once you undo, the undone state is lost.
         '''
-        self.stack_redo = []
+        self.stack_redo = self._new_stack()
+
+        # checkpoints + entry log of the same states, for jumping back many steps at once
+        self.timeline = HistoryTimeline(max_steps=max_undo_depth or None)
+
+        # save watermark: how many entries the last save (or load) wrote, the last of them and
+        # the file it produced, so the next save only has to append what was added since
+        self._saved_count = 0
+        self._saved_last = None
+        self._saved_file = None
         
         try:
 
@@ -145,24 +217,87 @@ class CareTaker:
             logger.error(f"❌ Failed to initialize Caretaker history CSV path  {e}") # pragma: no cover
             raise FileAccessError(f"❌ Failed to initialize Caretaker history CSV path: {e}") # pragma: no cover
 
+    # number of history entries already in the CSV file
+    @property
+    def save_watermark(self):
+        return self._saved_count
+
+    # identity of the CSV file as left by the last save, to notice anyone else changing it
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.log_file)
+            return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            return None
+
+    def _set_watermark(self, history):
+        self._saved_count = len(history)
+        self._saved_last = history[-1] if history else None
+        self._saved_file = self._file_signature()
+
+    # entries added since the last save, or None when the file has to be rewritten: nothing saved
+    # yet, the file changed behind our back, or the saved entries are no longer the start of the
+    # history (trimmed, undone past the watermark, cleared or replaced). Entries carry their
+    # timestamp, so finding the last saved one still at the watermark is taken as proof of that
+    def _unsaved_entries(self, history):
+        watermark = self.save_watermark
+        if not watermark or self._file_signature() != self._saved_file:
+            return None
+        if len(history) < watermark or history[watermark - 1] != self._saved_last:
+            return None
+        return history[watermark:]
+
+    # bounded stack of mementos weighted by their size in bytes
+    def _new_stack(self, mementos=()):
+        return RingBuffer(
+            mementos,
+            maxlen=self.max_undo_depth or None,
+            max_weight=self.undo_memory_budget or None,
+            weight=self._memento_size
+        )
+
+    # mementos without a known size (foreign objects) do not count against the budget
+    @staticmethod
+    def _memento_size(memento):
+        size = getattr(memento, "size", 0)
+        return size if isinstance(size, int) else 0
+
+    # current depth and memory footprint of the undo/redo stacks
+    def stats(self):
+        return {
+            "undo_depth": len(self.stack_undo),
+            "undo_bytes": self.stack_undo.total_weight,
+            "redo_depth": len(self.stack_redo),
+            "redo_bytes": self.stack_redo.total_weight,
+            "evicted": self.stack_undo.evicted,
+            "max_undo_depth": self.max_undo_depth,
+            "undo_memory_budget": self.undo_memory_budget,
+        }
+
     # reformat the calculation as a string following the defined standard
     def recompose_calculation(self, row):
-        return f"{row['timestamp']},{row['operation']},{row['operand1']},{row['operand2']},{row['result']},{row['instance_id']}"
+        return row_to_entry(row)
 
     # save the mememento to the history
     def save_memento(self, memento):
         try:
 
-            self.stack_undo.append(memento)
+            evicted = self.stack_undo.append(memento)
             
             #clear stack redo when a new action is done
             self.stack_redo.clear()
 
-            logger.info(f"Memento saved. Undo stack size: {len(self.stack_undo)}; Redo stack cleared")
+            if evicted:
+                logger.info("⚠️ Undo stack over its limits; evicted oldest %d mementos", len(evicted))
+            logger.info("Memento saved. Undo stack size: %d; Redo stack cleared", len(self.stack_undo))
         except Exception as e:
             logger.exception(f"❌ Failed to save memento: {e}")
             raise HistoryError(f"❌ Failed to save memento: {e}") from e
 
+    # record a calculation just added to the originator's history as a new timeline step
+    def record_operation(self, message, originator):
+        self.timeline.record(message, originator.history)
+
     # undo the memento
     def undo_memento(self, originator):
 
@@ -197,6 +332,7 @@ class CareTaker:
             # Pop the previous state from undo stack and restore it
             memento = self.stack_undo.pop()
             originator.restore_memento(memento)
+            self.timeline.undo()
 
             # Return the last undone operation
             undone_op = None
@@ -245,6 +381,7 @@ class CareTaker:
 
             # restore popped memento from stack_redo to history
             originator.restore_memento(memento)
+            self.timeline.redo()
 
             # Loops through every operation (op) stored in the complete history. builds a new list containing only those operations that are missing from the current state
             redone_operations = [op for op in originator.history if op not in current_state]
@@ -253,7 +390,7 @@ class CareTaker:
             redone_op = redone_operations[-1] if redone_operations else None
 
             if redone_op:
-                logger.info(f"Redo performed. Operation redone: {redone_op}")
+                logger.info("Redo performed. Operation redone: %s", redone_op)
 
             return redone_op
         
@@ -261,6 +398,46 @@ class CareTaker:
             logger.exception(f"❌ Failed to perform redo: {e}")
             raise HistoryError(f"❌ Redo failed: {e}") from e
     
+    # jump back to a past step (or the last step at or before a timestamp) in one go
+    def undo_to(self, originator, step=None, timestamp=None):
+        '''
+        Same result as calling undo_memento until `step` is reached, without restoring every state
+        in between:
+        - the target history is rebuilt from the nearest timeline checkpoint plus replay
+        - the skipped undo mementos are dropped from stack_undo, no state is copied
+        - every skipped step is pushed on stack_redo as a TimelineMemento, so redo still walks
+          forward one step at a time, each rebuilt only when it is redone
+        '''
+        timeline = self.timeline
+        if timestamp is not None:
+            step = timeline.step_at(timestamp)
+
+        steps_back = timeline.position - step
+        if steps_back <= 0:
+            logger.warning(f"❌ Undo to step {step} requested, current step is {timeline.position}")
+            raise HistoryError(f"❌ Nothing to undo: step {step} is not before the current step {timeline.position}")
+        if step < timeline.base_step or steps_back > len(self.stack_undo):
+            earliest = max(timeline.base_step, timeline.position - len(self.stack_undo))
+            logger.warning(f"❌ Undo to step {step} requested, earliest reachable step is {earliest}")
+            raise HistoryError(f"❌ Step {step} is no longer available; earliest reachable step is {earliest}")
+
+        try:
+            target_state = timeline.state_at(step)
+
+            for redo_step in range(timeline.position, step, -1):
+                self.stack_redo.append(TimelineMemento(timeline, redo_step))
+            for _ in range(steps_back):
+                self.stack_undo.pop()
+
+            originator.history = target_state
+            timeline.position = step
+            logger.info(f"✅ Undo to step {step} performed: {steps_back} operations undone")
+            return steps_back
+
+        except Exception as e:
+            logger.exception(f"❌ Failed to perform undo to step {step}: {e}")
+            raise HistoryError(f"❌ Undo to step {step} failed: {e}") from e
+
     # Loads the history from CSV file, only allowed if the history is empty
     def get_loaded_history(self, originator):
         if not os.path.exists(self.log_file) or os.path.getsize(self.log_file) == 0:
@@ -270,9 +447,8 @@ class CareTaker:
         
         if CSV_CARETAKER_HISTORY_FILE:
             try:
-                # CSV_CARETAKER_HISTORY_FILE is a list of operation messages
-                history_df = pd.read_csv(self.log_file, usecols=CSV_COLUMNS)
-                operations = history_df.to_dict(orient="records")
+                # CSV_CARETAKER_HISTORY_FILE is a list of operation messages, parsed row by row
+                operations = list(read_history_csv(self.log_file))
 
                 # Clear current undo/redo stacks
                 self.stack_undo.clear()
@@ -280,13 +456,18 @@ class CareTaker:
 
                 # Reset originator history
                 originator.history.clear()
+                self.timeline.reset()
 
                 logger.info(f"✅ Warning: History loaded into instance successfully")
                 print(f"✅{Fore.GREEN}History loaded into instance successfully.{Style.RESET_ALL}")
 
                 # Add each operation and create a memento
                 for op in operations:
-                    originator.add_operation(self.recompose_calculation(op), caretaker=self)
+                    originator.add_operation(op, caretaker=self)
+
+                # the file holds exactly the history unless loading trimmed it
+                if originator.history == operations:
+                    self._set_watermark(operations)
 
                 logger.info(f"✅ Loaded {len(operations)} operations from {self.log_file}")
                 print(f"✅ {Fore.GREEN}Loaded {len(operations)} operations into history.{Style.RESET_ALL}")
@@ -311,31 +492,51 @@ class CareTaker:
             # Trim history to max size before saving
             history_to_save = originator.history[-CALCULATOR_MAX_HISTORY_SIZE:]
 
-            # Build a list of dictionaries for CSV export
-            csv_rows = []
-            for entry in history_to_save:
-                #  entry is a string like "timestamp,operation,operand1,operand2,result,instance_id"
-                parts = entry.split(",")
-                if len(parts) != len(CSV_COLUMNS):
-                    logger.warning(f"❌ Skipping unproperly formatted entry: {entry}")
-                    continue
-                row_dict = dict(zip(CSV_COLUMNS, parts))
-                csv_rows.append(row_dict)
-
-            # Convert to DataFrame
-            df = pd.DataFrame(csv_rows, columns=CSV_COLUMNS)
-
             # Ensure directory exists
             os.makedirs(CALCULATOR_HISTORY_DIR, exist_ok=True)
 
-            # Save to CSV
-            df.to_csv(self.log_file, index=False)
-            logger.info(f"✅ Saved {len(csv_rows)} operations to CSV: {self.log_file}")
-            print(f"✅ {Fore.GREEN}Saved {len(csv_rows)} operations to CSV.{Style.RESET_ALL}")
+            new_entries = self._unsaved_entries(history_to_save)
+            if new_entries is None:
+                # Rewrite the whole file, atomically
+                skipped = write_history_csv(self.log_file, history_to_save)
+                saved = len(history_to_save) - len(skipped)
+                logger.info(f"✅ Saved {saved} operations to CSV: {self.log_file}")
+                print(f"✅ {Fore.GREEN}Saved {saved} operations to CSV.{Style.RESET_ALL}")
+            else:
+                # Append only what was added since the last save
+                skipped = append_history_csv(self.log_file, new_entries)
+                saved = len(new_entries) - len(skipped)
+                logger.info(f"✅ Saved {saved} new operations to CSV after the {self.save_watermark} already saved: {self.log_file}")
+                print(f"✅ {Fore.GREEN}Saved {saved} new operations to CSV.{Style.RESET_ALL}")
 
-        except Exception as e: # pragma: no cover
-            logger.exception(f"❌ Failed to save history to CSV: {e}") # pragma: no cover
-            raise FileAccessError(f"❌ Failed to save history to CSV: {e}") from e # pragma: no cover
+            for entry in skipped:
+                logger.warning(f"❌ Skipping unproperly formatted entry: {entry}")
+            self._set_watermark(history_to_save)
+
+        except Exception as e:
+            logger.exception(f"❌ Failed to save history to CSV: {e}")
+            raise FileAccessError(f"❌ Failed to save history to CSV: {e}") from e
+
+    # plain snapshot of the history and both stacks (see app/session_snapshot.py for the on-disk form)
+    def export_state(self, originator):
+        return {
+            "history": list(originator.history),
+            "undo": [memento.get_state() for memento in self.stack_undo],
+            "redo": [memento.get_state() for memento in self.stack_redo],
+        }
+
+    # restore a snapshot produced by export_state
+    def import_state(self, originator, state):
+        try:
+            originator.history = list(state["history"])
+            # history entries are immutable strings: a shallow list per memento instead of a deepcopy
+            self.stack_undo = self._new_stack(MementoCalculator(list(s), copy=False) for s in state["undo"])
+            self.stack_redo = self._new_stack(MementoCalculator(list(s), copy=False) for s in state["redo"])
+            self.timeline.reset(originator.history)
+            logger.info(f"✅ Session state restored: {len(originator.history)} entries, {len(self.stack_undo)} undo, {len(self.stack_redo)} redo")
+        except (KeyError, TypeError) as e:
+            logger.error(f"❌ Invalid session state: {e}")
+            raise DataFormatError(f"❌ Invalid session state: {e}") from e
 
     # delete saved history
     def delete_saved_history(self, originator):
@@ -356,6 +557,8 @@ class CareTaker:
             # Clear undo/redo stacks
             self.stack_undo.clear()
             self.stack_redo.clear()
+            self.timeline.reset()
+            self._set_watermark([])
 
             print(f"✅ Saved history succesfully deleted")
 
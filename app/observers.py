@@ -1,6 +1,12 @@
 
+import atexit
+import csv
 import os
-import pandas as pd
+import shutil
+import threading
+import weakref
+import time
+from datetime import datetime
 from decimal import Decimal
 from app.logger import logger
 from app.config import (
@@ -9,22 +15,56 @@ from app.config import (
     CALCULATOR_HISTORY_DIR,
     CSV_HISTORY_FILE,
     TXT_HISTORY_FILE,
-    CSV_COLUMNS
+    CSV_COLUMNS,
+    CALCULATOR_OBSERVER_BATCH_SIZE,
+    CALCULATOR_OBSERVER_FLUSH_INTERVAL,
+    CALCULATOR_LOG_BATCH_SIZE,
+    CALCULATOR_LOG_FLUSH_INTERVAL,
+    CALCULATOR_LOG_FSYNC
 )
 import json
 
 from app.exceptions import FileAccessError
 
+# pandas is optional and imported on first use (it loads numpy): only AutosaveObserver.df needs it,
+# saving and loading history use the csv module
+def _pandas():
+    try:
+        import pandas
+    except ImportError: # pragma: no cover
+        raise FileAccessError("❌ AutosaveObserver.df needs pandas, install it with pip install pandas")
+    return pandas
+
 
 
 ##############################################################
 ############### LoggingObserver
 ##############################################################
+# observers with a buffered log file, flushed one last time when the interpreter exits
+_open_logging_observers = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_logging_observers(): # pragma: no cover
+    for observer in list(_open_logging_observers):
+        observer.close()
+
+
 class LoggingObserver:
     '''
-    Logs each new operation to a JSON file
+    Logs each new operation to a JSON-lines file.
+
+    Writes are group-committed: the file is kept open and records are buffered, then written
+    together once batch_size records are waiting or flush_interval seconds have passed.
+    fsync_policy trades durability against throughput:
+    - none:  batches are handed to the OS, never fsync'ed
+    - batch: one fsync per written batch
+    - every: every record is written and fsync'ed as soon as it arrives
     '''
-    def __init__(self, log_file=TXT_HISTORY_FILE):
+    FSYNC_POLICIES = ("none", "batch", "every")
+
+    def __init__(self, log_file=TXT_HISTORY_FILE, batch_size=CALCULATOR_LOG_BATCH_SIZE,
+                 flush_interval=CALCULATOR_LOG_FLUSH_INTERVAL, fsync_policy=CALCULATOR_LOG_FSYNC):
         try:
 
             # Ensure the history directory exists
@@ -37,20 +77,90 @@ class LoggingObserver:
             logger.error(f"❌ Failed to initialize LoggingObserver  {e}")
             raise FileAccessError(f"❌ Failed to create log directory: {e}")
 
-    # method that appends new calculation to JSON file
+        if fsync_policy not in self.FSYNC_POLICIES:
+            raise ValueError(f"Invalid fsync policy '{fsync_policy}', expected one of {', '.join(self.FSYNC_POLICIES)}")
+
+        self.fsync_policy = fsync_policy
+        self.batch_size = 1 if fsync_policy == "every" else max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.buffer = []
+        self._file = None
+        self._timer = None
+        self._lock = threading.RLock()
+        _open_logging_observers.add(self)
+
+    # method that buffers a new calculation for the JSON file
     def update(self,  message):
         if not message:
             logger.warning("❌ Logging Observer attempted to save new calculation. Caclulation data unavailable.")
             return
-        
 
+        with self._lock:
+            self.buffer.append(json.dumps(message) + "\n")
+            if len(self.buffer) >= self.batch_size:
+                self.flush()
+            else:
+                self._schedule_flush()
+
+    # method that appends a batch of calculations with a single write
+    def update_many(self, messages):
+        messages = [m for m in messages if m]
+        if not messages:
+            return
+
+        with self._lock:
+            self.buffer.extend(json.dumps(m) + "\n" for m in messages)
+            self.flush()
+
+    # start the timer that writes a partial batch after flush_interval seconds
+    def _schedule_flush(self):
+        if self._timer is None and self.flush_interval and self.flush_interval > 0:
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    # method that writes every buffered record to the JSON file
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            if not self.buffer:
+                return
+
+            try:
+                if self._file is None:
+                    self._file = open(self.log_file, "a",encoding=CALCULATOR_DEFAULT_ENCODING)
+
+                self._file.write("".join(self.buffer))
+                self._file.flush()
+                if self.fsync_policy != "none":
+                    os.fsync(self._file.fileno())
+
+                logger.info("✅ Logging Observer saved %d calculations to %s", len(self.buffer), self.log_file)
+                self.buffer = []
+
+            except Exception as e:
+                # keep the records for the next flush and reopen the file then
+                logger.error(f"❌ LoggingObserver failed to save: {e}")
+                self._close_file()
+
+    def _close_file(self):
         try:
-            with open(self.log_file, "a",encoding=CALCULATOR_DEFAULT_ENCODING) as file:
-                file.write(json.dumps(message) + "\n")
-                logger.info(f"✅ Logging Observer saved new calculation to {self.log_file}")
-        
-        except Exception as e:
-            logger.error(f"❌ LoggingObserver failed to save: {e}")
+            if self._file is not None:
+                self._file.close()
+        except Exception as e: # pragma: no cover
+            logger.error(f"❌ LoggingObserver failed to close {self.log_file}: {e}")
+        finally:
+            self._file = None
+
+    # method that writes what is left and releases the file
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._close_file()
+        _open_logging_observers.discard(self)
 
 
 
@@ -60,6 +170,10 @@ class LoggingObserver:
 class AutosaveObserver:
     '''
     Logs each new operation to a CSV file
+
+    Start-up only checks the header and the end of the file: new rows are appended, and the rows
+    already on disk are read into `df` only when someone asks for it. A file with other columns is
+    moved aside, and one ending in a torn row is copied aside before the row is cut off.
     '''
 
     def __init__(self, log_file=CSV_HISTORY_FILE):
@@ -72,49 +186,226 @@ class AutosaveObserver:
             
             # If the file doesn't exist or is empty, create a new one
             if not os.path.exists(self.log_file) or os.path.getsize(self.log_file) == 0:
-                self.df = pd.DataFrame(columns=CSV_COLUMNS)
-                self.df.to_csv(self.log_file, index=False)
+                with open(self.log_file, "w", encoding=CALCULATOR_DEFAULT_ENCODING, newline="") as file:
+                    csv.writer(file, lineterminator="\n").writerow(CSV_COLUMNS)
                 logger.info(f"✅ AutosaveObserver initialized new file: {self.log_file}")
+            elif not self._check_header():
+                self._start_new_file()
             else:
-                self.df = pd.read_csv(self.log_file)
+                self._drop_torn_row()
                 logger.info(f"✅ AutosaveObserver loaded existing file: {self.log_file}")
         
         except Exception as e:
             logger.error("❌ Failed to initialize AutosaveObserver.")
             raise FileAccessError(f"❌ Error initializing AutosaveObserver: {e}")
 
-
-    #method that adds the new calculation log to pandas df then to CSV
+        # rows on disk are loaded on first access to df; rows added since are kept for it
+        self._df = None
+        self._new_rows = []
+
+        # serializes appends when calculators on several threads share this observer
+        self._lock = threading.Lock()
+
+    # the first line must hold the expected columns, or appended rows would not line up
+    def _check_header(self):
+        with open(self.log_file, encoding=CALCULATOR_DEFAULT_ENCODING, newline="") as file:
+            header = next(csv.reader(file), [])
+        if header != CSV_COLUMNS:
+            logger.warning(f"⚠️ Unexpected header {header} in {self.log_file}, expected {CSV_COLUMNS}")
+            return False
+        return True
+
+    # name of a copy of the file kept aside, e.g. history_log.csv.header-20251021_100000.bak
+    def _backup_path(self, reason):
+        return f"{self.log_file}.{reason}-{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.bak"
+
+    # a file with other columns is the user's: move it aside untouched and start a new one
+    def _start_new_file(self):
+        backup = self._backup_path("header")
+        os.replace(self.log_file, backup)
+        with open(self.log_file, "w", encoding=CALCULATOR_DEFAULT_ENCODING, newline="") as file:
+            csv.writer(file, lineterminator="\n").writerow(CSV_COLUMNS)
+        logger.warning(f"⚠️ AutosaveObserver moved {self.log_file} to {backup} and started a new file")
+
+    # whether the last line of the file, without its newline, is the header or a whole row
+    def _is_complete_line(self, line):
+        try:
+            fields = next(csv.reader([line.decode(CALCULATOR_DEFAULT_ENCODING)]), [])
+        except (UnicodeDecodeError, csv.Error):
+            return False
+        return fields == CSV_COLUMNS or len(fields) == len(CSV_COLUMNS)
+
+    # a crash in the middle of an append leaves a row without its newline: cut it off, after
+    # copying the file as it was. A header or a whole row only missing its newline gets the
+    # newline instead, and the header line is never cut
+    def _drop_torn_row(self):
+        with open(self.log_file, "rb+") as file:
+            size = file.seek(0, os.SEEK_END)
+            position = size
+            while position > 0:
+                step = min(4096, position)
+                file.seek(position - step)
+                block = file.read(step)
+                newline = block.rfind(b"\n")
+                if newline != -1:
+                    position = position - step + newline + 1
+                    break
+                position -= step
+
+            if position == size:
+                return
+            file.seek(position)
+            if position == 0 or self._is_complete_line(file.read()):
+                file.seek(0, os.SEEK_END)
+                file.write(b"\n")
+                logger.warning(f"⚠️ AutosaveObserver added the missing newline at the end of {self.log_file}")
+            else:
+                backup = self._backup_path("torn")
+                shutil.copyfile(self.log_file, backup)
+                file.truncate(position)
+                logger.warning(f"⚠️ AutosaveObserver dropped an incomplete row at the end of {self.log_file}, original kept in {backup}")
+
+    # every row of the file plus the ones added since start-up, read on first use
+    @property
+    def df(self):
+        pd = _pandas()
+        with self._lock:
+            if self._df is None:
+                if os.path.exists(self.log_file) and os.path.getsize(self.log_file) > 0:
+                    rows = pd.read_csv(self.log_file)
+                else:
+                    rows = pd.DataFrame(columns=CSV_COLUMNS)
+                if self._new_rows and not CALCULATOR_AUTO_SAVE:
+                    rows = pd.concat([rows, pd.DataFrame(self._new_rows, columns=CSV_COLUMNS)], ignore_index=True)
+                self._df = rows
+                self._new_rows = []
+                logger.debug("AutosaveObserver read %d rows from %s", len(rows), self.log_file)
+            return self._df
+
+    # append rows to the CSV (when auto-save is on) and to df if it was already loaded
+    def _append(self, messages):
+        rows = [[message.get(column) for column in CSV_COLUMNS] for message in messages]
+
+        if CALCULATOR_AUTO_SAVE:
+            try:
+                with open(self.log_file, "a", encoding=CALCULATOR_DEFAULT_ENCODING, newline="") as file:
+                    csv.writer(file, lineterminator="\n").writerows(rows)
+                logger.info("✅ AutosaveObserver auto-saved %d operations", len(rows))
+            except Exception as e:
+                logger.error(f"❌ AutosaveObserver failed to save: {e}")
+
+        if self._df is not None:
+            pd = _pandas()
+            self._df = pd.concat([self._df, pd.DataFrame(rows, columns=CSV_COLUMNS)], ignore_index=True)
+        elif not CALCULATOR_AUTO_SAVE:
+            # not on disk: df has to get them from memory
+            self._new_rows.extend(rows)
+
+    #method that adds the new calculation to the CSV
     def update(self, message):
+        if not message:
+            logger.warning("❌ No data to save in AutosaveObserver.")
+            return
 
-        try:
+        with self._lock:
+            try:
+                self._append([message])
+            except Exception as e:
+                logger.error(f"❌ Error updating AutosaveObserver: {e}")
+                raise FileAccessError(f"❌ Error in AutosaveObserver: {e}")
+
+    #method that adds a batch of calculations to the CSV with a single write
+    def update_many(self, messages):
+        messages = [m for m in messages if m]
+        if not messages:
+            return
 
-            if not message:
-                logger.warning("❌ No data to save in AutosaveObserver.")
-                return
-            
+        with self._lock:
+            try:
+                self._append(messages)
+            except Exception as e:
+                logger.error(f"❌ Error updating AutosaveObserver: {e}")
+                raise FileAccessError(f"❌ Error in AutosaveObserver: {e}")
 
-            #create new data row in pandas
-            new_row = pd.DataFrame([message])
 
-            #add new row to df
-            self.df = pd.concat([self.df, new_row], ignore_index=True)
 
-            # Only save automatically if enabled
-            if CALCULATOR_AUTO_SAVE:
-                try:
+##############################################################
+############### BatchingObserver
+##############################################################
+class BatchingObserver:
+    '''
+    Shared observer pipeline: collects messages from any number of calculators and hands them to
+    the wrapped observers in batches, when batch_size messages are waiting or flush_interval
+    seconds have passed since the oldest one arrived.
+    '''
+    def __init__(self, observers, batch_size=CALCULATOR_OBSERVER_BATCH_SIZE, flush_interval=CALCULATOR_OBSERVER_FLUSH_INTERVAL):
+        self.observers = list(observers)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.buffer = []
+        self._oldest = None
+        self._lock = threading.Lock()
+        # serializes flushes so batches reach the files in arrival order
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._flusher = None
+
+        if self.flush_interval and self.flush_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_periodically, name="observer-flusher", daemon=True)
+            self._flusher.start()
+
+        logger.info(f"✅ BatchingObserver initialized: batch size {self.batch_size}, flush interval {self.flush_interval}s")
 
-                    self.df.to_csv(self.log_file, index=False, encoding=CALCULATOR_DEFAULT_ENCODING)
+    def update(self, message):
+        if not message:
+            logger.warning("❌ BatchingObserver received an empty message.")
+            return
 
-                    logger.info(f"✅ AutosaveObserver auto-saved operation: {message}")
+        with self._lock:
+            self.buffer.append(message)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            full = len(self.buffer) >= self.batch_size
 
-                except Exception as e:
-                    logger.error(f"❌ AutosaveObserver failed to save: {e}")
+        if full:
+            self.flush()
 
-            
-        except Exception as e:
-            logger.error(f"❌ Error updating AutosaveObserver: {e}")
-            raise FileAccessError(f"❌ Error in AutosaveObserver: {e}")
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                batch, self.buffer = self.buffer, []
+                self._oldest = None
+
+            if not batch:
+                return
+
+            for observer in self.observers:
+                try:
+                    if hasattr(observer, "update_many"):
+                        observer.update_many(batch)
+                    else:
+                        for message in batch:
+                            observer.update(message)
+                except Exception as e:
+                    # one failing observer must not stop the others
+                    logger.error(f"❌ BatchingObserver failed to deliver {len(batch)} messages to {observer.__class__.__name__}: {e}")
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval / 2):
+            with self._lock:
+                due = self._oldest is not None and time.monotonic() - self._oldest >= self.flush_interval
+            if due:
+                self.flush()
+
+    def close(self):
+        self._closed.set()
+        if self._flusher:
+            self._flusher.join()
+        self.flush()
+        for observer in self.observers:
+            if hasattr(observer, "close"):
+                observer.close()
+        logger.info("✅ BatchingObserver closed")
 
     
 
@@ -0,0 +1,227 @@
+# app/operation_registry.py
+import importlib
+import os
+import string
+import sys
+import threading
+from importlib.metadata import entry_points
+from app.logger import logger
+from app.exceptions import CommandError, OperationError
+from app.config import CALCULATOR_PLUGIN_DIR
+
+# entry point group third-party packages use to register operations
+ENTRY_POINT_GROUP = "calculator.operations"
+
+# menu letters of the calculator's own commands (history, undo, ...), never given to operations
+RESERVED_LETTERS = set("KLMNOPQRSTUVW")
+
+
+# single letters first, then keys such as "EXP"
+def menu_order(key):
+    return (len(key), key)
+
+
+##############################################################
+############### OperationSpec
+##############################################################
+class OperationSpec:
+    '''
+    Metadata of one calculation, known before its implementation is imported.
+
+    op_code:       name used by CommandFactory, the server and the REPL, e.g. "add"
+    target:        "package.module:ClassName" of a CalculationTemplate subclass (imported on first
+                   use), or the class itself
+    name:          label shown in the menu
+    symbol:        operator shown in logs, e.g. "+"
+    menu_letter:   REPL menu key, a letter or a short word such as "EXP"; None = next free letter
+    validators:    callables validator(a, b) raising ValidationError, run before the calculation
+    batch_capable: the operation can be applied to a sequence of operands (used by reductions)
+    '''
+    def __init__(self, op_code, target, name=None, symbol="?", menu_letter=None, validators=(), batch_capable=False):
+        self.op_code = op_code.lower()
+        self.target = target
+        self.name = name or op_code
+        self.symbol = symbol
+        self.menu_letter = menu_letter.upper() if menu_letter else None
+        self.validators = tuple(validators)
+        self.batch_capable = batch_capable
+        self._operation_class = None if isinstance(target, str) else target
+
+    @property
+    def loaded(self):
+        return self._operation_class is not None
+
+    # "module:Class" of the implementation, to recognise instances that were built directly
+    @property
+    def target_path(self):
+        if isinstance(self.target, str):
+            return self.target
+        return f"{self.target.__module__}:{self.target.__qualname__}"
+
+    # import the implementation on first use
+    def load(self):
+        if self._operation_class is None:
+            module_name, _, attribute = self.target.partition(":")
+            try:
+                operation_class = getattr(importlib.import_module(module_name), attribute)
+            except (ImportError, AttributeError) as e:
+                logger.error(f"❌ Failed to load operation '{self.op_code}' from {self.target}: {e}")
+                raise OperationError(f"❌ Failed to load operation '{self.op_code}': {e}") from e
+            self._operation_class = operation_class
+            logger.info("✅ Operation '%s' loaded from %s", self.op_code, self.target)
+        return self._operation_class
+
+    def create(self):
+        operation = self.load()()
+        operation.symbol = self.symbol
+        if self.validators:
+            operation.validators = self.validators
+        return operation
+
+    def __repr__(self):
+        return f"OperationSpec({self.op_code!r}, {self.target_path!r}, menu_letter={self.menu_letter!r})"
+
+
+##############################################################
+############### OperationRegistry
+##############################################################
+class OperationRegistry:
+    '''
+    Catalog of the calculations the calculator offers, keyed by op code.
+
+    The built-in operations are registered below; plugins add more through
+    - entry points in the "calculator.operations" group, each pointing to a register(registry) function
+    - *.py files in CALCULATOR_PLUGIN_DIR defining register(registry); the directory is put on
+      sys.path, so specs can target implementations kept in its sub-packages, e.g.
+      plugins/geometry.py registering "shapes.hypot:Hypotenuse" from plugins/shapes/hypot.py
+
+    Plugins are discovered once, on first use of the registry. Registering an operation imports
+    nothing: its implementation module is imported the first time the operation is created.
+    '''
+    def __init__(self, plugin_dir=CALCULATOR_PLUGIN_DIR, entry_point_group=ENTRY_POINT_GROUP):
+        self.plugin_dir = plugin_dir
+        self.entry_point_group = entry_point_group
+        self._specs = {}
+        self._discovered = False
+        self._lock = threading.RLock()
+
+    # ----------------- Registration -----------------
+
+    def register(self, op_code, target, **metadata):
+        spec = op_code if isinstance(op_code, OperationSpec) else OperationSpec(op_code, target, **metadata)
+        with self._lock:
+            if spec.op_code in self._specs:
+                raise CommandError(f"❌ Operation '{spec.op_code}' is already registered")
+
+            used = {s.menu_letter for s in self._specs.values()} | RESERVED_LETTERS
+            if spec.menu_letter is None:
+                free = [letter for letter in string.ascii_uppercase if letter not in used]
+                if not free:
+                    raise CommandError(f"❌ No free menu letter left for operation '{spec.op_code}'")
+                spec.menu_letter = free[0]
+            elif spec.menu_letter in used:
+                raise CommandError(f"❌ Menu letter '{spec.menu_letter}' of operation '{spec.op_code}' is already taken")
+
+            self._specs[spec.op_code] = spec
+        logger.debug("Operation '%s' registered on menu letter %s", spec.op_code, spec.menu_letter)
+        return spec
+
+    # ----------------- Discovery -----------------
+
+    def discover(self):
+        with self._lock:
+            if self._discovered:
+                return
+            self._discovered = True
+            for name, register in self._plugin_entry_points() + self._plugin_files():
+                try:
+                    register(self)
+                    logger.info(f"✅ Operation plugin loaded: {name}")
+                except Exception as e:
+                    # a broken plugin must not take the calculator down
+                    logger.error(f"❌ Operation plugin {name} failed to register: {e}")
+
+    def _plugin_entry_points(self):
+        try:
+            found = entry_points(group=self.entry_point_group)
+        except Exception as e: # pragma: no cover
+            logger.error(f"❌ Failed to read operation entry points: {e}")
+            return []
+        return [(f"entry point {ep.name}", lambda registry, ep=ep: ep.load()(registry)) for ep in found]
+
+    def _plugin_files(self):
+        if not self.plugin_dir or not os.path.isdir(self.plugin_dir):
+            return []
+        plugin_dir = os.path.abspath(self.plugin_dir)
+        if plugin_dir not in sys.path:
+            sys.path.append(plugin_dir)
+
+        plugins = []
+        for file_name in sorted(os.listdir(plugin_dir)):
+            if not file_name.endswith(".py") or file_name.startswith("_"):
+                continue
+            module_name = file_name[:-3]
+            plugins.append((f"file {file_name}", lambda registry, module_name=module_name: importlib.import_module(module_name).register(registry)))
+        return plugins
+
+    # ----------------- Lookup -----------------
+
+    def get(self, op_code):
+        self.discover()
+        spec = self._specs.get(str(op_code).lower())
+        if spec is None:
+            raise CommandError(f"❌ Command '{op_code}' not allowed. Allowed commands: {self.names()}")
+        return spec
+
+    def create(self, op_code):
+        return self.get(op_code).create()
+
+    def __contains__(self, op_code):
+        self.discover()
+        return str(op_code).lower() in self._specs
+
+    def __iter__(self):
+        self.discover()
+        return iter(list(self._specs.values()))
+
+    def names(self):
+        return [spec.name for spec in self]
+
+    # menu letter -> [label, op_code], in the format of Calculator.operations_dictionary
+    def menu(self):
+        return {spec.menu_letter: [spec.name, spec.op_code] for spec in sorted(self, key=lambda s: menu_order(s.menu_letter))}
+
+    # operator symbol of an operation class, whether it was created through the registry or not
+    def symbol_for(self, operation_class):
+        path = f"{operation_class.__module__}:{operation_class.__qualname__}"
+        for spec in self:
+            if spec._operation_class is operation_class or spec.target_path == path:
+                return spec.symbol
+        return "?"
+
+
+##############################################################
+############### Built-in operations
+##############################################################
+registry = OperationRegistry()
+
+for op_code, class_name, name, symbol, letter, batch_capable in [
+    ("percentage", "Percentage", "Percentage", "%", "A", False),
+    ("modulo", "Modulo", "Modulo", "%", "B", False),
+    ("multiplication", "Multiplication", "Multiplication", "*", "C", True),
+    ("root", "Root", "Root", "root", "D", False),
+    ("absdiff", "Absdifference", "Absolute Difference", "|a-b|", "E", False),
+    ("intdiff", "IntegerDivision", "Integer Division", "//", "F", False),
+    ("add", "Addition", "Addition", "+", "G", True),
+    ("subtract", "Subtraction", "Subtraction", "-", "H", False),
+    ("div", "Division", "Division", "/", "I", False),
+    ("power", "Power", "Power", "**", "J", False),
+    # functions of one operand, keyed by name rather than letter
+    ("exp", "Exp", "Exponential", "exp", "EXP", False),
+    ("ln", "NaturalLog", "Natural Logarithm", "ln", "LN", False),
+    ("log10", "Log10", "Logarithm Base 10", "log10", "LOG", False),
+    ("sin", "Sine", "Sine", "sin", "SIN", False),
+    ("cos", "Cosine", "Cosine", "cos", "COS", False),
+    ("atan", "ArcTangent", "Arc Tangent", "atan", "ATAN", False),
+]:
+    registry.register(op_code, f"app.calculation:{class_name}", name=name, symbol=symbol, menu_letter=letter, batch_capable=batch_capable)
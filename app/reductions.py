@@ -0,0 +1,249 @@
+# app/reductions.py
+import re
+from abc import ABC, abstractmethod
+from decimal import Decimal, ROUND_HALF_UP, localcontext
+from app.logger import logger
+from app.exceptions import ValidationError, OperationError, CommandError
+from app.config import CALCULATOR_PRECISION, CALCULATOR_MAX_RESULT_DIGITS
+from app.calculation import calculation_context, INTEGER_DIGITS
+from app.input_validators import parse_operand
+from app.operation_registry import registry
+
+# extra significant digits carried by running products, cover the rounding of up to 10**9 steps
+GUARD_DIGITS = 10
+
+
+##############################################################
+############### ReductionTemplate
+##############################################################
+class ReductionTemplate(ABC):
+    '''
+    N-ary calculation over an iterable of operands, e.g. the sum of a list.
+
+    Operands are consumed one at a time, so a generator or a file can be reduced in constant
+    memory. Every operand goes through parse_operand and is rounded to CALCULATOR_PRECISION like
+    the operands of a binary calculation, and the result is rounded once, at the end.
+    '''
+
+    def _round(self, value: Decimal) -> Decimal:
+        return value.quantize(Decimal(f"1.{'0'*CALCULATOR_PRECISION}"), rounding=ROUND_HALF_UP)
+
+    # validated, rounded operands, one at a time
+    def operands(self, values):
+        for value in values:
+            yield self._round(parse_operand(value))
+
+    @abstractmethod
+    def runReduction(self, operands) -> tuple[Decimal, int]: # pragma: no cover
+        '''
+        Consumes the rounded operands and returns (result, number of operands).
+        Raises ValidationError if there are not enough operands.
+        '''
+        pass
+
+    def reduce(self, values) -> tuple[Decimal, int]:
+        # ValidationError reaches the caller as is, like in CalculationTemplate.calculate
+        try:
+            with localcontext(calculation_context(INTEGER_DIGITS)) as context:
+                result, count = self.runReduction(self.operands(values))
+                # room for every integer digit of the result, e.g. a long product
+                context.prec = max(context.prec, result.adjusted() + 1 + CALCULATOR_PRECISION)
+                result = self._round(result)
+        except ValidationError:
+            raise
+        except Exception as e:
+            logger.exception("❌ Unexpected error during reduction.")
+            raise OperationError(f"❌ Unexpected error: {e}")
+
+        logger.info("✅ %s performed on %d operands = %s", self.name, count, result)
+        return result, count
+
+    @property
+    def name(self) -> str:
+        return self.__class__.__name__
+
+    # running results are computed exactly while that takes fewer digits than the ceiling, sized
+    # from the operands like the digit budget of Power's exact path; the precision never goes below
+    # the calculation's own plus guard digits, for inexact operations. Past the ceiling a rounding
+    # error is relative and later factors scale it up with the result, so the ceiling covers the
+    # largest result allowed, not the current one
+    @staticmethod
+    def _ceiling() -> int:
+        return CALCULATOR_MAX_RESULT_DIGITS + CALCULATOR_PRECISION + GUARD_DIGITS
+
+    # digits of an operand's coefficient: operands are rounded to CALCULATOR_PRECISION decimals
+    @staticmethod
+    def _digits(operand: Decimal) -> int:
+        return operand.adjusted() + CALCULATOR_PRECISION + 1
+
+    # precision of one step of a fold, a op b, enough for their exact product or sum. a_digits
+    # bounds the coefficient of the running result a (the previous step's precision): reading its
+    # digits would cost as much as the operation
+    def _step_precision(self, floor: int, a: Decimal, a_digits: int, b: Decimal) -> int:
+        a_adjusted, b_adjusted = a.adjusted(), b.adjusted()
+        lowest = min(a_adjusted - a_digits + 1, -CALCULATOR_PRECISION)
+        exact = max(a_digits + self._digits(b), max(a_adjusted, b_adjusted) - lowest + 2)
+        return min(max(floor, exact), self._ceiling())
+
+    # reject a running result past the digit budget, before more CPU is spent on it
+    def _check_budget(self, accumulator: Decimal, count: int):
+        if accumulator.adjusted() + 1 > CALCULATOR_MAX_RESULT_DIGITS:
+            logger.error(f"❌ {self.name} rejected after {count} operands: more than {CALCULATOR_MAX_RESULT_DIGITS} digits")
+            raise ValidationError(f"❌ Result would have more than the allowed {CALCULATOR_MAX_RESULT_DIGITS} digits")
+
+    def _require(self, count: int, minimum: int = 1):
+        if count < minimum:
+            logger.error(f"❌ {self.name} needs at least {minimum} operand(s), got {count}")
+            raise ValidationError(f"❌ {self.name} needs at least {minimum} operand(s), got {count}")
+
+
+##################################################################################################################
+################## reductions
+##################################################################################################################
+class Sum(ReductionTemplate):
+
+    # operands have CALCULATOR_PRECISION decimals, so the running sum is exact
+    def runReduction(self, operands):
+        total, count = Decimal(0), 0
+        for operand in operands:
+            total += operand
+            count += 1
+        self._require(count)
+        return total, count
+
+
+class Product(ReductionTemplate):
+
+    def runReduction(self, operands):
+        product, count = Decimal(1), 0
+        with localcontext() as context:
+            context.prec += GUARD_DIGITS
+            ceiling, digits = self._ceiling(), 1
+            for operand in operands:
+                # the exact product has at most the digits of its factors
+                digits += self._digits(operand)
+                if digits > context.prec and context.prec < ceiling:
+                    context.prec = min(digits, ceiling)
+                product *= operand
+                count += 1
+                self._check_budget(product, count)
+        self._require(count)
+        return product, count
+
+
+class Mean(ReductionTemplate):
+
+    def runReduction(self, operands):
+        total, count = Sum().runReduction(operands)
+        return total / count, count
+
+
+class Minimum(ReductionTemplate):
+
+    def runReduction(self, operands):
+        result, count = None, 0
+        for operand in operands:
+            if result is None or operand < result:
+                result = operand
+            count += 1
+        self._require(count)
+        return result, count
+
+
+class Maximum(ReductionTemplate):
+
+    def runReduction(self, operands):
+        result, count = None, 0
+        for operand in operands:
+            if result is None or operand > result:
+                result = operand
+            count += 1
+        self._require(count)
+        return result, count
+
+
+class StandardDeviation(ReductionTemplate):
+    '''
+    Sample standard deviation (n - 1 denominator). Sum and sum of squares are exact, so the
+    variance n*sum(x²) - sum(x)² has no cancellation error however close the operands are.
+    '''
+    def runReduction(self, operands):
+        total, squares, count = Decimal(0), Decimal(0), 0
+        with localcontext() as context:
+            context.prec += CALCULATOR_PRECISION + GUARD_DIGITS
+            for operand in operands:
+                total += operand
+                squares += operand * operand
+                count += 1
+            self._require(count, 2)
+            variance = (count * squares - total * total) / (count * (count - 1))
+            return variance.sqrt(), count
+
+
+##############################################################
+############### FoldReduction
+##############################################################
+class FoldReduction(ReductionTemplate):
+    '''
+    Any batch-capable operation of the registry, applied left to right: a1 op a2 op a3 ...
+    The operation's validators run on every step; the running result is not limited to
+    CALCULATOR_MAX_INPUT_VALUE, it is a result, not an operand typed in.
+    '''
+    def __init__(self, spec):
+        self.spec = spec
+        self.operation = spec.create()
+
+    @property
+    def name(self) -> str:
+        return self.operation.__class__.__name__
+
+    def runReduction(self, operands):
+        result, count = None, 0
+        with localcontext() as context:
+            floor, digits = context.prec + GUARD_DIGITS, 0
+            for operand in operands:
+                count += 1
+                if result is None:
+                    result, digits = operand, self._digits(operand)
+                    continue
+                for validator in self.operation.validators:
+                    validator(result, operand)
+                context.prec = digits = self._step_precision(floor, result, digits, operand)
+                result = self.operation.runOperation(result, operand)
+                self._check_budget(result, count)
+        self._require(count)
+        return result, count
+
+
+# reduction code -> class
+REDUCTIONS = {
+    "sum": Sum,
+    "product": Product,
+    "mean": Mean,
+    "min": Minimum,
+    "max": Maximum,
+    "stddev": StandardDeviation,
+}
+
+
+def create_reduction(op_code: str) -> ReductionTemplate:
+    '''
+    op_code: one of REDUCTIONS, or the code of a batch-capable operation of the registry (e.g. "add")
+    '''
+    op_code = str(op_code).strip().lower()
+    if op_code in REDUCTIONS:
+        return REDUCTIONS[op_code]()
+    if op_code in registry and registry.get(op_code).batch_capable:
+        return FoldReduction(registry.get(op_code))
+
+    allowed = list(REDUCTIONS) + [spec.op_code for spec in registry if spec.batch_capable]
+    logger.error(f"❌ Reduction {op_code} not allowed")
+    raise CommandError(f"❌ Reduction '{op_code}' not allowed. Allowed reductions: {allowed}")
+
+
+# operands from lines of text (REPL input, a file): numbers separated by commas or whitespace
+def split_operands(lines):
+    for line in lines:
+        for token in re.split(r"[,\s]+", line.strip()):
+            if token:
+                yield token
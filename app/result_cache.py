@@ -0,0 +1,215 @@
+# app/result_cache.py
+import os
+import sqlite3
+import threading
+import time
+from decimal import Decimal
+from app.logger import logger
+from app.config import (
+    CALCULATOR_HISTORY_DIR,
+    CALCULATOR_RESULT_CACHE_ENABLED,
+    CALCULATOR_RESULT_CACHE_FILE,
+    CALCULATOR_RESULT_CACHE_MAX_ENTRIES,
+    CALCULATOR_RESULT_CACHE_MAX_BYTES,
+    CALCULATOR_RESULT_CACHE_MIN_SECONDS,
+    CALCULATOR_RESULT_CACHE_BUSY_TIMEOUT
+)
+
+# bumped when a change to the calculations can change their results: older caches are emptied on open
+SCHEMA_VERSION = 1
+
+# a hit refreshes the entry's last use at most this often, so hot entries do not write on every read
+TOUCH_INTERVAL = 60.0
+
+# limits are checked once every EVICT_EVERY stores; eviction goes down to EVICT_TO of the limits
+EVICT_EVERY = 64
+EVICT_TO = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    operation TEXT NOT NULL,
+    a TEXT NOT NULL,
+    b TEXT NOT NULL,
+    precision INTEGER NOT NULL,
+    rounding TEXT NOT NULL,
+    result TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (operation, a, b, precision, rounding)
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+
+
+##############################################################
+############### ResultCache
+##############################################################
+class ResultCache:
+    '''
+    On-disk memo of calculation results, shared by every calculator process using the same file.
+
+    Keyed by (operation, rounded a, rounded b, precision, rounding mode) and stored in SQLite in
+    WAL mode, so readers never block the writer and several processes (REPLs, servers, worker
+    processes) can use one file at the same time; a process that finds it locked waits up to
+    busy_timeout seconds. Only results that took at least min_seconds to compute are stored.
+    Least recently used entries are evicted once max_entries or max_bytes is exceeded.
+
+    The cache is an optimization: any SQLite error is logged and the calculation is simply computed.
+    '''
+    def __init__(self, path=None, max_entries=CALCULATOR_RESULT_CACHE_MAX_ENTRIES, max_bytes=CALCULATOR_RESULT_CACHE_MAX_BYTES,
+                 min_seconds=CALCULATOR_RESULT_CACHE_MIN_SECONDS, busy_timeout=CALCULATOR_RESULT_CACHE_BUSY_TIMEOUT):
+        self.path = path or os.path.join(CALCULATOR_HISTORY_DIR, CALCULATOR_RESULT_CACHE_FILE)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.min_seconds = min_seconds
+        self.busy_timeout = busy_timeout
+        self.hits = self.misses = self.stores = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._stores_since_evict = 0
+        self.disabled = False
+
+    # ----------------- Connection -----------------
+
+    # connection of this process, opened on first use (a forked or spawned child opens its own)
+    def _connection(self):
+        if self._conn is not None and self._pid == os.getpid():
+            return self._conn
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # a cache can lose its last writes in a power failure, it cannot be corrupted by one
+        conn.execute("PRAGMA synchronous=NORMAL")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            conn.execute("DROP TABLE IF EXISTS results")
+            conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        conn.executescript(_SCHEMA)
+        self._conn, self._pid = conn, os.getpid()
+        logger.info(f"✅ Result cache opened: {self.path}")
+        # limits may have been lowered since the file was written
+        self._evict(conn)
+        return conn
+
+    def _failed(self, action, error):
+        # a broken file would fail every calculation's lookup: stop using it for this process
+        logger.error(f"❌ Result cache {action} failed, cache disabled: {error}")
+        self.disabled = True
+
+    # ----------------- Lookups and stores -----------------
+
+    # cached result of key = (operation, a, b, precision, rounding), or None
+    def get(self, key):
+        if self.disabled:
+            return None
+        try:
+            with self._lock:
+                conn = self._connection()
+                row = conn.execute("SELECT rowid, result, last_used FROM results WHERE operation = ? AND a = ? AND b = ? "
+                                   "AND precision = ? AND rounding = ?", key).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                self.hits += 1
+                now = time.time()
+                if now - row[2] > TOUCH_INTERVAL:
+                    conn.execute("UPDATE results SET last_used = ? WHERE rowid = ?", (now, row[0]))
+            return Decimal(row[1])
+        except sqlite3.Error as e:
+            self._failed("lookup", e)
+            return None
+
+    # store a result that took `seconds` to compute, if that was long enough to be worth it
+    def put(self, key, result, seconds=None):
+        if self.disabled or (seconds is not None and seconds < self.min_seconds):
+            return False
+        text = str(result)
+        size = sum(len(str(part)) for part in key) + len(text)
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute("INSERT OR REPLACE INTO results (operation, a, b, precision, rounding, result, size, last_used) "
+                             "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (*key, text, size, time.time()))
+                self.stores += 1
+                self._stores_since_evict += 1
+                if self._stores_since_evict >= EVICT_EVERY:
+                    self._evict(conn)
+            return True
+        except sqlite3.Error as e:
+            self._failed("store", e)
+            return False
+
+    # ----------------- Eviction -----------------
+
+    # drop the least recently used entries until the cache is back under EVICT_TO of its limits
+    def _evict(self, conn):
+        self._stores_since_evict = 0
+        entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        if entries <= self.max_entries and size <= self.max_bytes:
+            return 0
+
+        extra_entries = max(entries - int(self.max_entries * EVICT_TO), 0)
+        extra_bytes = max(size - int(self.max_bytes * EVICT_TO), 0)
+        # BEGIN IMMEDIATE: two processes evicting at once take turns instead of deleting twice
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            victims, freed = [], 0
+            for rowid, row_size in conn.execute("SELECT rowid, size FROM results ORDER BY last_used"):
+                if len(victims) >= extra_entries and freed >= extra_bytes:
+                    break
+                victims.append((rowid,))
+                freed += row_size
+            conn.executemany("DELETE FROM results WHERE rowid = ?", victims)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        logger.info(f"✅ Result cache evicted {len(victims)} least recently used entries ({freed} bytes)")
+        return len(victims)
+
+    # ----------------- Maintenance -----------------
+
+    def stats(self) -> dict:
+        entries, size = 0, 0
+        if not self.disabled:
+            try:
+                with self._lock:
+                    entries, size = self._connection().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+            except sqlite3.Error as e:
+                self._failed("stats", e)
+        return {"entries": entries, "bytes": size, "hits": self.hits, "misses": self.misses, "stores": self.stores,
+                "max_entries": self.max_entries, "max_bytes": self.max_bytes}
+
+    def clear(self):
+        if self.disabled:
+            return False
+        try:
+            with self._lock:
+                self._connection().execute("DELETE FROM results")
+        except sqlite3.Error as e:
+            self._failed("clear", e)
+            return False
+        logger.info("✅ Result cache cleared")
+        return True
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+# the process' cache, opened on first use when CALCULATOR_RESULT_CACHE_ENABLED; None when disabled
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache():
+    global _shared
+    if not CALCULATOR_RESULT_CACHE_ENABLED:
+        return None
+    with _shared_lock:
+        if _shared is None:
+            _shared = ResultCache()
+        return _shared
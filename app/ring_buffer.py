@@ -0,0 +1,105 @@
+# app/ring_buffer.py
+from collections import deque
+from itertools import islice
+
+
+##############################################################
+############### RingBuffer
+##############################################################
+class RingBuffer:
+    '''
+    Bounded sequence on top of a deque: appending past the limits evicts the oldest items in O(1).
+
+    maxlen:     maximum number of items (None = unbounded)
+    max_weight: maximum total weight of the items (None = unbounded), the newest item is always kept
+    weight:     function giving the weight of an item, e.g. its size in bytes
+
+    Compares equal to a list holding the same items, so it can replace the plain lists used as stacks.
+    '''
+    def __init__(self, items=(), maxlen=None, max_weight=None, weight=None):
+        self.maxlen = maxlen
+        self.max_weight = max_weight
+        self.weight = weight
+        self.total_weight = 0
+        self.evicted = 0
+        self._items = deque()
+        self.extend(items)
+
+    # ----------------- Adding and removing -----------------
+
+    # add an item at the newest end, returns the items evicted to make room
+    def append(self, item):
+        self._items.append(item)
+        self.total_weight += self._weigh(item)
+        return self._evict()
+
+    def extend(self, items):
+        evicted = []
+        for item in items:
+            evicted.extend(self.append(item))
+        return evicted
+
+    # remove and return the newest item
+    def pop(self):
+        item = self._items.pop()
+        self.total_weight -= self._weigh(item)
+        return item
+
+    # remove and return the oldest item
+    def popleft(self):
+        item = self._items.popleft()
+        self.total_weight -= self._weigh(item)
+        return item
+
+    def clear(self):
+        self._items.clear()
+        self.total_weight = 0
+
+    def copy(self):
+        return list(self._items)
+
+    def _weigh(self, item):
+        return self.weight(item) if self.weight else 0
+
+    def _evict(self):
+        evicted = []
+        while self._items and (
+            (self.maxlen is not None and len(self._items) > self.maxlen)
+            or (self.max_weight is not None and self.total_weight > self.max_weight and len(self._items) > 1)
+        ):
+            evicted.append(self.popleft())
+        self.evicted += len(evicted)
+        return evicted
+
+    # ----------------- Sequence protocol -----------------
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __reversed__(self):
+        return reversed(self._items)
+
+    def __contains__(self, item):
+        return item in self._items
+
+    # integer index in O(1) at both ends, a slice returns a plain list
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self._items))
+            if step > 0:
+                return list(islice(self._items, start, stop, step))
+            return [self._items[i] for i in range(start, stop, step)]
+        return self._items[index]
+
+    def __eq__(self, other):
+        if isinstance(other, RingBuffer):
+            return list(self._items) == list(other._items)
+        if isinstance(other, list):
+            return list(self._items) == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f"RingBuffer({list(self._items)!r}, maxlen={self.maxlen}, max_weight={self.max_weight})"
@@ -0,0 +1,486 @@
+# app/server.py
+'''
+Local JSON-RPC 2.0 server for the calculator.
+
+Each line sent by a client is one JSON-RPC request, each response is written back as one line:
+
+    --> {"jsonrpc": "2.0", "id": 1, "method": "calculate", "params": {"operation": "add", "a": "2", "b": "3"}}
+    <-- {"jsonrpc": "2.0", "id": 1, "result": {"result": "5.0000", "entry": "2025-10-24 18:05:19,Addition,2,3,5.0000,..."}}
+
+"reduce" applies sum, product, mean, min, max or stddev to a whole list in one request and one history entry:
+
+    --> {"jsonrpc": "2.0", "id": 2, "method": "reduce", "params": {"operation": "mean", "operands": ["1", "2", "4"]}}
+
+and "vector" applies an operation element-wise (with broadcasting), "matmul" or a reduction to arrays:
+
+    --> {"jsonrpc": "2.0", "id": 3, "method": "vector", "params": {"operation": "add", "a": [[1, 2], [3, 4]], "b": "10"}}
+    <-- {"jsonrpc": "2.0", "id": 3, "result": {"result": [["11.0000", "12.0000"], ["13.0000", "14.0000"]], "entry": "..."}}
+
+Every connection starts a new session with its own Calculator (and instance_ID); sessions live in a
+SessionManager, so a client can reconnect and resume one with {"method": "session", "params":
+{"instance_id": ...}}. Requests can be pipelined: they are read ahead into a bounded queue and
+answered in order. Calculations run in a thread pool so the event loop keeps serving other connections;
+with CALCULATOR_WORKER_ENABLED the thread hands them to worker processes (app/worker.py) that are
+killed and replaced when a calculation exceeds CALCULATOR_OPERATION_TIMEOUT.
+'''
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from app.calculator import Calculator
+from app.session_manager import SessionManager
+from app.input_validators import parse_operand
+from app.logger import logger
+from app.exceptions import CalculatorError, ValidationError, OperationError, CommandError, HistoryError
+from app.config import (
+    CALCULATOR_SERVER_HOST,
+    CALCULATOR_SERVER_PORT,
+    CALCULATOR_SERVER_WORKERS,
+    CALCULATOR_SERVER_PIPELINE_DEPTH,
+    CALCULATOR_SERVER_MAX_REQUEST_BYTES,
+    CALCULATOR_SESSION_SWEEP_INTERVAL,
+    CALCULATOR_WORKER_ENABLED
+)
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+# application errors, reserved server range -32000 to -32099
+ERROR_CODES = {
+    ValidationError: -32001,
+    OperationError: -32002,
+    CommandError: -32003,
+    HistoryError: -32004,
+}
+
+# parameters of the history method, see Calculator.history_view
+HISTORY_FILTERS = {'offset', 'limit', 'reverse', 'operation', 'contains'}
+
+# op codes of the menu commands (Calculator.commands_dictionary: hist, undo, save, ...), which are not calculations
+NON_CALCULATION_CODES = {code for _, code in Calculator.commands_dictionary.values()}
+
+
+class RPCError(Exception):
+    """Raised for protocol level errors (bad request, unknown method)."""
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def error_code(error: CalculatorError) -> int:
+    for error_type, code in ERROR_CODES.items():
+        if isinstance(error, error_type):
+            return code
+    return -32000
+
+
+##############################################################
+############### CalculatorSession
+##############################################################
+class CalculatorSession:
+    '''
+    One client session: a Calculator plus the JSON-RPC methods that drive it.
+    Requests of a connection are processed one at a time; a session resumed from several connections
+    is shared safely because Calculator serializes its own state changes.
+    '''
+    def __init__(self, calculator, executor, manager=None, worker=None):
+        self.calculator = calculator
+        self.executor = executor
+        self.manager = manager
+        # WorkerSupervisor running calculations with a time budget, None = in the executor thread
+        self.worker = worker
+        self.methods = {
+            'calculate': self.calculate,
+            'reduce': self.reduce,
+            'vector': self.vector,
+            'sweep': self.sweep,
+            'history': self.history,
+            'undo': self.undo,
+            'redo': self.redo,
+            'session': self.session,
+        }
+
+    @property
+    def instance_ID(self):
+        return self.calculator.instance_ID
+
+    # resolve an operation code or menu letter to the operation object
+    def _operation(self, name):
+        if not isinstance(name, str) or not name.strip():
+            raise RPCError(INVALID_PARAMS, "'operation' must be a non-empty string")
+
+        name = name.strip()
+        if name.upper() in Calculator.operations_dictionary:
+            name = Calculator.get_operation_code(name.upper())
+
+        op_code = name.lower()
+        if op_code in NON_CALCULATION_CODES:
+            raise CommandError(f"❌ '{name}' is not a calculation")
+        return self.calculator.create_operation(op_code)
+
+    # runs in the thread pool: the calculation itself and the history/observer update
+    def _calculate_blocking(self, operation_obj, operand_a, operand_b):
+        if self.worker:
+            result = self.worker.calculate(operation_obj, operand_a, operand_b)
+        else:
+            result = operation_obj.calculate(operand_a, operand_b)
+        entry = self.calculator.record_calculation(operation_obj, operand_a, operand_b, result)
+        return result, entry
+
+    async def calculate(self, params):
+        if isinstance(params, list) and len(params) == 3:
+            params = dict(zip(('operation', 'a', 'b'), params))
+        if isinstance(params, list) and len(params) == 2:
+            params = dict(zip(('operation', 'a'), params))
+        if not isinstance(params, dict) or not {'operation', 'a'} <= params.keys():
+            raise RPCError(INVALID_PARAMS, "calculate expects 'operation' and 'a', plus 'b' for operations of two operands")
+
+        operation_obj = self._operation(params['operation'])
+        operand_a = parse_operand(params['a'])
+        # functions of one operand (exp, ln, sin, ...) take no 'b'
+        if operation_obj.operands == 1:
+            operand_b = None
+        elif 'b' in params:
+            operand_b = parse_operand(params['b'])
+        else:
+            raise RPCError(INVALID_PARAMS, f"calculate expects 'b': {operation_obj.__class__.__name__} takes two operands")
+
+        loop = asyncio.get_running_loop()
+        result, entry = await loop.run_in_executor(self.executor, self._calculate_blocking, operation_obj, operand_a, operand_b)
+        return {'result': str(result), 'entry': entry}
+
+    # {"operation": "mean", "operands": ["1", "2.5", ...]}: one result and one history entry for the whole list
+    async def reduce(self, params):
+        if not isinstance(params, dict) or not isinstance(params.get('operation'), str) or not isinstance(params.get('operands'), list):
+            raise RPCError(INVALID_PARAMS, "reduce expects 'operation' and a list of 'operands'")
+
+        loop = asyncio.get_running_loop()
+        result, count, entry = await loop.run_in_executor(self.executor, self.calculator.reduce, params['operation'], params['operands'])
+        return {'result': str(result), 'count': count, 'entry': entry}
+
+    # {"operation": "add", "a": [[1, 2], [3, 4]], "b": "10"}, "matmul", or a reduction with an optional "axis"
+    async def vector(self, params):
+        if not isinstance(params, dict) or not isinstance(params.get('operation'), str) or 'a' not in params:
+            raise RPCError(INVALID_PARAMS, "vector expects 'operation' and 'a' (plus 'b' or 'axis')")
+
+        loop = asyncio.get_running_loop()
+        result, entry = await loop.run_in_executor(
+            self.executor, self.calculator.vector, params['operation'], params['a'], params.get('b'), params.get('axis'))
+        # imported here, numpy is only loaded once vector mode is used
+        from app.vector_mode import to_list
+        return {'result': to_list(result), 'entry': entry}
+
+    # {"operation": "power", "a": "1:1000:0.5", "b": "3"}: the table is written to CALCULATOR_HISTORY_DIR on the server
+    async def sweep(self, params):
+        if not isinstance(params, dict) or not isinstance(params.get('operation'), str) or 'a' not in params or 'b' not in params:
+            raise RPCError(INVALID_PARAMS, "sweep expects 'operation', 'a' and 'b'")
+
+        loop = asyncio.get_running_loop()
+        path, rows, errors, entry = await loop.run_in_executor(
+            self.executor, self.calculator.sweep, params['operation'], str(params['a']), str(params['b']))
+        return {'path': path, 'rows': rows, 'errors': errors, 'entry': entry}
+
+    # {"offset": 0, "limit": 20, "reverse": true, "operation": "Power", "contains": "..."}, all optional
+    async def history(self, params):
+        loop = asyncio.get_running_loop()
+        # these take the calculator's lock, which a calculation of this session may hold: never on the loop
+        if not params:
+            return {'history': await loop.run_in_executor(self.executor, self.calculator.history_snapshot)}
+        if not isinstance(params, dict) or not set(params) <= HISTORY_FILTERS:
+            raise RPCError(INVALID_PARAMS, f"history accepts {sorted(HISTORY_FILTERS)}")
+        for name in ('offset', 'limit'):
+            if params.get(name) is not None and (not isinstance(params[name], int) or params[name] < 0):
+                raise RPCError(INVALID_PARAMS, f"'{name}' must be a non-negative integer")
+        return {'history': await loop.run_in_executor(self.executor, lambda: self.calculator.history_view(**params).list())}
+
+    async def undo(self, params):
+        loop = asyncio.get_running_loop()
+        return {'undone': await loop.run_in_executor(self.executor, self.calculator.undo, True)}
+
+    async def redo(self, params):
+        loop = asyncio.get_running_loop()
+        return {'redone': await loop.run_in_executor(self.executor, self.calculator.redo, True)}
+
+    # without params: current session id; with an instance_id: switch this connection to that session
+    async def session(self, params):
+        instance_id = params.get('instance_id') if isinstance(params, dict) else None
+        if instance_id and instance_id != self.instance_ID:
+            if self.manager is None:
+                raise RPCError(INVALID_PARAMS, "Sessions cannot be resumed on this server")
+            if not isinstance(instance_id, str):
+                raise RPCError(INVALID_PARAMS, "'instance_id' must be a string")
+
+            loop = asyncio.get_running_loop()
+            # restoring may read a spilled session from disk
+            calculator = await loop.run_in_executor(self.executor, self.manager.acquire, instance_id)
+            previous, self.calculator = self.calculator, calculator
+            await loop.run_in_executor(self.executor, self.manager.release, previous.instance_ID)
+
+        return {'instance_id': self.instance_ID}
+
+    # handle one decoded request and return the response dict (None for notifications)
+    async def dispatch(self, request):
+        request_id = None
+        try:
+            if not isinstance(request, dict) or request.get('jsonrpc') != '2.0' or not isinstance(request.get('method'), str):
+                raise RPCError(INVALID_REQUEST, "Invalid JSON-RPC 2.0 request")
+
+            request_id = request.get('id')
+            method = self.methods.get(request['method'])
+            if method is None:
+                raise RPCError(METHOD_NOT_FOUND, f"Method '{request['method']}' not found")
+
+            result = await method(request.get('params', {}))
+            response = {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+
+        except RPCError as e:
+            response = error_response(request_id, e.code, e.message)
+        except CalculatorError as e:
+            response = error_response(request_id, error_code(e), str(e))
+        except Exception as e:
+            logger.exception(f"❌ Server session {self.instance_ID} failed on request: {e}")
+            response = error_response(request_id, INTERNAL_ERROR, f"Internal error: {e}")
+
+        # notifications (no id) get no answer, unless the request itself was unreadable
+        if isinstance(request, dict) and 'id' not in request and response.get('error', {}).get('code') != INVALID_REQUEST:
+            return None
+        return response
+
+
+def error_response(request_id, code, message):
+    return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}}
+
+
+##############################################################
+############### CalculatorServer
+##############################################################
+class CalculatorServer:
+    '''
+    asyncio server that serves one CalculatorSession per connection, on TCP or a Unix socket.
+    The calculators themselves are hosted by a SessionManager; every sweep_interval seconds the
+    server asks it to spill idle sessions, so they are spilled even when no client connects.
+    '''
+    def __init__(self, workers=CALCULATOR_SERVER_WORKERS, pipeline_depth=CALCULATOR_SERVER_PIPELINE_DEPTH,
+                 session_manager=None, worker=None, sweep_interval=CALCULATOR_SESSION_SWEEP_INTERVAL,
+                 max_request_bytes=CALCULATOR_SERVER_MAX_REQUEST_BYTES):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="calc-worker")
+        self.pipeline_depth = pipeline_depth
+        # stream buffer limit: a request line must fit in it
+        self.max_request_bytes = max_request_bytes
+        self.manager = session_manager if session_manager is not None else SessionManager()
+        # calculation worker processes shared by every session, see app/worker.py
+        if worker is None and CALCULATOR_WORKER_ENABLED:
+            from app.worker import WorkerSupervisor
+            worker = WorkerSupervisor()
+        self.worker = worker
+        # sessions of the currently open connections
+        self.sessions = {}
+        self._connections = set()
+        self._server = None
+        self.sweep_interval = sweep_interval
+        self._sweeper = None
+
+    async def start(self, host=CALCULATOR_SERVER_HOST, port=CALCULATOR_SERVER_PORT, unix_path=None):
+        if unix_path:
+            self._server = await asyncio.start_unix_server(self.handle_connection, path=unix_path, backlog=1024,
+                                                           limit=self.max_request_bytes)
+            logger.info(f"✅ Calculator server listening on unix socket {unix_path}")
+        else:
+            self._server = await asyncio.start_server(self.handle_connection, host=host, port=port, backlog=1024,
+                                                      limit=self.max_request_bytes)
+            logger.info(f"✅ Calculator server listening on {host}:{self.port}")
+        if self.sweep_interval > 0:
+            self._sweeper = asyncio.create_task(self._sweep_idle_sessions())
+        return self._server
+
+    # spill sessions left idle, also while no connection opens or releases one
+    async def _sweep_idle_sessions(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                await loop.run_in_executor(self.executor, self.manager.evict_idle)
+            except Exception as e:
+                logger.error(f"❌ Idle session sweep failed: {e}")
+
+    @property
+    def port(self):
+        sockets = self._server.sockets if self._server else []
+        return sockets[0].getsockname()[1] if sockets else None
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self, grace_period=1.0):
+        if self._sweeper:
+            self._sweeper.cancel()
+            await asyncio.gather(self._sweeper, return_exceptions=True)
+            self._sweeper = None
+        if self._server:
+            self._server.close()
+
+        # let connections finish what they already received, then cancel the ones still open
+        if self._connections:
+            _, pending = await asyncio.wait(set(self._connections), timeout=grace_period)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        if self._server:
+            await self._server.wait_closed()
+
+        # spill the sessions and flush the shared observer pipeline
+        await asyncio.get_running_loop().run_in_executor(self.executor, self.manager.close)
+        self.executor.shutdown(wait=True)
+        if self.worker:
+            self.worker.close()
+        logger.info("👋 Calculator server stopped")
+
+    async def open_session(self):
+        # session creation may evict (write) idle sessions, keep it off the loop
+        loop = asyncio.get_running_loop()
+        calculator = await loop.run_in_executor(self.executor, self.manager.create)
+        session = CalculatorSession(calculator, self.executor, self.manager, self.worker)
+        self.sessions[id(session)] = session
+        logger.info(f"✅ Server session opened: {session.instance_ID}")
+        return session
+
+    async def close_session(self, session):
+        self.sessions.pop(id(session), None)
+        # the session stays in the manager, idle, until it is resumed or evicted to disk
+        await asyncio.get_running_loop().run_in_executor(self.executor, self.manager.release, session.instance_ID)
+        logger.info(f"✅ Server connection closed for session: {session.instance_ID}")
+
+    async def handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        session = None
+        responder = None
+        reading = None
+
+        try:
+            session = await self.open_session()
+            queue = asyncio.Queue(maxsize=self.pipeline_depth)
+            responder = asyncio.create_task(self._respond(session, queue, writer))
+            reading = asyncio.create_task(self._read_requests(reader, queue))
+            # a responder that stopped would never empty the queue: stop reading with it
+            responder.add_done_callback(lambda _: reading.cancel())
+            await asyncio.wait({reading})
+
+            # answer everything already received before closing
+            if await self._enqueue(queue, None, responder):
+                await responder
+            if responder.done() and not responder.cancelled() and responder.exception():
+                logger.error(f"❌ Server session {session.instance_ID} stopped answering: {responder.exception()}")
+
+        except asyncio.CancelledError:
+            # server is shutting down, the manager spills every session on close
+            for pending in (responder, reading):
+                if pending:
+                    pending.cancel()
+            raise
+        finally:
+            self._connections.discard(task)
+            if session:
+                # released on every path, or the manager could never evict the session
+                try:
+                    await self.close_session(session)
+                except Exception as e:
+                    logger.error(f"❌ Failed to release session {session.instance_ID}: {e}")
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    # read ahead: pipelined requests wait in the queue, a full queue pushes back on the client
+    async def _read_requests(self, reader, queue):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                if line.strip():
+                    await queue.put(line)
+        except (asyncio.LimitOverrunError, ValueError) as e:
+            # the rest of the line cannot be told apart from the next request: answer, then stop reading
+            logger.warning(f"❌ Server session request longer than {self.max_request_bytes} bytes: {e}")
+            await queue.put(error_response(None, INVALID_REQUEST, f"Request longer than {self.max_request_bytes} bytes"))
+        except ConnectionError as e:
+            logger.warning(f"❌ Server session connection error: {e}")
+
+    # put an item in the queue unless the responder stops first; False if it did
+    @staticmethod
+    async def _enqueue(queue, item, responder):
+        if responder.done():
+            return False
+        put = asyncio.ensure_future(queue.put(item))
+        await asyncio.wait({put, responder}, return_when=asyncio.FIRST_COMPLETED)
+        if not put.done():
+            put.cancel()
+            return False
+        return True
+
+    async def _respond(self, session, queue, writer):
+        # answers requests strictly in arrival order
+        while True:
+            line = await queue.get()
+            if line is None:
+                return
+
+            # the reader queues a ready error response for a line it could not read
+            if isinstance(line, dict):
+                response = line
+            else:
+                try:
+                    request = json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                    response = error_response(None, PARSE_ERROR, f"Parse error: {e}")
+                else:
+                    response = await session.dispatch(request)
+
+            if response is None:
+                continue
+            try:
+                writer.write((json.dumps(response) + "\n").encode())
+                # only wait for the socket when nothing else is queued, so pipelined answers go out together
+                if queue.empty():
+                    await writer.drain()
+            except ConnectionError as e:
+                logger.warning(f"❌ Server session {session.instance_ID} lost connection: {e}")
+
+
+async def serve(host=CALCULATOR_SERVER_HOST, port=CALCULATOR_SERVER_PORT, unix_path=None):
+    server = CalculatorServer()
+    await server.start(host=host, port=port, unix_path=unix_path)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv=None): # pragma: no cover
+    parser = argparse.ArgumentParser(description="Run the calculator as a local JSON-RPC server")
+    parser.add_argument("--host", default=CALCULATOR_SERVER_HOST)
+    parser.add_argument("--port", type=int, default=CALCULATOR_SERVER_PORT)
+    parser.add_argument("--unix", dest="unix_path", help="listen on this Unix socket path instead of TCP")
+    args = parser.parse_args(argv)
+
+    if args.host not in ("127.0.0.1", "localhost", "::1"):
+        logger.warning(f"⚠️ Calculator server bound to non-local host {args.host}")
+
+    print(f"👋 Calculator server on {args.unix_path or f'{args.host}:{args.port}'} (Ctrl+C to stop)")
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix_path))
+    except KeyboardInterrupt:
+        print("Server stopped. Goodbye!! 👋 ")
+
+
+if __name__ == "__main__": # pragma: no cover
+    main()
@@ -0,0 +1,186 @@
+# app/session_manager.py
+import os
+import threading
+import time
+from collections import OrderedDict
+from app.calculator import Calculator
+from app.observers import LoggingObserver, AutosaveObserver, BatchingObserver
+from app.session_snapshot import write_snapshot, read_snapshot
+from app.logger import logger
+from app.exceptions import HistoryError, FileAccessError
+from app.config import (
+    CALCULATOR_HISTORY_DIR,
+    CALCULATOR_MAX_SESSIONS,
+    CALCULATOR_SESSION_IDLE_TIMEOUT,
+    CALCULATOR_SESSION_DIR
+)
+
+
+##############################################################
+############### SessionManager
+##############################################################
+class SessionManager:
+    '''
+    Hosts many Calculator sessions keyed by instance_ID in one process.
+
+    - all sessions share one BatchingObserver pipeline, so the history files are opened (and the
+      autosave CSV is read) once per process instead of once per session
+    - sessions not in use for idle_timeout seconds, or beyond max_sessions, are evicted: their
+      history and undo/redo stacks are spilled to a session snapshot (app/session_snapshot.py) and
+      restored on the next acquire()
+    '''
+    def __init__(self, max_sessions=CALCULATOR_MAX_SESSIONS, idle_timeout=CALCULATOR_SESSION_IDLE_TIMEOUT,
+                 spill_dir=None, pipeline=None):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+
+        try:
+            self.spill_dir = spill_dir or os.path.join(CALCULATOR_HISTORY_DIR, CALCULATOR_SESSION_DIR)
+            os.makedirs(self.spill_dir, exist_ok=True)
+        except Exception as e: # pragma: no cover
+            logger.error(f"❌ Failed to create session directory: {e}")
+            raise FileAccessError(f"❌ Failed to create session directory: {e}")
+
+        self.pipeline = pipeline if pipeline is not None else BatchingObserver([LoggingObserver(), AutosaveObserver()])
+
+        # least recently used first
+        self._sessions = OrderedDict()
+        self._last_used = {}
+        self._in_use = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, instance_id):
+        return instance_id in self._sessions
+
+    def _spill_path(self, instance_id):
+        # instance ids are uuids, keep anything else from escaping the session directory
+        safe_id = "".join(c for c in instance_id if c.isalnum() or c == "-")
+        return os.path.join(self.spill_dir, f"{safe_id}.json")
+
+    def _register(self, calculator):
+        self._sessions[calculator.instance_ID] = calculator
+        self._last_used[calculator.instance_ID] = time.monotonic()
+        self._in_use[calculator.instance_ID] = 1
+
+    # ----------------- Session lifecycle -----------------
+
+    # new session, returned already acquired
+    def create(self):
+        with self._lock:
+            calculator = Calculator(observers=[self.pipeline])
+            self._register(calculator)
+            logger.info(f"✅ Session created: {calculator.instance_ID}")
+            self.evict_idle()
+            return calculator
+
+    # get a session for use, restoring it from disk if it was evicted
+    def acquire(self, instance_id):
+        with self._lock:
+            calculator = self._sessions.get(instance_id)
+            if calculator is not None:
+                self._sessions.move_to_end(instance_id)
+                self._in_use[instance_id] += 1
+                self._last_used[instance_id] = time.monotonic()
+                return calculator
+
+            calculator = self._restore(instance_id)
+            self._register(calculator)
+            self.evict_idle()
+            return calculator
+
+    # mark a session as no longer used by the caller
+    def release(self, instance_id):
+        with self._lock:
+            if instance_id not in self._sessions:
+                return
+            self._in_use[instance_id] = max(0, self._in_use[instance_id] - 1)
+            self._last_used[instance_id] = time.monotonic()
+            self.evict_idle()
+
+    # drop a session for good, in memory and on disk
+    def discard(self, instance_id):
+        with self._lock:
+            self._sessions.pop(instance_id, None)
+            self._last_used.pop(instance_id, None)
+            self._in_use.pop(instance_id, None)
+            path = self._spill_path(instance_id)
+            if os.path.exists(path):
+                os.remove(path)
+            logger.info(f"✅ Session discarded: {instance_id}")
+
+    # ----------------- Eviction -----------------
+
+    def evict(self, instance_id):
+        with self._lock:
+            if self._in_use.get(instance_id):
+                logger.warning(f"❌ Session {instance_id} is in use and cannot be evicted")
+                return False
+
+            calculator = self._sessions.pop(instance_id, None)
+            if calculator is None:
+                return False
+            self._last_used.pop(instance_id, None)
+            self._in_use.pop(instance_id, None)
+            self._spill(calculator)
+            return True
+
+    # evict idle sessions, and the least recently used ones while over max_sessions
+    def evict_idle(self, now=None):
+        with self._lock:
+            now = time.monotonic() if now is None else now
+            evicted = 0
+            overflow = len(self._sessions) - self.max_sessions
+
+            for instance_id in list(self._sessions):
+                if self._in_use.get(instance_id):
+                    continue
+                idle = now - self._last_used[instance_id] >= self.idle_timeout
+                if idle or overflow > 0:
+                    self.evict(instance_id)
+                    overflow -= 1
+                    evicted += 1
+
+            if evicted:
+                logger.info(f"✅ Evicted {evicted} idle sessions, {len(self._sessions)} in memory")
+            return evicted
+
+    def _spill(self, calculator):
+        path = self._spill_path(calculator.instance_ID)
+        state = calculator.caretaker.export_state(calculator.originator)
+        state["instance_id"] = calculator.instance_ID
+
+        try:
+            write_snapshot(path, state)
+            logger.info(f"✅ Session {calculator.instance_ID} spilled to {path}")
+        except Exception as e:
+            logger.error(f"❌ Failed to spill session {calculator.instance_ID}: {e}")
+            raise FileAccessError(f"❌ Failed to spill session {calculator.instance_ID}: {e}") from e
+
+    def _restore(self, instance_id):
+        path = self._spill_path(instance_id)
+        if not os.path.exists(path):
+            logger.warning(f"❌ Unknown session requested: {instance_id}")
+            raise HistoryError(f"❌ No session with id '{instance_id}'")
+
+        state = read_snapshot(path)
+        calculator = Calculator(observers=[self.pipeline], instance_id=instance_id)
+        calculator.caretaker.import_state(calculator.originator, state)
+        os.remove(path)
+        logger.info(f"✅ Session {instance_id} restored from {path}")
+        return calculator
+
+    # ----------------- Shutdown -----------------
+
+    # spill every session so they survive a restart, then flush the shared pipeline
+    def close(self):
+        with self._lock:
+            for instance_id, calculator in list(self._sessions.items()):
+                self._spill(calculator)
+            self._sessions.clear()
+            self._last_used.clear()
+            self._in_use.clear()
+        self.pipeline.close()
+        logger.info("✅ SessionManager closed")
@@ -0,0 +1,131 @@
+# app/session_snapshot.py
+import json
+import os
+from app.logger import logger
+from app.exceptions import FileAccessError, DataFormatError
+from app.config import CALCULATOR_DEFAULT_ENCODING
+
+SNAPSHOT_FORMAT = "calculator-session/1"
+
+
+##############################################################
+############### Session snapshot codec
+##############################################################
+'''
+Compact encoding of CareTaker.export_state(): the history plus every undo/redo state.
+
+Consecutive states share almost all of their entries (one calculation more or less, the oldest
+one evicted), so only the history is stored in full. Each stack is a chain of deltas that starts
+at the history: the newest memento is a delta against the history, the one before it a delta
+against the newest, and so on. A delta [head, drop, keep, tail] means
+
+    state = head + base[drop:drop + keep] + tail
+
+Decoding slices the previous state, so decoded states share their entry strings instead of
+holding copies, and restoring a session is a list slice per memento.
+
+    {"format": "calculator-session/1", "history": [...], "undo": [[[], 0, 4, []], ...], "redo": [...]}
+'''
+
+
+# [head, drop, keep, tail] delta around the longest run of entries `state` shares with `base`
+def state_delta(base, state):
+    positions = {}
+    for index, entry in enumerate(base):
+        positions.setdefault(entry, []).append(index)
+
+    start, drop, keep = 0, 0, 0
+    index = 0
+    # a run starting later in `state` than len(state) - keep cannot be longer than the best one
+    while index < len(state) - keep:
+        for base_index in positions.get(state[index], ()):
+            length = 1
+            while (index + length < len(state) and base_index + length < len(base)
+                   and state[index + length] == base[base_index + length]):
+                length += 1
+            if length > keep:
+                start, drop, keep = index, base_index, length
+        index += 1
+    return [list(state[:start]), drop, keep, list(state[start + keep:])]
+
+
+def _encode_chain(history, states):
+    deltas = []
+    base = history
+    for state in reversed(states):
+        deltas.append(state_delta(base, state))
+        base = state
+    deltas.reverse()
+    return deltas
+
+
+def _decode_chain(history, deltas):
+    states = []
+    base = history
+    for head, drop, keep, tail in reversed(deltas):
+        base = head + base[drop:drop + keep] + tail
+        states.append(base)
+    states.reverse()
+    return states
+
+
+# export_state() dict -> compact snapshot dict, other keys (e.g. instance_id) are kept as they are
+def encode_state(state):
+    history = list(state["history"])
+    snapshot = {key: value for key, value in state.items() if key not in ("history", "undo", "redo")}
+    snapshot.update({
+        "format": SNAPSHOT_FORMAT,
+        "history": history,
+        "undo": _encode_chain(history, [list(s) for s in state["undo"]]),
+        "redo": _encode_chain(history, [list(s) for s in state["redo"]]),
+    })
+    return snapshot
+
+
+# compact snapshot dict -> export_state() dict; a plain export_state() dict is returned as is
+def decode_state(snapshot):
+    snapshot_format = snapshot.get("format")
+    if snapshot_format is None:
+        return snapshot
+    if snapshot_format != SNAPSHOT_FORMAT:
+        raise DataFormatError(f"❌ Unsupported session snapshot format: {snapshot_format}")
+
+    try:
+        history = list(snapshot["history"])
+        state = {key: value for key, value in snapshot.items() if key != "format"}
+        state.update({
+            "history": history,
+            "undo": _decode_chain(history, snapshot["undo"]),
+            "redo": _decode_chain(history, snapshot["redo"]),
+        })
+        return state
+    except (KeyError, TypeError, ValueError) as e:
+        logger.error(f"❌ Invalid session snapshot: {e}")
+        raise DataFormatError(f"❌ Invalid session snapshot: {e}") from e
+
+
+# ----------------- Files -----------------
+
+# write the encoded state to a temporary file and rename it, a crash never leaves half a snapshot
+def write_snapshot(path, state):
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding=CALCULATOR_DEFAULT_ENCODING) as file:
+            json.dump(encode_state(state), file, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.error(f"❌ Failed to write session snapshot {path}: {e}")
+        raise FileAccessError(f"❌ Failed to write session snapshot: {e}") from e
+
+
+def read_snapshot(path):
+    try:
+        with open(path, encoding=CALCULATOR_DEFAULT_ENCODING) as file:
+            snapshot = json.load(file)
+    except OSError as e:
+        logger.error(f"❌ Failed to read session snapshot {path}: {e}")
+        raise FileAccessError(f"❌ Failed to read session snapshot: {e}") from e
+    except ValueError as e:
+        logger.error(f"❌ Corrupt session snapshot {path}: {e}")
+        raise DataFormatError(f"❌ Corrupt session snapshot: {e}") from e
+    return decode_state(snapshot)
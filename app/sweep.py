@@ -0,0 +1,233 @@
+# app/sweep.py
+import csv
+import itertools
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from decimal import Decimal, InvalidOperation, Context, localcontext
+from app.logger import logger, child_log_queue, forward_logs_to
+from app.exceptions import ValidationError, OperationError, CalculatorError, FileAccessError
+from app.input_validators import parse_operand
+from app.operation_registry import registry
+from app.config import (
+    CALCULATOR_HISTORY_DIR,
+    CALCULATOR_DEFAULT_ENCODING,
+    CALCULATOR_SWEEP_CHUNK_SIZE,
+    CALCULATOR_SWEEP_MAX_POINTS,
+    CALCULATOR_SWEEP_WORKERS
+)
+
+SWEEP_COLUMNS = ["a", "b", "result", "error"]
+
+# colour codes some validation messages carry, kept out of the CSV
+ANSI_CODES = re.compile(r"\x1b\[[0-9;]*m")
+
+# elements shown in the summary of an explicit list
+SUMMARY_ITEMS = 3
+
+# digits of the context counting the points of a range: any count that needs more is far
+# beyond CALCULATOR_SWEEP_MAX_POINTS, e.g. 1:2:1e-40
+COUNT_DIGITS = 50
+
+
+##############################################################
+############### SweepRange
+##############################################################
+class SweepRange:
+    '''
+    Values taken by one operand of a sweep, from a spec such as
+    - "1:1000:0.5"  start:stop:step, stop included when the steps land on it (step defaults to 1)
+    - "1 2 5" or "1,2,5"  an explicit list
+    - "3"  a single value
+
+    Iterating yields the values one at a time: start + i * step, exact, without accumulating rounding.
+    '''
+    def __init__(self, spec):
+        self.spec = str(spec).strip()
+        self.values = None
+        if ":" in self.spec:
+            parts = self.spec.split(":")
+            if len(parts) not in (2, 3):
+                raise ValidationError(f"❌ Invalid range '{self.spec}', use start:stop:step")
+            self.start, self.stop = parse_operand(parts[0]), parse_operand(parts[1])
+            self.step = self._parse_step(parts[2] if len(parts) == 3 else "1")
+            self.count = self._count()
+            if self.count == 0:
+                raise ValidationError(f"❌ Range '{self.spec}' is empty: step {self.step} never reaches {self.stop}")
+            if self.count > CALCULATOR_SWEEP_MAX_POINTS:
+                raise ValidationError(f"❌ Range '{self.spec}' has too many points, max allowed {CALCULATOR_SWEEP_MAX_POINTS}")
+        else:
+            self.values = [parse_operand(token) for token in re.split(r"[,\s]+", self.spec) if token]
+            if not self.values:
+                raise ValidationError("❌ Enter a range start:stop:step or at least one number")
+            self.count = len(self.values)
+
+    # values of start:stop:step, counted in a wide context so a tiny step cannot overflow the division
+    def _count(self):
+        try:
+            with localcontext(Context(prec=COUNT_DIGITS, traps=[InvalidOperation])):
+                distance = self.stop - self.start
+                # a step pointing away from stop gives an empty range, as in range()
+                if distance and (distance > 0) != (self.step > 0):
+                    return 0
+                return int(distance // self.step) + 1
+        except InvalidOperation:
+            logger.error(f"❌ Range '{self.spec}' rejected: too many points")
+            raise ValidationError(f"❌ Range '{self.spec}' has too many points, max allowed {CALCULATOR_SWEEP_MAX_POINTS}")
+
+    def _parse_step(self, raw):
+        try:
+            step = Decimal(raw.strip())
+        except InvalidOperation:
+            raise ValidationError(f"❌ Invalid step '{raw}'")
+        if not step.is_finite() or step == 0:
+            raise ValidationError(f"❌ Invalid step '{raw}', it must be a non-zero number")
+        return step
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        if self.values is not None:
+            return iter(self.values)
+        return (self.start + index * self.step for index in range(self.count))
+
+    # comma free description for the history entry
+    def __str__(self):
+        if self.values is None:
+            return f"{self.start}:{self.stop}:{self.step}"
+        if self.count == 1:
+            return str(self.values[0])
+        items = [str(value) for value in self.values[:SUMMARY_ITEMS]]
+        if self.count > SUMMARY_ITEMS:
+            items += ["..", str(self.values[-1])]
+        return f"list({self.count})[{' '.join(items)}]"
+
+
+##############################################################
+############### Sweep evaluation
+##############################################################
+
+# the grid, row by row: every a with every b, generated lazily
+def grid(a_range, b_range):
+    for a in a_range:
+        for b in b_range:
+            yield a, b
+
+
+def _chunks(pairs, size):
+    chunk = []
+    for pair in pairs:
+        chunk.append(pair)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# CSV rows for a chunk of (a, b) pairs; a failing point is written with its error, the sweep goes on
+def evaluate_chunk(op_code, pairs, operation=None):
+    operation = operation or registry.create(op_code)
+    rows = []
+    for a, b in pairs:
+        try:
+            rows.append([a, b, operation.evaluate(a, b), ""])
+        except CalculatorError as e:
+            rows.append([a, b, "", ANSI_CODES.sub("", str(e)).replace("\n", " ")])
+    return rows
+
+
+# runs first in each worker process: its records go to this process' log handlers
+def _start_worker(log_queue):
+    forward_logs_to(log_queue)
+
+
+# chunks evaluated in worker processes, at most 2 chunks per worker in flight, rows kept in order
+def _parallel_rows(op_code, chunks, workers):
+    # "spawn" like app/worker.py: a forked child would inherit the log listener's and the calculator's
+    # locks in whatever state they were in; its records are written by this process
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_start_worker,
+                             initargs=(child_log_queue(),)) as executor:
+        pending = []
+        for chunk in chunks:
+            pending.append(executor.submit(evaluate_chunk, op_code, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+
+# sweep_<op>_<timestamp>.csv in CALCULATOR_HISTORY_DIR, created empty ("x" mode) so that a sweep
+# started at the same moment gets another name; the complete table replaces it
+def default_sweep_path(op_code):
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    try:
+        os.makedirs(CALCULATOR_HISTORY_DIR, exist_ok=True)
+        for attempt in itertools.count():
+            suffix = f"_{attempt}" if attempt else ""
+            path = os.path.join(CALCULATOR_HISTORY_DIR, f"sweep_{op_code}_{timestamp}{suffix}.csv")
+            try:
+                with open(path, "x", encoding=CALCULATOR_DEFAULT_ENCODING):
+                    return path
+            except FileExistsError:
+                continue
+    except OSError as e:
+        logger.error(f"❌ Failed to create sweep file in {CALCULATOR_HISTORY_DIR}: {e}")
+        raise FileAccessError(f"❌ Failed to create sweep file: {e}") from e
+
+
+def run_sweep(op_code, a_spec, b_spec, path=None, workers=CALCULATOR_SWEEP_WORKERS, chunk_size=CALCULATOR_SWEEP_CHUNK_SIZE):
+    '''
+    Evaluates op_code over every (a, b) of the grid and streams one CSV row per point to `path`.
+    Only one chunk of rows per worker is held in memory at a time; the file is written to a
+    temporary name and renamed when complete.
+
+    Returns (operation, a_range, b_range, path, rows, errors).
+    '''
+    op_code = str(op_code).strip().lower()
+    a_range, b_range = SweepRange(a_spec), SweepRange(b_spec)
+    points = len(a_range) * len(b_range)
+    if points > CALCULATOR_SWEEP_MAX_POINTS:
+        logger.error(f"❌ Sweep of {points} points rejected (max {CALCULATOR_SWEEP_MAX_POINTS})")
+        raise ValidationError(f"❌ Sweep has {points} points, max allowed {CALCULATOR_SWEEP_MAX_POINTS}")
+
+    operation = registry.create(op_code)
+    reserved = path is None
+    path = path or default_sweep_path(op_code)
+    chunks = _chunks(grid(a_range, b_range), chunk_size)
+    if workers > 1 and points > chunk_size:
+        batches = _parallel_rows(op_code, chunks, workers)
+    else:
+        batches = (evaluate_chunk(op_code, chunk, operation) for chunk in chunks)
+
+    rows = errors = 0
+    tmp_path = path + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(tmp_path, "w", encoding=CALCULATOR_DEFAULT_ENCODING, newline="") as file:
+            writer = csv.writer(file, lineterminator="\n")
+            writer.writerow(SWEEP_COLUMNS)
+            for batch in batches:
+                writer.writerows(batch)
+                rows += len(batch)
+                errors += sum(1 for row in batch if row[3])
+        os.replace(tmp_path, path)
+    except Exception as e:
+        # never leave half a table behind, nor the empty file reserving the default name
+        for leftover in (tmp_path, path) if reserved else (tmp_path,):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+        if isinstance(e, CalculatorError):
+            raise
+        if isinstance(e, OSError):
+            logger.error(f"❌ Failed to write sweep {path}: {e}")
+            raise FileAccessError(f"❌ Failed to write sweep: {e}") from e
+        logger.exception("❌ Unexpected error during sweep.")
+        raise OperationError(f"❌ Sweep failed: {e}") from e
+
+    logger.info("✅ Sweep %s over a=%s, b=%s: %d rows, %d errors written to %s", op_code, a_range, b_range, rows, errors, path)
+    return operation, a_range, b_range, path, rows, errors
@@ -0,0 +1,162 @@
+# app/vector_mode.py
+import re
+from decimal import Decimal, ROUND_HALF_UP, localcontext
+from app.logger import logger
+from app.exceptions import ValidationError, OperationError
+from app.config import CALCULATOR_PRECISION, CALCULATOR_VECTOR_MAX_ELEMENTS
+from app.calculation import calculation_context, INTEGER_DIGITS
+from app.input_validators import parse_operand
+from app.operation_registry import registry
+from app.reductions import REDUCTIONS, create_reduction
+
+try:
+    import numpy as np
+except ImportError: # pragma: no cover
+    np = None
+
+# op code of the matrix product, next to the registry's operations and the reductions
+MATMUL = "matmul"
+
+# elements shown in a history summary before the rest is elided
+SUMMARY_ITEMS = 3
+
+
+##############################################################
+############### Vector mode
+##############################################################
+'''
+Element-wise calculations, matrix products and reductions over NumPy arrays of Decimal.
+
+Arrays hold Decimal objects (dtype=object), so every element is computed and rounded exactly like
+a scalar calculation: NumPy brings the shapes, broadcasting and the matrix product, the registry's
+operation brings the arithmetic. A whole array operation is one history entry, with the operands
+and the result summarized, e.g. "...,Addition,vector(1000)[1 2 3 .. 1000],2,vector(1000)[3 4 5 .. 1002],..."
+'''
+
+
+def _require_numpy():
+    if np is None:
+        logger.error("❌ Vector mode requested but numpy is not installed")
+        raise OperationError("❌ Vector mode requires numpy (pip install numpy)")
+
+
+def _round(value: Decimal) -> Decimal:
+    return value.quantize(Decimal(f"1.{'0'*CALCULATOR_PRECISION}"), rounding=ROUND_HALF_UP)
+
+
+# text or (nested) list -> array of validated Decimal; in text, rows are separated by ";"
+# and values by commas or whitespace: "1 2; 3 4" is a 2x2 matrix, "5" a scalar
+def parse_array(value):
+    _require_numpy()
+    if isinstance(value, str):
+        rows = [[token for token in re.split(r"[,\s]+", row.strip()) if token] for row in value.strip().strip("[]").split(";")]
+        rows = [row for row in rows if row]
+        if not rows:
+            raise ValidationError("❌ Enter at least one number")
+        value = rows[0] if len(rows) == 1 else rows
+        if len(rows) == 1 and len(rows[0]) == 1:
+            value = rows[0][0]
+
+    try:
+        array = np.array(value, dtype=object)
+    except ValueError as e:
+        logger.info(f"❌ Invalid array '{value}': {e}")
+        raise ValidationError(f"❌ Rows must all have the same length: {e}")
+    if array.size > CALCULATOR_VECTOR_MAX_ELEMENTS:
+        raise ValidationError(f"❌ Array too large: {array.size} elements, max allowed {CALCULATOR_VECTOR_MAX_ELEMENTS}")
+    if any(isinstance(element, (list, tuple)) for element in array.flat):
+        raise ValidationError("❌ Rows must all have the same length")
+    return np.frompyfunc(parse_operand, 1, 1)(array) if array.ndim else parse_operand(array.item())
+
+
+# compact, comma free description of a value for the history: "matrix(2x3)[1 2 3 .. 6]"
+def summarize(value) -> str:
+    if np is None or not isinstance(value, np.ndarray) or value.ndim == 0:
+        return str(value)
+    kind = "vector" if value.ndim == 1 else "matrix"
+    items = [str(element) for element in value.flat[:SUMMARY_ITEMS]]
+    if value.size > SUMMARY_ITEMS:
+        items += ["..", str(value.flat[-1])]
+    return f"{kind}({'x'.join(map(str, value.shape))})[{' '.join(items)}]"
+
+
+# registry operation applied element by element, with NumPy broadcasting ("1 2 3" + "10" adds 10 to each)
+def elementwise(operation, a, b):
+    try:
+        a, b = np.broadcast_arrays(np.asarray(a, dtype=object), np.asarray(b, dtype=object))
+    except ValueError:
+        logger.error(f"❌ Shapes {np.shape(a)} and {np.shape(b)} cannot be broadcast together")
+        raise ValidationError(f"❌ Shapes {np.shape(a)} and {np.shape(b)} cannot be broadcast together")
+    if a.size > CALCULATOR_VECTOR_MAX_ELEMENTS:
+        raise ValidationError(f"❌ Result too large: {a.size} elements, max allowed {CALCULATOR_VECTOR_MAX_ELEMENTS}")
+    return np.frompyfunc(operation.evaluate, 2, 1)(a, b)
+
+
+# matrix product (dot product for two vectors) of the rounded operands, every element rounded once
+def matmul(a, b):
+    if np.ndim(a) == 0 or np.ndim(b) == 0:
+        raise ValidationError("❌ Matrix multiplication needs vectors or matrices, not single numbers")
+    # products have 2 * CALCULATOR_PRECISION decimals, the sums of products stay exact; the
+    # rounding happens in the same context, the default one is too narrow for a high precision
+    with localcontext(calculation_context(INTEGER_DIGITS + CALCULATOR_PRECISION)):
+        a = np.frompyfunc(_round, 1, 1)(np.asarray(a, dtype=object))
+        b = np.frompyfunc(_round, 1, 1)(np.asarray(b, dtype=object))
+        try:
+            result = np.matmul(a, b)
+        except ValueError as e:
+            logger.error(f"❌ Shapes {a.shape} and {b.shape} cannot be multiplied: {e}")
+            raise ValidationError(f"❌ Shapes {a.shape} and {b.shape} cannot be multiplied")
+        if isinstance(result, np.ndarray):
+            return np.frompyfunc(_round, 1, 1)(result)
+        return _round(result)
+
+
+# reduction over the whole array (axis None) or along one axis, e.g. column sums with axis=0
+def reduce_array(reduction, a, axis=None):
+    a = np.asarray(a, dtype=object)
+    if axis is None or a.ndim == 0:
+        return reduction.reduce(a.flat)[0]
+    try:
+        return np.apply_along_axis(lambda lane: reduction.reduce(lane)[0], int(axis), a)
+    except (ValueError, TypeError) as e:
+        logger.error(f"❌ Invalid axis {axis} for an array of shape {a.shape}: {e}")
+        raise ValidationError(f"❌ Invalid axis {axis} for an array of shape {a.shape}")
+
+
+# op_code is a registry operation, "matmul" or a reduction; returns the name for the history,
+# the parsed operands and the result
+def run(op_code, a, b=None, axis=None):
+    _require_numpy()
+    op_code = str(op_code).strip().lower()
+    a = parse_array(a)
+
+    if op_code in REDUCTIONS:
+        reduction = create_reduction(op_code)
+        return reduction.name, a, None, reduce_array(reduction, a, axis)
+
+    operation = None if op_code == MATMUL else registry.create(op_code)
+    if operation is not None and operation.operands == 1:
+        # function of one operand, e.g. sin of every element
+        return operation.__class__.__name__, a, None, np.frompyfunc(operation.evaluate, 1, 1)(np.asarray(a, dtype=object))
+
+    if b is None:
+        raise ValidationError(f"❌ '{op_code}' needs a second operand")
+    b = parse_array(b)
+
+    if operation is None:
+        return "MatrixMultiplication", a, b, matmul(a, b)
+    return operation.__class__.__name__, a, b, elementwise(operation, a, b)
+
+
+# printable form of a result: rows of plain numbers instead of Decimal('...') reprs
+def format_array(value) -> str:
+    if np is not None and isinstance(value, np.ndarray):
+        return np.array2string(value, formatter={"all": str}, threshold=100)
+    return str(value)
+
+
+# JSON friendly form of a result: nested lists of strings
+def to_list(value):
+    if np is not None and isinstance(value, np.ndarray):
+        return np.frompyfunc(str, 1, 1)(value).tolist()
+    return str(value)
@@ -0,0 +1,189 @@
+# app/worker.py
+import multiprocessing
+import pickle
+import queue
+import signal
+import threading
+from decimal import Decimal
+from app.logger import logger, child_log_queue, forward_logs_to
+from app.exceptions import CalculatorError, OperationError
+from app.config import CALCULATOR_OPERATION_TIMEOUT, CALCULATOR_WORKER_PROCESSES, CALCULATOR_WORKER_START_TIMEOUT
+
+# "spawn" rather than fork: a forked child would inherit the locks of the parent's threads
+# (log listener, observers) in whatever state they were in
+_CONTEXT = multiprocessing.get_context("spawn")
+
+# first message of a worker, once it is warmed up
+READY = "ready"
+
+
+##############################################################
+############### Worker process
+##############################################################
+def _serve(conn, log_queue):
+    '''
+    Body of a worker process: warm up, then answer pickled (operation, a, b) jobs with
+    ("ok", result) or ("error", exception) until it receives an empty message or the pipe is closed.
+    '''
+    # Ctrl+C in the REPL reaches the whole process group; the parent decides what to cancel
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # records go to the parent, the only process writing the log file
+    forward_logs_to(log_queue)
+
+    # import the registry, its plugins and the calculation code, and run one calculation,
+    # so the first real job does not pay for the imports
+    from app.operation_registry import registry
+    registry.create("add").evaluate(Decimal(1), Decimal(1))
+    conn.send(READY)
+
+    while True:
+        try:
+            job = conn.recv_bytes()
+        except EOFError:
+            break
+        if job == b"":
+            break
+        operation, a, b = pickle.loads(job)
+        try:
+            conn.send(("ok", operation.calculate(a, b)))
+        except CalculatorError as e:
+            conn.send(("error", e))
+        except Exception as e:
+            conn.send(("error", OperationError(f"❌ Unexpected error: {e}")))
+
+
+class WorkerTimeout(Exception):
+    """The worker did not answer within the time budget."""
+    pass
+
+
+class UnpicklableOperation(Exception):
+    """The job cannot be sent to another process (e.g. a plugin with a lambda validator)."""
+    pass
+
+
+##############################################################
+############### CalculationWorker
+##############################################################
+class CalculationWorker:
+    '''
+    One worker process and the pipe to it. The process is started right away and warms up in
+    the background; run() waits for it to be ready before the time budget starts counting.
+    '''
+    def __init__(self):
+        self.conn, child_conn = _CONTEXT.Pipe()
+        self.process = _CONTEXT.Process(target=_serve, args=(child_conn, child_log_queue()), name="calc-worker", daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+    def wait_ready(self, timeout=CALCULATOR_WORKER_START_TIMEOUT):
+        if self.ready:
+            return
+        if not self.conn.poll(timeout):
+            raise OperationError(f"❌ Calculation worker did not start within {timeout} seconds")
+        self.conn.recv()
+        self.ready = True
+
+    # result of operation.calculate(a, b) computed in the worker; timeout None = no limit
+    def run(self, operation, a, b, timeout=None):
+        try:
+            job = pickle.dumps((operation, a, b))
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            raise UnpicklableOperation(e) from e
+
+        self.wait_ready()
+        self.conn.send_bytes(job)
+        if not self.conn.poll(timeout):
+            raise WorkerTimeout()
+        status, value = self.conn.recv()
+        if status == "error":
+            raise value
+        return value
+
+    # ask the worker to exit, kill it if it does not
+    def stop(self, timeout=1.0):
+        try:
+            self.conn.send_bytes(b"")
+        except OSError:
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.kill()
+        self.conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+##############################################################
+############### WorkerSupervisor
+##############################################################
+class WorkerSupervisor:
+    '''
+    Pool of pre-warmed worker processes running calculations with a time budget.
+
+    A calculation that exceeds the budget, or is interrupted with Ctrl+C, raises OperationError;
+    its worker is killed (nothing else can stop a thread stuck in a long integer multiplication)
+    and replaced by a fresh one that warms up in the background. Calling threads each take an idle
+    worker, or wait for one, so processes=N runs up to N calculations at the same time.
+    '''
+    def __init__(self, processes=CALCULATOR_WORKER_PROCESSES, timeout=CALCULATOR_OPERATION_TIMEOUT):
+        # 0 or None = no time limit
+        self.timeout = timeout or None
+        self.processes = max(processes, 1)
+        self.replaced = 0
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        for _ in range(self.processes):
+            self._idle.put(CalculationWorker())
+        logger.info("✅ %d calculation worker(s) started, time budget %ss per operation", self.processes, self.timeout)
+
+    def calculate(self, operation, a, b, timeout=None):
+        if self._closed:
+            raise OperationError("❌ Calculation workers are stopped")
+        timeout = timeout or self.timeout
+        name = operation.__class__.__name__
+        worker = self._idle.get()
+        try:
+            return worker.run(operation, a, b, timeout)
+        except WorkerTimeout:
+            logger.error(f"❌ {name} of {a}, {b} exceeded {timeout}s, worker {worker.pid} killed and replaced")
+            worker = self._replace(worker)
+            raise OperationError(f"❌ {name} took longer than {timeout} seconds and was cancelled")
+        except KeyboardInterrupt:
+            logger.warning(f"⚠️ {name} of {a}, {b} cancelled by user, worker {worker.pid} killed and replaced")
+            worker = self._replace(worker)
+            raise OperationError(f"❌ {name} was cancelled")
+        except (EOFError, OSError) as e:
+            logger.error(f"❌ Calculation worker {worker.pid} died during {name}: {e}, replaced")
+            worker = self._replace(worker)
+            raise OperationError(f"❌ {name} failed: the calculation worker stopped unexpectedly")
+        except UnpicklableOperation as e:
+            # still computed, in this process and without a time budget
+            logger.warning(f"⚠️ {name} cannot be sent to a worker ({e}), calculated in process")
+            return operation.calculate(a, b)
+        finally:
+            self._idle.put(worker)
+
+    def _replace(self, worker):
+        worker.kill()
+        with self._lock:
+            self.replaced += 1
+        return CalculationWorker()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        for _ in range(self.processes):
+            self._idle.get().stop()
+        logger.info("👋 Calculation workers stopped")
@@ -0,0 +1,185 @@
+# app/write_ahead_log.py
+import json
+import os
+import threading
+try:
+    import fcntl
+except ImportError: # pragma: no cover
+    # Windows
+    fcntl = None
+    import msvcrt
+from app.logger import logger
+from app.exceptions import FileAccessError
+from app.config import (
+    CALCULATOR_HISTORY_DIR,
+    CALCULATOR_DEFAULT_ENCODING,
+    CALCULATOR_WAL_FILE,
+    CALCULATOR_WAL_FSYNC,
+    CALCULATOR_WAL_COMPACT_RECORDS
+)
+
+
+##############################################################
+############### WriteAheadLog
+##############################################################
+class WriteAheadLog:
+    '''
+    Append-only JSON-lines journal of calculator state changes.
+
+    Every change is one small sequential append, written before the caller returns:
+        {"op": "add", "entry": "..."}      {"op": "undo"}      {"op": "redo"}
+        {"op": "clear"}                    {"op": "load", "entries": [...]}
+        {"op": "snapshot", "state": {...}}     (written by compaction, see app/session_snapshot.py)
+
+    On startup read() returns the records of a run that did not exit cleanly, so the Calculator
+    can replay them. A record torn by a crash mid-write ends the log: it and anything after it
+    are dropped. Once compact_records records have piled up, the log is rewritten as a single
+    snapshot of the current state so replay never grows without bound.
+
+    One calculator process owns the log at a time: it holds an exclusive lock on <log>.lock from
+    construction to close(), and a second process gets a FileAccessError instead of interleaving
+    its records with the first one's (or recovering, compacting and deleting them). The lock goes
+    away with its process, so the next start after a crash can take it and replay the log.
+    '''
+    def __init__(self, log_file=CALCULATOR_WAL_FILE, fsync=CALCULATOR_WAL_FSYNC, compact_records=CALCULATOR_WAL_COMPACT_RECORDS):
+        try:
+            os.makedirs(CALCULATOR_HISTORY_DIR, exist_ok=True)
+            self.log_file = os.path.join(CALCULATOR_HISTORY_DIR, log_file)
+        except Exception as e: # pragma: no cover
+            logger.error(f"❌ Failed to initialize write-ahead log: {e}")
+            raise FileAccessError(f"❌ Failed to initialize write-ahead log: {e}") from e
+        self._owner = self._acquire_ownership()
+
+        self.fsync = fsync
+        self.compact_records = compact_records
+        self.records = 0
+        self._file = None
+        self._lock = threading.Lock()
+        logger.info(f"✅ Write-ahead log initialized: {self.log_file}")
+
+    # ----------------- Ownership -----------------
+
+    # exclusive, non-blocking lock on <log>.lock, which records the owner's pid
+    def _acquire_ownership(self):
+        lock_path = self.log_file + ".lock"
+        try:
+            handle = open(lock_path, "a+", encoding=CALCULATOR_DEFAULT_ENCODING)
+        except OSError as e: # pragma: no cover
+            logger.error(f"❌ Failed to open write-ahead log lock {lock_path}: {e}")
+            raise FileAccessError(f"❌ Failed to open write-ahead log lock: {e}") from e
+        try:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else: # pragma: no cover
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            handle.seek(0)
+            owner = handle.read().strip() or "unknown"
+            handle.close()
+            logger.warning(f"⚠️ Write-ahead log {self.log_file} is in use by process {owner}")
+            raise FileAccessError(f"❌ Write-ahead log {self.log_file} is in use by another calculator (process {owner})")
+        handle.seek(0)
+        handle.truncate()
+        handle.write(str(os.getpid()))
+        handle.flush()
+        return handle
+
+    def _release_ownership(self):
+        if self._owner is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._owner.fileno(), fcntl.LOCK_UN)
+        finally:
+            # closing the handle releases the lock on Windows
+            self._owner.close()
+            self._owner = None
+
+    # ----------------- Recovery -----------------
+
+    # records left by the previous run; a torn or corrupt tail is cut off the file
+    def read(self):
+        if not os.path.exists(self.log_file):
+            return []
+
+        records = []
+        good_offset = 0
+        try:
+            with open(self.log_file, "rb") as file:
+                for line in file:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("incomplete record")
+                        records.append(json.loads(line.decode(CALCULATOR_DEFAULT_ENCODING)))
+                    except ValueError as e:
+                        logger.warning(f"⚠️ Write-ahead log truncated at byte {good_offset}: {e}")
+                        break
+                    good_offset += len(line)
+
+            if good_offset != os.path.getsize(self.log_file):
+                with open(self.log_file, "r+b") as file:
+                    file.truncate(good_offset)
+
+        except OSError as e:
+            logger.error(f"❌ Failed to read write-ahead log: {e}")
+            raise FileAccessError(f"❌ Failed to read write-ahead log: {e}") from e
+
+        self.records = len(records)
+        logger.info(f"✅ Write-ahead log holds {len(records)} records to replay")
+        return records
+
+    # ----------------- Appending -----------------
+
+    def append(self, op, **fields):
+        record = {"op": op, **fields}
+        with self._lock:
+            try:
+                if self._file is None:
+                    self._file = open(self.log_file, "a", encoding=CALCULATOR_DEFAULT_ENCODING)
+                self._file.write(json.dumps(record) + "\n")
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+                self.records += 1
+            except Exception as e:
+                logger.error(f"❌ Failed to append to write-ahead log: {e}")
+                raise FileAccessError(f"❌ Failed to append to write-ahead log: {e}") from e
+
+    def needs_compaction(self):
+        return bool(self.compact_records) and self.records >= self.compact_records
+
+    # replace every record with one snapshot of the current state, atomically
+    def compact(self, state):
+        with self._lock:
+            tmp_path = self.log_file + ".tmp"
+            try:
+                with open(tmp_path, "w", encoding=CALCULATOR_DEFAULT_ENCODING) as file:
+                    file.write(json.dumps({"op": "snapshot", "state": state}) + "\n")
+                    file.flush()
+                    if self.fsync:
+                        os.fsync(file.fileno())
+
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                os.replace(tmp_path, self.log_file)
+                self.records = 1
+                logger.info(f"✅ Write-ahead log compacted into a snapshot: {self.log_file}")
+            except Exception as e:
+                logger.error(f"❌ Failed to compact write-ahead log: {e}")
+                raise FileAccessError(f"❌ Failed to compact write-ahead log: {e}") from e
+
+    # ----------------- Shutdown -----------------
+
+    # on a clean exit there is nothing to recover, so the log is removed; either way the log
+    # is released for the next calculator
+    def close(self, discard=True):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if discard and os.path.exists(self.log_file):
+                os.remove(self.log_file)
+                self.records = 0
+                logger.info(f"✅ Write-ahead log discarded after clean shutdown: {self.log_file}")
+            self._release_ownership()
@@ -0,0 +1,45 @@
+# benchmarks/bench_history.py
+'''
+Compares appending to a full history: the previous list re-slicing against the RingBuffer.
+
+Run from the project root:  python -m benchmarks.bench_history
+'''
+import timeit
+from app.ring_buffer import RingBuffer
+
+SIZES = [100, 1000, 10000, 100000]
+ENTRY = "2025-10-21 10:00:00,Addition,1,2,3.0000,00000000-0000-0000-0000-000000000000"
+
+
+def legacy_append(history, max_size):
+    # what Originator.add_operation did before the ring buffer
+    history.append(ENTRY)
+    if len(history) > max_size:
+        excess = len(history) - max_size
+        history = history[excess:]
+    return history
+
+
+def time_call(func, repeat=5) -> float:
+    # best average of `repeat` runs, in microseconds per call
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def main():
+    print(f"{'size':>8} {'list us':>10} {'ring us':>10} {'speedup':>8}")
+    for size in SIZES:
+        state = {"history": [ENTRY] * size}
+        ring = RingBuffer([ENTRY] * size, maxlen=size)
+
+        def run_legacy():
+            state["history"] = legacy_append(state["history"], size)
+
+        legacy = time_call(run_legacy)
+        buffered = time_call(lambda: ring.append(ENTRY))
+        print(f"{size:>8} {legacy:>10.2f} {buffered:>10.2f} {legacy / buffered:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
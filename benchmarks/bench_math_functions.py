@@ -0,0 +1,109 @@
+# benchmarks/bench_math_functions.py
+'''
+Compares the fixed point transcendental functions of app.math_functions with computing them
+directly in Decimal: Decimal's own exp/ln/log10, and for sin, cos and atan the Taylor series of
+the decimal module documentation, without argument reduction.
+
+"cold" is the first call at a precision, including the constants (pi, ln2, ln10, 1/n!) it caches;
+"warm" is every later call at that precision.
+
+Run from the project root:  python -m benchmarks.bench_math_functions
+'''
+import timeit
+from decimal import Decimal, ROUND_HALF_UP, localcontext
+from app import math_functions
+from app.math_functions import exp, ln, log10, sin, cos, atan
+
+PRECISIONS = [4, 28, 200]
+CASES = [("exp", exp, "2.5"), ("ln", ln, "123.456"), ("log10", log10, "123.456"),
+         ("sin", sin, "2.5"), ("cos", cos, "2.5"), ("atan", atan, "0.9")]
+
+
+def _quantize(value: Decimal, places: int) -> Decimal:
+    with localcontext() as ctx:
+        ctx.prec = places + 12
+        return value.quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP)
+
+
+def naive_sin(x: Decimal, places: int) -> Decimal:
+    with localcontext() as ctx:
+        ctx.prec = places + 12
+        i, lasts, s, fact, num, sign = 1, 0, x, 1, x, 1
+        while s != lasts:
+            lasts = s
+            i += 2
+            fact *= i * (i - 1)
+            num *= x * x
+            sign *= -1
+            s += num / fact * sign
+    return _quantize(s, places)
+
+
+def naive_cos(x: Decimal, places: int) -> Decimal:
+    with localcontext() as ctx:
+        ctx.prec = places + 12
+        i, lasts, s, fact, num, sign = 0, 0, 1, 1, 1, 1
+        while s != lasts:
+            lasts = s
+            i += 2
+            fact *= i * (i - 1)
+            num *= x * x
+            sign *= -1
+            s += num / fact * sign
+    return _quantize(s, places)
+
+
+def naive_atan(x: Decimal, places: int) -> Decimal:
+    # x - x**3/3 + x**5/5 ..., for |x| <= 1
+    with localcontext() as ctx:
+        ctx.prec = places + 12
+        n, lasts, s, num, sign = 1, 0, x, x, 1
+        while s != lasts:
+            lasts = s
+            n += 2
+            num *= x * x
+            sign *= -1
+            s += num / n * sign
+    return _quantize(s, places)
+
+
+def naive(name, x: Decimal, places: int) -> Decimal:
+    if name in ("sin", "cos", "atan"):
+        return {"sin": naive_sin, "cos": naive_cos, "atan": naive_atan}[name](x, places)
+    with localcontext() as ctx:
+        ctx.prec = places + 12
+        return _quantize(getattr(x, name)(), places)
+
+
+def clear_constants():
+    for cached in (math_functions._pi, math_functions._ln2, math_functions._ln10, math_functions._inverse_factorials):
+        cached.cache_clear()
+
+
+def time_call(func, repeat=5) -> float:
+    # best average of `repeat` runs, in microseconds per call
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def time_cold(func) -> float:
+    clear_constants()
+    timer = timeit.Timer(func)
+    return timer.timeit(number=1) * 1e6
+
+
+def main():
+    print(f"{'digits':>6} {'function':>12} {'decimal us':>11} {'cold us':>9} {'warm us':>9} {'speedup':>8}  same")
+    for places in PRECISIONS:
+        for name, function, raw in CASES:
+            x = Decimal(raw)
+            baseline = time_call(lambda: naive(name, x, places))
+            cold = time_cold(lambda: function(x, places))
+            warm = time_call(lambda: function(x, places))
+            same = naive(name, x, places) == function(x, places)
+            print(f"{places:>6} {f'{name}({raw})':>12} {baseline:>11.1f} {cold:>9.1f} {warm:>9.1f} {baseline / warm:>7.1f}x  {'same' if same else 'differs'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# benchmarks/bench_result_cache.py
+'''
+Compares computing Power and Root with fetching their results from a warm ResultCache, the
+on-disk cache a calculator process reopens after a restart.
+
+"computed" calls runOperation every time, "cached" is a cache hit: one SQLite lookup of the key.
+
+Run from the project root:  python -m benchmarks.bench_result_cache
+'''
+import os
+import tempfile
+import timeit
+from decimal import Decimal
+from unittest.mock import patch
+from app import result_cache
+from app.result_cache import ResultCache
+from app.calculation import Power, Root, Exp
+
+CASES = [("Power 1.0001 ^ 999.5", Power(), "1.0001", "999.5"),
+         ("Power 7.25 ^ 400", Power(), "7.25", "400"),
+         ("Root 999.9 ^ (1/7.5)", Root(), "999.9", "7.5"),
+         ("Exp 12.5", Exp(), "12.5", "0"),
+         ("Power 999.99 ^ 999.5", Power(), "999.99", "999.5")]
+NUMBER = 5
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ResultCache(os.path.join(directory, "bench_cache.sqlite3"), min_seconds=0)
+        print(f"{'case':<26}{'computed':>14}{'cached':>14}{'speedup':>10}")
+        for name, operation, a, b in CASES:
+            a, b = Decimal(a), Decimal(b)
+            computed = min(timeit.repeat(lambda: operation.evaluate(a, b), number=NUMBER, repeat=3)) / NUMBER
+            with patch.object(result_cache, "CALCULATOR_RESULT_CACHE_ENABLED", True), patch.object(result_cache, "_shared", cache), \
+                    patch("app.calculation.logger"):
+                operation.calculate(a, b)
+                cached = min(timeit.repeat(lambda: operation.calculate(a, b), number=NUMBER, repeat=3)) / NUMBER
+            print(f"{name:<26}{computed * 1e6:>12.1f}us{cached * 1e6:>12.1f}us{computed / cached:>9.1f}x")
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
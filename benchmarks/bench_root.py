@@ -0,0 +1,44 @@
+# benchmarks/bench_root.py
+'''
+Compares the integer Newton nth_root against the previous a ** (1 / b) implementation.
+
+Run from the project root:  python -m benchmarks.bench_root
+'''
+import timeit
+from decimal import Decimal, ROUND_HALF_UP, localcontext
+from app.calculation import INTEGER_DIGITS
+from app.math_functions import nth_root
+
+PRECISIONS = [4, 28, 100, 1000]
+CASES = [("2", 2), ("27", 3), ("999.1234", 3), ("7.5", 7)]
+
+
+def legacy_root(a: Decimal, b: int, places: int) -> Decimal:
+    # what Root.runOperation + format_result did before the Newton path
+    with localcontext() as ctx:
+        ctx.prec = places + INTEGER_DIGITS
+        result = a ** (Decimal("1") / Decimal(b))
+        return result.quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP)
+
+
+def time_call(func, repeat=5) -> float:
+    # best average of `repeat` runs, in microseconds per call
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def main():
+    print(f"{'digits':>6} {'case':>14} {'legacy us':>12} {'newton us':>12} {'speedup':>8}  exact")
+    for places in PRECISIONS:
+        for raw, degree in CASES:
+            a = Decimal(raw)
+            legacy = time_call(lambda: legacy_root(a, degree, places))
+            newton = time_call(lambda: nth_root(a, degree, places))
+            same = legacy_root(a, degree, places) == nth_root(a, degree, places)
+            case = f"{raw}^(1/{degree})"
+            print(f"{places:>6} {case:>14} {legacy:>12.1f} {newton:>12.1f} {legacy / newton:>7.1f}x  {'same' if same else 'differs'}")
+
+
+if __name__ == "__main__":
+    main()
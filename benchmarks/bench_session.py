@@ -0,0 +1,76 @@
+# benchmarks/bench_session.py
+'''
+Compares the plain JSON session file (every undo/redo state in full, one list copy per memento on
+restore) with the delta-encoded session snapshot, for a full history and full undo stack.
+
+Run from the project root:  python -m benchmarks.bench_session
+'''
+import json
+import os
+import tempfile
+import time
+from unittest.mock import patch
+from app.memento import Originator, CareTaker, MementoCalculator
+from app.session_snapshot import write_snapshot, read_snapshot
+
+SIZES = [10, 50, 100]
+
+
+def build(size):
+    originator, caretaker = Originator(), CareTaker()
+    for n in range(size * 2):
+        originator.add_operation(f"2025-10-21 10:00:00,Addition,{n},1,{n + 1},abc", caretaker=caretaker)
+    for _ in range(size // 4):
+        caretaker.undo_memento(originator)
+    return originator, caretaker
+
+
+def legacy_write(path, state):
+    with open(path, "w") as file:
+        json.dump(state, file)
+
+
+def legacy_restore(path, originator, caretaker):
+    with open(path) as file:
+        state = json.load(file)
+    originator.history = list(state["history"])
+    caretaker.stack_undo = caretaker._new_stack(MementoCalculator(s) for s in state["undo"])
+    caretaker.stack_redo = caretaker._new_stack(MementoCalculator(s) for s in state["redo"])
+
+
+def snapshot_restore(path, originator, caretaker):
+    caretaker.import_state(originator, read_snapshot(path))
+
+
+def time_restore(restore, path, repeat=20) -> float:
+    # best of `repeat` restores into a fresh calculator, in milliseconds
+    best = float("inf")
+    for _ in range(repeat):
+        originator, caretaker = Originator(), CareTaker()
+        start = time.perf_counter()
+        restore(path, originator, caretaker)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+def main():
+    print(f"{'size':>5} {'json KB':>8} {'snap KB':>8} {'json ms':>8} {'snap ms':>8} {'speedup':>8}")
+    # keep logging out of the measurement
+    with patch("app.memento.logger"), patch("app.history_timeline.logger"), tempfile.TemporaryDirectory() as directory:
+        for size in SIZES:
+            with patch("app.memento.CALCULATOR_MAX_HISTORY_SIZE", size):
+                originator, caretaker = build(size)
+                state = caretaker.export_state(originator)
+                legacy_path = os.path.join(directory, "legacy.json")
+                snapshot_path = os.path.join(directory, "snapshot.json")
+                legacy_write(legacy_path, state)
+                write_snapshot(snapshot_path, state)
+
+                legacy = time_restore(legacy_restore, legacy_path)
+                snapshot = time_restore(snapshot_restore, snapshot_path)
+            print(f"{size:>5} {os.path.getsize(legacy_path) / 1024:>8.1f} {os.path.getsize(snapshot_path) / 1024:>8.1f} "
+                  f"{legacy:>8.2f} {snapshot:>8.2f} {legacy / snapshot:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
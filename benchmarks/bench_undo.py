@@ -0,0 +1,52 @@
+# benchmarks/bench_undo.py
+'''
+Compares going back K steps with K undo_memento calls against one checkpoint/replay undo_to.
+
+Run from the project root:  python -m benchmarks.bench_undo
+'''
+import time
+from unittest.mock import patch
+from app.memento import Originator, CareTaker
+
+STEPS_BACK = [1, 10, 50, 99]
+
+
+def build(size=100):
+    originator, caretaker = Originator(), CareTaker()
+    for n in range(size):
+        originator.add_operation(f"2025-10-21 10:00:00,Addition,{n},1,{n + 1},abc", caretaker=caretaker)
+    return originator, caretaker
+
+
+def time_jump(jump, steps_back, repeat=20) -> float:
+    # best of `repeat` runs on a fresh session, in microseconds
+    best = float("inf")
+    for _ in range(repeat):
+        originator, caretaker = build()
+        start = time.perf_counter()
+        jump(originator, caretaker, steps_back)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6
+
+
+def repeated_undo(originator, caretaker, steps_back):
+    for _ in range(steps_back):
+        caretaker.undo_memento(originator)
+
+
+def undo_to(originator, caretaker, steps_back):
+    caretaker.undo_to(originator, step=caretaker.timeline.position - steps_back)
+
+
+def main():
+    print(f"{'steps':>6} {'undo x K us':>12} {'undo_to us':>12} {'speedup':>8}")
+    # keep logging out of the measurement
+    with patch("app.memento.logger"), patch("app.history_timeline.logger"):
+        for steps_back in STEPS_BACK:
+            legacy = time_jump(repeated_undo, steps_back)
+            jump = time_jump(undo_to, steps_back)
+            print(f"{steps_back:>6} {legacy:>12.1f} {jump:>12.1f} {legacy / jump:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
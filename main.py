@@ -1,4 +1,10 @@
+import sys
 from app.calculator_repl import main
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # python main.py serve [--host H] [--port P] [--unix PATH] runs the JSON-RPC server instead of the REPL
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        from app.server import main as serve
+        serve(sys.argv[2:])
+    else:
+        main()
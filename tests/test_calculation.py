@@ -9,7 +9,8 @@ from app.exceptions import ValidationError, OperationError
 from app.config import CALCULATOR_MAX_INPUT_VALUE, CALCULATOR_PRECISION
 from unittest.mock import patch
 from unittest.mock import Mock
-from app.calculation import CalculationTemplate
+from app.calculation import CalculationTemplate, Exp
+from app.operation_registry import registry
 
 # Helper function to quantize decimals using config precision
 def quantize_decimal(val: Decimal):
@@ -262,9 +263,116 @@ class BadDecimal(Decimal):
 def test_root_runoperation_invalidoperation():
     op = Root()
     a = BadDecimal("4")
-    b = Decimal("2")
+    # fractional degree so the generic power path is used
+    b = Decimal("2.5")
 
     with pytest.raises(OperationError) as exc_info:
         op.runOperation(a, b)
 
-    assert "Root calculation failed" in str(exc_info.value)
\ No newline at end of file
+    assert "Root calculation failed" in str(exc_info.value)
+
+# ---------------------------------------------------------
+# Root exact and correctly rounded results
+# ---------------------------------------------------------
+@pytest.mark.parametrize("a, b, expected", [
+    ("27", "3", "3"),
+    ("1000", "3", "10"),
+    ("0.0016", "4", "0.2"),
+    ("2", "2", "1.4142"),
+    ("10", "3", "2.1544"),
+    ("16", "-2", "0.25"),
+    ("0", "5", "0"),
+])
+def test_root_integer_degree_exact(a, b, expected):
+    op = Root()
+    result = op.calculate(Decimal(a), Decimal(b))
+    assert result == quantize_decimal(Decimal(expected))
+
+
+def test_root_high_precision():
+    op = Root()
+    with patch("app.calculation.CALCULATOR_PRECISION", 100):
+        result = op.calculate(Decimal("2"), Decimal("2"))
+    assert str(result) == "1." + "4142135623730950488016887242096980785696718753769480731766797379907324784621070388503875343276415727"
+
+
+def test_root_fractional_degree_uses_power():
+    op = Root()
+    result = op.calculate(Decimal("8"), Decimal("1.5"))
+    assert result == quantize_decimal(Decimal("4"))
+
+
+# ---------------------------------------------------------
+# Power integer fast path and cost budget
+# ---------------------------------------------------------
+@pytest.mark.parametrize("a, b, expected", [
+    ("-2", "3", "-8"),
+    ("2", "-3", "0.125"),
+    ("1.5", "2", "2.25"),
+    ("0.5", "-10", "1024"),
+])
+def test_power_integer_exponent_exact(a, b, expected):
+    op = Power()
+    result = op.calculate(Decimal(a), Decimal(b))
+    assert result == quantize_decimal(Decimal(expected))
+
+
+def test_power_large_integer_result_is_exact():
+    op = Power()
+    result = op.calculate(Decimal("1000"), Decimal("1000"))
+    assert result == Decimal(10) ** 3000
+
+
+def test_power_rejects_result_over_budget():
+    op = Power()
+    with patch("app.calculation.CALCULATOR_MAX_RESULT_DIGITS", 50):
+        with pytest.raises(ValidationError) as exc_info:
+            op.calculate(Decimal("1000"), Decimal("20"))
+    assert "digits" in str(exc_info.value)
+
+
+def test_power_large_negative_exponent_skips_exact_path():
+    # a 44 digit result, but the exact path would build a 5 million digit integer first
+    with patch("app.calculation.integer_power", side_effect=AssertionError("exact path taken")):
+        result = Power().calculate(Decimal("1.0001"), Decimal("-1000000"))
+        assert result == quantize_decimal(Decimal(0))
+        assert Power().calculate(Decimal("0.9999"), Decimal("-100000")) == Decimal("22037.4825")
+
+
+def test_power_estimate_handles_bad_input():
+    op = Power()
+    # falls back to the default estimate and lets runOperation report the error
+    assert op.estimate_result_digits(Decimal("NaN"), Decimal("2")) == Addition().estimate_result_digits(Decimal("1"), Decimal("1"))
+
+
+def test_power_fractional_exponent():
+    op = Power()
+    result = op.calculate(Decimal("4"), Decimal("0.5"))
+    assert result == quantize_decimal(Decimal("2"))
+
+
+# -------------------------------
+# functions of one operand
+# -------------------------------
+@pytest.mark.parametrize("op_code, a, expected", [
+    ("exp", "2", "7.3891"), ("ln", "2", "0.6931"), ("log10", "2", "0.3010"),
+    ("sin", "2", "0.9093"), ("cos", "2", "-0.4161"), ("atan", "2", "1.1071"),
+])
+def test_unary_operations(op_code, a, expected):
+    op = registry.create(op_code)
+    assert op.operands == 1
+    assert op.calculate(Decimal(a)) == Decimal(expected)
+    assert op.evaluate(Decimal(a), Decimal("99")) == Decimal(expected)
+
+
+@pytest.mark.parametrize("op_code", ["ln", "log10"])
+@pytest.mark.parametrize("a", ["0", "-1"])
+def test_logarithm_rejects_non_positive(op_code, a):
+    with pytest.raises(OperationError):
+        registry.create(op_code).calculate(Decimal(a))
+
+
+def test_exp_rejects_result_over_budget():
+    with patch("app.calculation.CALCULATOR_MAX_RESULT_DIGITS", 50):
+        with pytest.raises(ValidationError):
+            Exp().calculate(Decimal("200"))
@@ -1,7 +1,7 @@
 import pytest
 from unittest.mock import MagicMock, patch
 from app.calculator import Calculator
-from app.exceptions import CommandError, OperationError
+from app.exceptions import CommandError, OperationError, HistoryError
 
 
 # ============================================================
@@ -89,6 +89,31 @@ def test_add_operation_saves(calc):
     calc.originator.add_operation.assert_called_once_with("5 + 5 = 10")
 
 
+def test_record_calculation_builds_entry_and_notifies(calc):
+    calc.add_operation = MagicMock()
+    calc.notify_observers = MagicMock()
+    operation_obj = MagicMock()
+    operation_obj.__class__.__name__ = "Addition"
+
+    entry = calc.record_calculation(operation_obj, 2, 3, 5)
+
+    parts = entry.split(",")
+    assert parts[1:] == ["Addition", "2", "3", "5", calc.instance_ID]
+    calc.add_operation.assert_called_once_with(entry)
+    calc.notify_observers.assert_called_once_with(entry)
+
+
+def test_record_calculation_of_unary_operation_leaves_operand2_empty(calc):
+    calc.add_operation = MagicMock()
+    calc.notify_observers = MagicMock()
+    operation_obj = MagicMock()
+    operation_obj.__class__.__name__ = "Exp"
+
+    entry = calc.record_calculation(operation_obj, 2, None, 7)
+
+    assert entry.split(",")[1:] == ["Exp", "2", "", "7", calc.instance_ID]
+
+
 def test_undo_calls_caretaker(calc):
     # Mock the undo_memento method
     calc.caretaker.undo_memento = MagicMock(return_value="last_operation")
@@ -115,6 +140,16 @@ def test_redo_calls_caretaker(calc):
     assert result == "redone_operation"
 
 
+def test_strict_undo_redo_raise_when_nothing_to_do(calc, capsys):
+    calc.caretaker.stack_undo.clear()
+    calc.caretaker.stack_redo.clear()
+    with pytest.raises(HistoryError, match="No operation to undo"):
+        calc.undo(strict=True)
+    with pytest.raises(HistoryError, match="No operation to redo"):
+        calc.redo(strict=True)
+    assert capsys.readouterr().out == ""
+
+
 # -----------------------------
 # Show & Delete history
 # -----------------------------
@@ -123,8 +158,25 @@ def test_show_history_prints(monkeypatch, calc):
     printed = []
     monkeypatch.setattr("builtins.print", lambda s: printed.append(s))
 
-    calc.show_history()
-    assert "2 + 2 = 4" in printed and "3 * 3 = 9" in printed
+    assert calc.show_history() == 2
+    # one write for the whole page
+    assert printed == ["2 + 2 = 4\n3 * 3 = 9"]
+
+
+def test_show_history_pages(monkeypatch, calc):
+    calc.originator.history = [f"entry {i}" for i in range(7)]
+    printed = []
+    monkeypatch.setattr("builtins.print", lambda s: printed.append(s))
+
+    with patch("builtins.input", side_effect=["", "q"]) as mock_input:
+        assert calc.show_history(page_size=3) == 6
+    assert printed == ["entry 0\nentry 1\nentry 2", "entry 3\nentry 4\nentry 5"]
+    assert mock_input.call_count == 2
+
+    # newest first, filtered, without paging
+    printed.clear()
+    assert calc.show_history(page_size=0, reverse=True, contains="entry 1") == 1
+    assert printed == ["entry 1"]
 
 
 def test_show_history_warns_when_empty(caplog, calc):
@@ -214,3 +266,74 @@ def test_load_history_restores(calc):
 
 
 
+
+
+# -------------------------------
+# close() method tests
+# -------------------------------
+def test_close_flushes_own_logging_observer(calc):
+    with patch.object(calc.logging_observer, "close") as mock_close:
+        calc.close()
+        mock_close.assert_called_once()
+
+
+def test_close_leaves_shared_observers_open():
+    shared = MagicMock()
+    Calculator(observers=[shared]).close()
+    shared.close.assert_not_called()
+
+
+# -------------------------------
+# undo_to() method tests
+# -------------------------------
+def test_undo_to_step_and_timestamp(calc):
+    for n in range(6):
+        calc.add_operation(f"2025-10-21 10:00:0{n},Addition,{n},1,{n + 1},abc")
+
+    assert calc.undo_to("4") == 2
+    assert len(calc.originator.history) == 4
+    assert calc.undo_to("2025-10-21 10:00:01") == 2
+    assert calc.originator.history[-1].startswith("2025-10-21 10:00:01")
+    # a prefix means the end of that minute
+    calc.redo()
+    calc.redo()
+    calc.undo_to("2025-10-21 09")
+    assert calc.originator.history == []
+
+
+@pytest.mark.parametrize("target", ["", "yesterday", "-1"])
+def test_undo_to_invalid_target(calc, target):
+    calc.add_operation("2025-10-21 10:00:00,Addition,1,1,2,abc")
+    with pytest.raises(HistoryError):
+        calc.undo_to(target)
+
+
+# ============================================================
+# Session resume
+# ============================================================
+def test_save_and_restore_session(calc, tmp_path):
+    path = str(tmp_path / "session.json")
+    for n in range(5):
+        calc.add_operation(f"2025-10-21 10:00:0{n},Addition,{n},1,{n + 1},abc")
+    calc.undo()
+    assert calc.save_session(path) is True
+
+    resumed = Calculator(observers=[MagicMock()])
+    assert resumed.restore_session(path) is True
+    assert resumed.caretaker.export_state(resumed.originator) == calc.caretaker.export_state(calc.originator)
+    # the snapshot is consumed by the resumed run
+    assert not (tmp_path / "session.json").exists()
+
+    resumed.redo()
+    assert len(resumed.originator.history) == 5
+
+
+def test_restore_session_without_snapshot(calc, tmp_path):
+    assert calc.restore_session(str(tmp_path / "session.json")) is False
+
+
+def test_save_empty_session_removes_old_snapshot(calc, tmp_path):
+    path = tmp_path / "session.json"
+    path.write_text("{}")
+    assert calc.save_session(str(path)) is False
+    assert not path.exists()
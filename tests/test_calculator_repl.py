@@ -2,7 +2,7 @@ import pytest
 from unittest.mock import MagicMock, patch
 from app.calculator_repl import main
 import threading
-from app.exceptions import CommandError, ValidationError, OperationError, HistoryError
+from app.exceptions import CommandError, ValidationError, OperationError, HistoryError, FileAccessError
 
 
 # -------------------------------
@@ -32,6 +32,7 @@ def run_repl_threaded(mock_calc, commands):
     def target():
         with patch("builtins.input", fake_input), \
              patch("app.calculator_repl.Calculator", return_value=mock_calc), \
+             patch("app.calculator_repl.WriteAheadLog"), \
              patch("builtins.print"):  # suppress print
             try:
                 main()
@@ -61,6 +62,8 @@ def test_help_command_shows_commands(mock_calc):
         ("O", "save_history", "save"),     # save
         ("P", "load_history", "load"),     # load
         ("K", "show_history", "hist"),     # history
+        ("R", "show_undo_stats", "stats"), # undo/redo stats
+        ("W", "show_memory", "mem"),       # memory report
     ]
 )
 # -------------------------------
@@ -86,6 +89,22 @@ def test_undo_and_redo(mock_calc):
     mock_calc.undo.assert_called_once()
     mock_calc.redo.assert_called_once()
 
+@pytest.mark.parametrize("answer, tracing", [("y", True), ("", False)])
+def test_memory_command_offers_tracing(mock_calc, answer, tracing):
+    from app.diagnostics import tracer
+    mock_calc.get_operation_code.return_value = "mem"
+    try:
+        run_repl_threaded(mock_calc, ["W", answer])
+        mock_calc.show_memory.assert_called_once()
+        assert tracer.tracing is tracing
+    finally:
+        tracer.stop()
+
+def test_undo_to_command(mock_calc):
+    mock_calc.get_operation_code.return_value = "undoto"
+    run_repl_threaded(mock_calc, ["S", "3"])
+    mock_calc.undo_to.assert_called_once_with("3")
+
 # -------------------------------
 # Operation execution tests
 # -------------------------------
@@ -96,6 +115,77 @@ def test_add_operation_performed(mock_operand, mock_calc):
     mock_calc.create_operation.assert_called_once()
 
 
+@patch("app.calculator_repl.get_validated_operand", side_effect=[2])
+def test_unary_operation_asks_one_operand(mock_operand, mock_calc):
+    mock_calc.get_operation_code.return_value = "exp"
+    operation = mock_calc.create_operation.return_value
+    operation.operands = 1
+    run_repl_threaded(mock_calc, ["EXP"])
+    operation.calculate.assert_called_once_with(2, None)
+    mock_calc.record_calculation.assert_called_once_with(operation, 2, None, 10)
+
+
+@patch("app.calculator_repl.get_validated_operand", side_effect=[5, 2])
+def test_calculation_runs_in_worker_when_enabled(mock_operand, mock_calc):
+    mock_calc.get_operation_code.side_effect = ["add", "exit"]
+    operation = mock_calc.create_operation.return_value
+    with patch("app.calculator_repl.CALCULATOR_WORKER_ENABLED", True), \
+         patch("app.worker.WorkerSupervisor") as supervisor_class:
+        supervisor_class.return_value.calculate.return_value = 7
+        run_repl_threaded(mock_calc, ["G", "Q"])
+    supervisor = supervisor_class.return_value
+    supervisor.calculate.assert_called_once_with(operation, 5, 2)
+    operation.calculate.assert_not_called()
+    mock_calc.record_calculation.assert_called_once_with(operation, 5, 2, 7)
+    supervisor.close.assert_called_once()
+
+
+def test_repl_runs_without_wal_owned_by_another_calculator(mock_calc):
+    printed = []
+    mock_calc.get_operation_code.return_value = "exit"
+    with patch("app.calculator_repl.CALCULATOR_WAL_ENABLED", True), \
+         patch("app.calculator_repl.WriteAheadLog", side_effect=FileAccessError("log in use")), \
+         patch("app.calculator_repl.Calculator", return_value=mock_calc) as calculator_class, \
+         patch("builtins.input", return_value="Q"), \
+         patch("builtins.print", side_effect=lambda *args, **kwargs: printed.append(" ".join(map(str, args)))):
+        main()
+    calculator_class.assert_called_once_with(wal=None)
+    assert any("crash recovery is off" in line for line in printed)
+
+
+def test_reduce_command_streams_operands(mock_calc):
+    mock_calc.get_operation_code.return_value = "reduce"
+    consumed = []
+
+    def fake_reduce(reduction, operands):
+        consumed.extend(operands)
+        return 2, len(consumed), "entry"
+
+    mock_calc.reduce.side_effect = fake_reduce
+    run_repl_threaded(mock_calc, ["T", "mean", "1, 2", "3", ""])
+    assert mock_calc.reduce.call_args[0][0] == "mean"
+    assert consumed == ["1", "2", "3"]
+
+
+@pytest.mark.parametrize("inputs, expected", [
+    (["U", "add", "1 2 3", "10"], ("add", "1 2 3", "10")),
+    (["U", "mean", "1 2; 3 4"], ("mean", "1 2; 3 4", None)),
+    (["U", "sin", "0 1 2"], ("sin", "0 1 2", None)),
+])
+def test_vector_command(mock_calc, inputs, expected):
+    mock_calc.get_operation_code.return_value = "vector"
+    mock_calc.vector.return_value = (1, "entry")
+    run_repl_threaded(mock_calc, inputs)
+    assert mock_calc.vector.call_args[0] == expected
+
+
+def test_sweep_command(mock_calc):
+    mock_calc.get_operation_code.return_value = "sweep"
+    mock_calc.sweep.return_value = ("sweep.csv", 1999, 0, "entry")
+    run_repl_threaded(mock_calc, ["V", "power", "1:1000:0.5", "3"])
+    mock_calc.sweep.assert_called_once_with("power", "1:1000:0.5", "3")
+
+
 # -------------------------------
 # Input validation tests
 # -------------------------------
@@ -125,4 +215,17 @@ def test_operation_error_handled(mock_calc):
 def test_history_error_handled(mock_calc):
     mock_calc.get_operation_code.return_value = "undo"
     mock_calc.undo.side_effect = HistoryError("Nothing to undo")
-    run_repl_threaded(mock_calc, ["M"])  # should not freeze
\ No newline at end of file
+    run_repl_threaded(mock_calc, ["M"])  # should not freeze
+
+def test_exit_saves_session(mock_calc):
+    mock_calc.get_operation_code.return_value = "exit"
+    run_repl_threaded(mock_calc, ["Q"])
+    mock_calc.save_session.assert_called_once()
+    mock_calc.close.assert_called_once()
+
+
+@pytest.mark.parametrize("recovered, restore_calls", [(0, 1), (3, 0)])
+def test_start_resumes_session_unless_recovered(mock_calc, recovered, restore_calls):
+    mock_calc.recover.return_value = recovered
+    run_repl_threaded(mock_calc, ["Q"])
+    assert mock_calc.restore_session.call_count == restore_calls
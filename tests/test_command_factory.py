@@ -1,6 +1,7 @@
 import pytest
 from app.command_factory import CommandFactory
-from app.calculation import Percentage, IntegerDivision, Modulo, Root, Absdifference, Multiplication, Addition, Division, Subtraction, Power, CalculationTemplate
+from app.calculation import Percentage, IntegerDivision, Modulo, Root, Absdifference, Multiplication, Addition, Division, Subtraction, Power
+from app.operation_registry import registry
 from app.exceptions import CommandError
 
 # ============================================================
@@ -32,7 +33,7 @@ def test_create_operation_object_invalid():
         factory.createOperationObject()
     assert "Command 'invalid_command' not allowed" in str(exc_info.value)
     # Also check that allowed commands are listed
-    for cmd in CalculationTemplate.operations_allowed:
+    for cmd in registry.names():
         assert cmd in str(exc_info.value)
 
 # ============================================================
@@ -0,0 +1,163 @@
+import sys
+import threading
+import pytest
+from decimal import Decimal, getcontext, ROUND_DOWN
+from unittest.mock import MagicMock
+from app.calculator import Calculator
+from app.calculation import Addition, Division, Root
+from app.observers import BatchingObserver
+from app.write_ahead_log import WriteAheadLog
+from app.config import CALCULATOR_MAX_HISTORY_SIZE
+
+THREADS = 8
+OPS_PER_THREAD = 50
+
+
+# -------------------------------
+# Helpers
+# -------------------------------
+@pytest.fixture(autouse=True)
+def frequent_thread_switches():
+    # switch threads far more often than the default 5ms to shake out races
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+class RecordingObserver:
+    def __init__(self):
+        self.messages = []
+
+    def update(self, message):
+        self.messages.append(message)
+
+
+def run_threads(target, count=THREADS):
+    barrier = threading.Barrier(count)
+    errors = []
+
+    def worker(index):
+        try:
+            barrier.wait()
+            target(index)
+        except Exception as e: # pragma: no cover
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+# -------------------------------
+# Concurrent writers
+# -------------------------------
+def test_concurrent_calculations_are_linearizable():
+    observer = RecordingObserver()
+    calc = Calculator(observers=[observer])
+    addition = Addition()
+
+    def writer(index):
+        for n in range(OPS_PER_THREAD):
+            a, b = Decimal(index), Decimal(n)
+            calc.record_calculation(addition, a, b, addition.calculate(a, b))
+
+    run_threads(writer)
+
+    total = THREADS * OPS_PER_THREAD
+    history = calc.history_snapshot()
+    # observers saw every calculation, in exactly the order the history holds them
+    assert len(observer.messages) == total
+    assert [",".join(m.values()) for m in observer.messages][-len(history):] == history
+    assert len(history) == min(total, CALCULATOR_MAX_HISTORY_SIZE)
+    # each thread's own calculations keep their program order
+    for index in range(THREADS):
+        own = [m["operand2"] for m in observer.messages if m["operand1"] == str(index)]
+        assert own == [str(n) for n in range(OPS_PER_THREAD)]
+
+
+def test_concurrent_undo_redo_matches_serial_replay(tmp_path):
+    wal_path = str(tmp_path / "wal.jsonl")
+    calc = Calculator(observers=[MagicMock()], wal=WriteAheadLog(log_file=wal_path, fsync=False, compact_records=0))
+
+    def mixed(index):
+        for n in range(OPS_PER_THREAD):
+            calc.add_operation(f"2025-10-21 10:00:00,Addition,{index},{n},0,abc")
+            if n % 3 == 0:
+                calc.undo()
+            if n % 5 == 0:
+                calc.redo()
+
+    run_threads(mixed)
+
+    # the journal is the order in which the lock admitted writers: replaying it serially
+    # must give exactly the state the threads produced
+    calc.wal.close(discard=False)
+    replayed = Calculator(observers=[MagicMock()], wal=WriteAheadLog(log_file=wal_path, fsync=False, compact_records=0))
+    replayed.recover()
+    assert replayed.caretaker.export_state(replayed.originator) == calc.caretaker.export_state(calc.originator)
+
+
+def test_concurrent_readers_see_consistent_snapshots():
+    calc = Calculator(observers=[MagicMock()])
+    stop = threading.Event()
+    bad_snapshots = []
+
+    def writer(index):
+        for n in range(OPS_PER_THREAD * 2):
+            calc.add_operation(f"entry-{n:04d}")
+        stop.set()
+
+    def reader(index):
+        while not stop.is_set():
+            snapshot = calc.history_snapshot()
+            # a single writer appends increasing numbers: any snapshot is sorted
+            if snapshot != sorted(snapshot):
+                bad_snapshots.append(snapshot) # pragma: no cover
+
+    def role(index):
+        (writer if index == 0 else reader)(index)
+
+    run_threads(role, count=4)
+    assert bad_snapshots == []
+
+
+def test_shared_batching_pipeline_from_many_calculators():
+    downstream = RecordingObserver()
+    pipeline = BatchingObserver([downstream], batch_size=7, flush_interval=0)
+    calculators = [Calculator(observers=[pipeline]) for _ in range(THREADS)]
+    addition = Addition()
+
+    def writer(index):
+        for n in range(OPS_PER_THREAD):
+            calculators[index].record_calculation(addition, Decimal(index), Decimal(n), Decimal(index + n))
+
+    run_threads(writer)
+    pipeline.close()
+    assert len(downstream.messages) == THREADS * OPS_PER_THREAD
+
+
+# -------------------------------
+# Thread-local decimal contexts
+# -------------------------------
+def test_calculations_ignore_the_callers_decimal_context():
+    expected = {
+        "div": Division().calculate(Decimal("2"), Decimal("3")),
+        "root": Root().calculate(Decimal("2"), Decimal("2")),
+    }
+    results = []
+
+    def worker(index):
+        # a thread with a hostile context of its own
+        context = getcontext()
+        context.prec = 3
+        context.rounding = ROUND_DOWN
+        for _ in range(20):
+            results.append((Division().calculate(Decimal("2"), Decimal("3")), Root().calculate(Decimal("2"), Decimal("2"))))
+
+    run_threads(worker)
+    assert set(results) == {(expected["div"], expected["root"])}
+    assert getcontext().prec == 28
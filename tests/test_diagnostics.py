@@ -0,0 +1,131 @@
+import sys
+import pytest
+from decimal import Decimal
+from unittest.mock import patch
+from app.diagnostics import deep_sizeof, memory_report, format_bytes, MemoryTracer, tracer
+from app.calculator import Calculator
+from app.observers import BatchingObserver
+
+try:
+    import pandas as pd
+except ImportError: # pragma: no cover
+    pd = None
+
+
+@pytest.fixture(autouse=True)
+def history_dir(tmp_path):
+    # real observers (the report lists them), writing to a temporary history directory
+    with patch("app.observers.CALCULATOR_HISTORY_DIR", str(tmp_path)), patch("app.memento.CALCULATOR_HISTORY_DIR", str(tmp_path)):
+        yield tmp_path
+
+
+@pytest.fixture
+def calc():
+    calc = Calculator()
+    for i in range(20):
+        calc.record_entry("Addition", i, 1, i + 1)
+    yield calc
+    calc.close()
+
+
+@pytest.fixture(autouse=True)
+def stop_tracing():
+    yield
+    tracer.stop()
+
+
+# -------------------------------
+# deep_sizeof
+# -------------------------------
+def test_deep_sizeof_counts_contents():
+    entries = ["x" * 100, "y" * 200]
+    assert deep_sizeof(entries) == sys.getsizeof(entries) + sum(map(sys.getsizeof, entries))
+    assert deep_sizeof({"a": Decimal("1.5")}) == sys.getsizeof({"a": 1}) + sys.getsizeof("a") + sys.getsizeof(Decimal("1.5"))
+
+
+def test_deep_sizeof_counts_shared_objects_once():
+    entry = "z" * 1000
+    seen = set()
+    first = deep_sizeof([entry], seen)
+    second = deep_sizeof([entry], seen)
+    assert first - second == sys.getsizeof(entry)
+
+
+@pytest.mark.skipif(pd is None, reason="pandas not installed")
+def test_deep_sizeof_of_dataframe():
+    df = pd.DataFrame({"a": ["x" * 50] * 10})
+    assert deep_sizeof(df) == int(df.memory_usage(deep=True).sum())
+
+
+# -------------------------------
+# memory_report
+# -------------------------------
+def test_memory_report_parts(calc):
+    report = calc.memory_report()
+    assert set(report) == {"history", "timeline", "undo", "redo", "observers", "caches", "total"}
+    assert report["history"] > 20 * sys.getsizeof("x" * 40)
+    # every memento holds its own copy of the history, they dominate
+    assert report["undo"] > report["history"]
+    assert {"LoggingObserver", "AutosaveObserver"} <= set(report["observers"])
+    assert report["caches"]["operation_registry"]["entries"] >= 10
+    assert report["total"] >= report["history"] + report["undo"]
+
+
+def test_memory_report_grows_with_history(calc):
+    before = calc.memory_report()
+    for i in range(20):
+        calc.record_entry("Power", i, 2, i * i)
+    after = calc.memory_report()
+    assert after["history"] > before["history"] and after["undo"] > before["undo"]
+
+
+def test_memory_report_follows_batching_observers():
+    owner = Calculator()
+    batching = BatchingObserver([owner.logging_observer], batch_size=1000, flush_interval=60)
+    calc = Calculator(observers=[batching])
+    calc.record_entry("Addition", 1, 1, 2)
+    observers = calc.memory_report()["observers"]
+    batching.close()
+    owner.close()
+    assert observers["BatchingObserver"] > 0 and "LoggingObserver" in observers
+
+
+@pytest.mark.parametrize("size, expected", [(512, "512 B"), (2048, "2.0 KiB"), (3 * 1024 ** 2, "3.0 MiB")])
+def test_format_bytes(size, expected):
+    assert format_bytes(size) == expected
+
+
+# -------------------------------
+# MemoryTracer
+# -------------------------------
+def test_tracer_top_and_diff():
+    memory_tracer = MemoryTracer()
+    with pytest.raises(RuntimeError):
+        memory_tracer.snapshot()
+    memory_tracer.start()
+    memory_tracer.snapshot()
+    assert memory_tracer.diff() == []
+
+    held = [str(i) * 100 for i in range(2000)]
+    memory_tracer.snapshot()
+    top = memory_tracer.top(limit=3)
+    assert len(top) == 3 and __file__ in top[0][0]
+    changes = memory_tracer.diff(limit=3)
+    assert changes[0][1] > 200000 and __file__ in changes[0][0]
+
+    memory_tracer.stop()
+    assert not memory_tracer.tracing and memory_tracer.top() == []
+    del held
+
+
+def test_show_memory_lists_allocations_when_tracing(calc, capsys):
+    with patch("builtins.input") as mock_input:
+        report = calc.show_memory()
+    mock_input.assert_not_called()
+    out = capsys.readouterr().out
+    assert "Memory held" in out and "Top allocations" not in out
+    assert report["total"] > 0
+
+    tracer.start()
+    calc.show_memory()
+    assert "Top allocations" in capsys.readouterr().out
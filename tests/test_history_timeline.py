@@ -0,0 +1,150 @@
+import pytest
+from app.history_timeline import HistoryTimeline, TimelineMemento
+from app.memento import Originator, CareTaker
+from app.exceptions import HistoryError
+from app.config import CALCULATOR_MAX_HISTORY_SIZE
+
+
+def entry(n):
+    return f"2025-10-21 10:{n // 60:02d}:{n % 60:02d},Addition,{n},1,{n + 1},abc"
+
+
+def record_steps(timeline, count):
+    history = []
+    for n in range(count):
+        history.append(entry(n))
+        timeline.record(entry(n), history)
+    return history
+
+
+# -------------------------------
+# HistoryTimeline tests
+# -------------------------------
+def test_state_at_replays_from_nearest_checkpoint():
+    timeline = HistoryTimeline(checkpoint_interval=4)
+    history = record_steps(timeline, 10)
+
+    assert sorted(timeline.checkpoints) == [0, 4, 8]
+    assert timeline.position == 10
+    for step in range(11):
+        assert timeline.state_at(step) == history[:step]
+
+
+def test_state_at_respects_history_cap():
+    timeline = HistoryTimeline(checkpoint_interval=7)
+    total = CALCULATOR_MAX_HISTORY_SIZE + 15
+    history = record_steps(timeline, total)
+    assert timeline.state_at(total) == history[-CALCULATOR_MAX_HISTORY_SIZE:]
+    assert timeline.state_at(total - 3) == history[:total - 3][-CALCULATOR_MAX_HISTORY_SIZE:]
+
+
+def test_record_after_undo_drops_redo_branch():
+    timeline = HistoryTimeline(checkpoint_interval=2)
+    history = record_steps(timeline, 5)
+    timeline.undo()
+    timeline.undo()
+    timeline.undo()
+    timeline.record("new", history[:2] + ["new"])
+
+    assert timeline.last_step == 3
+    assert timeline.state_at(3) == history[:2] + ["new"]
+    assert 4 not in timeline.checkpoints
+
+
+def test_prune_keeps_max_steps():
+    timeline = HistoryTimeline(checkpoint_interval=5, max_steps=10)
+    history = record_steps(timeline, 40)
+    assert timeline.base_step == 30
+    assert timeline.state_at(30) == history[:30]
+    with pytest.raises(HistoryError):
+        timeline.state_at(29)
+
+
+def test_step_at_timestamp():
+    timeline = HistoryTimeline()
+    record_steps(timeline, 5)
+    assert timeline.step_at(entry(2).split(",")[0]) == 3
+    assert timeline.step_at("2000-01-01") == 0
+    assert timeline.step_at("2099-01-01") == 5
+
+
+def test_timeline_memento_is_lazy_and_small():
+    timeline = HistoryTimeline(checkpoint_interval=3)
+    history = record_steps(timeline, 6)
+    memento = TimelineMemento(timeline, 5)
+    assert memento.size < 100
+    assert memento.get_state() == history[:5]
+
+    with pytest.raises(HistoryError):
+        TimelineMemento(timeline, 50).get_state()
+
+
+# -------------------------------
+# CareTaker.undo_to tests
+# -------------------------------
+@pytest.fixture
+def session():
+    originator, caretaker = Originator(), CareTaker()
+    for n in range(25):
+        originator.add_operation(entry(n), caretaker=caretaker)
+    return originator, caretaker
+
+
+def test_undo_to_matches_repeated_undo(session):
+    originator, caretaker = session
+    reference_originator, reference_caretaker = Originator(), CareTaker()
+    for n in range(25):
+        reference_originator.add_operation(entry(n), caretaker=reference_caretaker)
+    for _ in range(12):
+        reference_caretaker.undo_memento(reference_originator)
+
+    assert caretaker.undo_to(originator, step=13) == 12
+    assert originator.history == reference_originator.history
+    assert len(caretaker.stack_undo) == len(reference_caretaker.stack_undo)
+    assert len(caretaker.stack_redo) == 12
+
+
+def test_redo_after_undo_to_walks_forward(session):
+    originator, caretaker = session
+    caretaker.undo_to(originator, step=20)
+
+    assert caretaker.redo_memento(originator) == entry(20)
+    assert originator.history == [entry(n) for n in range(21)]
+    caretaker.undo_memento(originator)
+    assert originator.history == [entry(n) for n in range(20)]
+    for n in range(20, 25):
+        assert caretaker.redo_memento(originator) == entry(n)
+    assert caretaker.timeline.position == 25
+
+
+def test_undo_to_timestamp(session):
+    originator, caretaker = session
+    caretaker.undo_to(originator, timestamp=entry(9).split(",")[0])
+    assert originator.history[-1] == entry(9)
+
+
+def test_undo_to_invalid_targets(session):
+    originator, caretaker = session
+    with pytest.raises(HistoryError):
+        caretaker.undo_to(originator, step=25)
+    with pytest.raises(HistoryError):
+        caretaker.undo_to(originator, step=30)
+
+    # beyond the undo stack depth
+    small = CareTaker(max_undo_depth=3)
+    small_originator = Originator()
+    for n in range(10):
+        small_originator.add_operation(entry(n), caretaker=small)
+    with pytest.raises(HistoryError) as excinfo:
+        small.undo_to(small_originator, step=2)
+    assert "earliest reachable step is 7" in str(excinfo.value)
+
+
+def test_new_operation_after_undo_to_clears_redo(session):
+    originator, caretaker = session
+    caretaker.undo_to(originator, step=5)
+    originator.add_operation("new", caretaker=caretaker)
+    assert caretaker.stack_redo == []
+    assert caretaker.timeline.position == 6
+    caretaker.undo_to(originator, step=5)
+    assert originator.history == [entry(n) for n in range(5)]
@@ -0,0 +1,150 @@
+import csv
+import json
+import threading
+import pytest
+from unittest.mock import patch
+from app import history_view
+from app.history_view import HistoryView, export_history
+from app.memento import Originator
+from app.calculator import Calculator
+from app.exceptions import CommandError, FileAccessError
+
+
+def entry(i, operation="Addition"):
+    return f"2025-01-01 00:00:{i % 60:02d},{operation},{i},1,{i + 1},id"
+
+
+@pytest.fixture
+def originator():
+    originator = Originator()
+    with patch("app.memento.CALCULATOR_MAX_HISTORY_SIZE", 10000):
+        originator.history = [entry(i, "Power" if i % 3 == 0 else "Addition") for i in range(1000)]
+    return originator
+
+
+def view(originator, **settings):
+    return HistoryView(originator, threading.RLock(), **settings)
+
+
+# -------------------------------
+# HistoryView
+# -------------------------------
+def test_view_iterates_whole_history_in_order(originator):
+    assert view(originator).list() == list(originator.history)
+    assert view(originator).count() == 1000
+
+
+@pytest.mark.parametrize("settings, expected", [
+    ({"offset": 995}, [entry(i, "Addition") if i % 3 else entry(i, "Power") for i in range(995, 1000)]),
+    ({"limit": 2}, [entry(0, "Power"), entry(1)]),
+    ({"reverse": True, "limit": 2}, [entry(999, "Power"), entry(998)]),
+    ({"reverse": True, "offset": 1, "limit": 1}, [entry(998)]),
+    ({"operation": "power", "limit": 2}, [entry(0, "Power"), entry(3, "Power")]),
+    ({"operation": "Power", "offset": 1, "limit": 1}, [entry(3, "Power")]),
+    ({"contains": ",998,1,"}, [entry(998)]),
+    ({"where": lambda e: e.endswith(",5,id")}, [entry(4)]),
+    ({"offset": 5000}, []),
+    ({"limit": 0}, []),
+])
+def test_view_settings(originator, settings, expected):
+    assert view(originator, **settings).list() == expected
+
+
+def test_view_counts_filtered_entries(originator):
+    assert view(originator, operation="Power").count() == 334
+
+
+def test_pages(originator):
+    powers = view(originator, operation="Power", reverse=True)
+    pages = list(powers.pages(100))
+    assert [len(page) for page in pages] == [100, 100, 100, 34]
+    assert pages[0][0] == entry(999, "Power")
+    assert powers.page(4, 100) == pages[3]
+    assert powers.page(5, 100) == []
+
+    # a page never reaches past the limit of its view
+    limited = view(originator, limit=250)
+    assert len(limited.page(3, 100)) == 50
+
+
+def test_view_reads_history_in_chunks(originator):
+    # every chunk is copied under the lock, never the whole history at once
+    with patch.object(history_view, "HISTORY_CHUNK_SIZE", 100):
+        chunks = list(view(originator)._chunks())
+    assert [len(chunk) for chunk in chunks] == [100] * 10
+
+
+def test_view_survives_changes_while_iterating(originator):
+    with patch.object(history_view, "HISTORY_CHUNK_SIZE", 100):
+        entries = iter(view(originator))
+        first = [next(entries) for _ in range(150)]
+        # appended while the view is being read: picked up at the end
+        originator.history.append("late")
+        rest = list(entries)
+    assert first + rest == [entry(i, "Power" if i % 3 == 0 else "Addition") for i in range(1000)] + ["late"]
+
+    with patch.object(history_view, "HISTORY_CHUNK_SIZE", 100):
+        entries = iter(view(originator))
+        first = [next(entries) for _ in range(150)]
+        # replaced, as by an undo: continues at the same position of the new history
+        with patch("app.memento.CALCULATOR_MAX_HISTORY_SIZE", 10000):
+            originator.history = ["x"] * 300
+        rest = list(entries)
+    # the rest of the chunk already copied, then the new history from position 200
+    assert len(first) + len(rest) == 300 and rest[-100:] == ["x"] * 100
+
+
+# -------------------------------
+# Streaming exporters
+# -------------------------------
+def test_export_csv(tmp_path, originator):
+    path = str(tmp_path / "out" / "export.csv")
+    written, skipped = export_history(view(originator, operation="Power", limit=3), path)
+    assert (written, skipped) == (3, [])
+    with open(path, newline="") as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == ["timestamp", "operation", "operand1", "operand2", "result", "instance_id"]
+    assert [row[2] for row in rows[1:]] == ["0", "3", "6"]
+
+
+def test_export_jsonl_skips_malformed_entries(tmp_path):
+    originator = Originator()
+    originator.history = [entry(1), "not an entry"]
+    path = str(tmp_path / "export.jsonl")
+    written, skipped = export_history(view(originator), path, "jsonl")
+    assert (written, skipped) == (1, ["not an entry"])
+    with open(path) as file:
+        assert [json.loads(line)["operand1"] for line in file] == ["1"]
+
+
+def test_export_failure_leaves_no_file(tmp_path, originator):
+    path = str(tmp_path / "export.csv")
+
+    def broken(e):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        export_history(view(originator, where=broken), path)
+    assert list(tmp_path.iterdir()) == []
+    with pytest.raises(ValueError):
+        export_history(view(originator), path, "xml")
+
+
+# -------------------------------
+# Calculator
+# -------------------------------
+def test_calculator_history_view_and_export(tmp_path):
+    calc = Calculator()
+    calc.originator.history = [entry(1), entry(2, "Power")]
+    assert calc.history_view(operation="Power").list() == [entry(2, "Power")]
+
+    path, written = calc.export_history(str(tmp_path / "history.jsonl"), fmt="jsonl", reverse=True)
+    assert written == 2
+    with open(path) as file:
+        assert [json.loads(line)["operation"] for line in file] == ["Power", "Addition"]
+
+    with pytest.raises(CommandError):
+        calc.export_history(fmt="xml")
+    with patch("app.history_view.open", side_effect=PermissionError("denied"), create=True):
+        with pytest.raises(FileAccessError):
+            calc.export_history(str(tmp_path / "denied.csv"))
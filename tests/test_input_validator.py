@@ -92,4 +92,19 @@ def test_get_validated_operand_retry_invalid(monkeypatch, caplog):
     assert result == Decimal("123.45")
     # Ensure invalid inputs were logged
     assert any("Invalid input 'abc'" in rec.message for rec in caplog.records)
-    assert any("Invalid input 'not_a_number'" in rec.message for rec in caplog.records)
\ No newline at end of file
+    assert any("Invalid input 'not_a_number'" in rec.message for rec in caplog.records)
+
+# -------------------------------
+# Tests for parse_operand
+# -------------------------------
+def test_parse_operand_valid():
+    from app.input_validators import parse_operand
+    assert parse_operand(" 12.5 ") == Decimal("12.5")
+    assert parse_operand(3) == Decimal("3")
+
+
+@pytest.mark.parametrize("raw", ["abc", "NaN", "Infinity", str(CALCULATOR_MAX_INPUT_VALUE + 1)])
+def test_parse_operand_invalid(raw):
+    from app.input_validators import parse_operand
+    with pytest.raises(ValidationError):
+        parse_operand(raw)
@@ -4,8 +4,11 @@ from unittest.mock import patch, MagicMock
 # import builtins
 # import pytest
 import importlib
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 # Import your logger module
+import app.config as config_module
 import app.logger as logger_module
 
 
@@ -24,21 +27,131 @@ def test_log_dir_created(tmp_path):
 
 
 # ----------------------------
-# Test logger has FileHandler
+# Test logger writes through a queue to a rotating file
 # ----------------------------
-def test_logger_file_handler_exists():
-    """Logger should have at least one FileHandler."""
-    import os
-
+def test_logger_queue_handler_exists():
+    """Logger should queue records for a listener that owns a RotatingFileHandler."""
     with patch.dict("os.environ", {"CALCULATOR_LOG_DIR": ".", "LOG_HISTORY_FILE": "test_history.log"}):
-        import app.logger as logger_module
-
-        # Patch hasHandlers to always return False so FileHandler is added
+        # Patch hasHandlers to always return False so the queue handler is added
         with patch.object(logger_module.logger, "hasHandlers", return_value=False):
             importlib.reload(logger_module)
 
-        logger = logger_module.logger
-        file_handlers = [h for h in logger.handlers if isinstance(h, logging.FileHandler)]
-        assert len(file_handlers) > 0, "Logger should have a FileHandler attached"
+    logger = logger_module.logger
+    queue_handlers = [h for h in logger.handlers if isinstance(h, QueueHandler)]
+    try:
+        assert len(queue_handlers) > 0, "Logger should have a QueueHandler attached"
+        assert not any(type(h) is logging.FileHandler for h in logger.handlers), "no blocking file writes on the caller thread"
+        assert any(isinstance(h, RotatingFileHandler) for h in logger_module.listener.handlers)
+    finally:
+        # the listener thread is stopped at exit
+        logger.removeHandler(queue_handlers[-1])
+
+
+def test_log_level_from_environment():
+    try:
+        with patch.object(config_module, "CALCULATOR_LOG_LEVEL", "WARNING"):
+            importlib.reload(logger_module)
+        assert logger_module.logger.level == logging.WARNING
+
+        with patch.object(config_module, "CALCULATOR_LOG_LEVEL", "NONSENSE"):
+            importlib.reload(logger_module)
+        assert logger_module.logger.level == logging.INFO
+    finally:
+        importlib.reload(logger_module)
+    # the level is read from the environment once, by app.config
+    with patch.dict("os.environ", {"CALCULATOR_LOG_LEVEL": "warning"}):
+        assert importlib.reload(config_module).CALCULATOR_LOG_LEVEL == "WARNING"
+    importlib.reload(config_module)
+
+
+# ----------------------------
+# Test deferred formatting and rotation
+# ----------------------------
+def make_queue_logger(tmp_path, **rotation):
+    log_queue = queue.Queue()
+    file_handler = RotatingFileHandler(tmp_path / "test.log", **rotation)
+    file_handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = QueueListener(log_queue, file_handler)
+    test_logger = logging.getLogger(f"calculator.test.{tmp_path.name}")
+    test_logger.propagate = False
+    test_logger.addHandler(logger_module.DeferredQueueHandler(log_queue))
+    listener.start()
+    return test_logger, log_queue, listener
+
+
+def test_records_are_formatted_by_the_listener(tmp_path):
+    test_logger, log_queue, listener = make_queue_logger(tmp_path)
+    argument = MagicMock()
+    argument.__str__.return_value = "lazy"
+
+    with patch.object(listener, "dequeue", wraps=listener.dequeue):
+        test_logger.info("value %s", argument)
+        log_queue.join()
+    listener.stop()
+
+    # the record crossed the queue unformatted, only the listener called str()
+    assert argument.__str__.call_count == 1
+    assert (tmp_path / "test.log").read_text() == "value lazy\n"
+
+
+def test_disabled_levels_cost_no_formatting(tmp_path):
+    test_logger, log_queue, listener = make_queue_logger(tmp_path)
+    test_logger.setLevel(logging.WARNING)
+    argument = MagicMock()
+    test_logger.info("value %s", argument)
+    log_queue.join()
+    listener.stop()
+    argument.__str__.assert_not_called()
+
+
+def test_log_file_rotates_by_size(tmp_path):
+    test_logger, log_queue, listener = make_queue_logger(tmp_path, maxBytes=100, backupCount=2)
+    for n in range(50):
+        test_logger.warning("entry %04d", n)
+    log_queue.join()
+    listener.stop()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["test.log", "test.log.1", "test.log.2"]
+
+
+def test_exceptions_are_formatted_before_queueing(tmp_path):
+    test_logger, log_queue, listener = make_queue_logger(tmp_path)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        test_logger.exception("failed")
+    log_queue.join()
+    listener.stop()
+    assert "ValueError: boom" in (tmp_path / "test.log").read_text()
+
+
+def test_flush_logs_waits_for_the_listener():
+    handler = logger_module.DeferredQueueHandler(MagicMock())
+    with patch.object(logger_module.logger, "handlers", [handler]):
+        logger_module.flush_logs()
+    handler.queue.join.assert_called_once()
+
+
+# ----------------------------
+# Child processes log through the parent
+# ----------------------------
+def _log_in_child(log_queue):
+    assert logger_module.CHILD_PROCESS and logger_module.listener is None
+    logger_module.forward_logs_to(log_queue)
+    logger_module.logger.warning("from the child %s", {"pid": os.getpid()})
 
 
+def test_child_process_records_reach_parent_handlers():
+    import multiprocessing
+    handler = MagicMock(level=logging.NOTSET)
+    with patch.object(logger_module, "listener", MagicMock(handlers=[handler])), patch.object(logger_module, "_child_queue", None):
+        child = multiprocessing.get_context("spawn").Process(target=_log_in_child, args=(logger_module.child_log_queue(),))
+        child.start()
+        child.join(60)
+        assert child.exitcode == 0
+        for _ in range(100):
+            if handler.handle.called:
+                break
+            import time
+            time.sleep(0.05)
+    record = handler.handle.call_args[0][0]
+    assert record.getMessage().startswith("from the child {'pid': ")
@@ -0,0 +1,168 @@
+import pytest
+from decimal import Decimal, localcontext, ROUND_HALF_UP
+from app import math_functions
+from app.math_functions import integer_nth_root, nth_root, newton_root_digits, integer_power, integer_power_digits, estimate_power_digits
+from app.math_functions import exp, ln, log10, sin, cos, atan
+from app.exceptions import OperationError
+
+
+# -------------------------------
+# integer_nth_root tests
+# -------------------------------
+@pytest.mark.parametrize("k", [2, 3, 5, 7, 30])
+def test_integer_nth_root_matches_definition(k):
+    for n in list(range(0, 300)) + [10**40 + 12345, 2**200 - 1, 3**150, 10**600 + 7]:
+        r = integer_nth_root(n, k)
+        assert r ** k <= n < (r + 1) ** k
+
+
+def test_integer_nth_root_perfect_powers():
+    assert integer_nth_root(12345 ** 9, 9) == 12345
+    assert integer_nth_root(12345 ** 9 - 1, 9) == 12344
+    assert integer_nth_root(987654321 ** 40, 40) == 987654321
+
+
+def test_integer_nth_root_invalid_arguments():
+    with pytest.raises(ValueError):
+        integer_nth_root(-1, 2)
+    with pytest.raises(ValueError):
+        integer_nth_root(8, 0)
+
+
+# -------------------------------
+# nth_root tests
+# -------------------------------
+def test_nth_root_perfect_power_is_exact():
+    assert nth_root(Decimal("27"), 3, 4) == Decimal("3.0000")
+    assert str(nth_root(Decimal("0.0016"), 4, 4)) == "0.2000"
+
+
+def test_nth_root_rounds_half_up():
+    # 1.5625 ** 0.5 == 1.25 exactly, rounding to one place must go up
+    assert nth_root(Decimal("1.5625"), 2, 1) == Decimal("1.3")
+
+
+@pytest.mark.parametrize("places", [4, 28, 100])
+def test_nth_root_matches_high_precision_reference(places):
+    value = Decimal("7.25")
+    with localcontext() as ctx:
+        ctx.prec = places + 50
+        reference = (value ** (Decimal(1) / 3)).quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP)
+    assert nth_root(value, 3, places) == reference
+
+
+def test_nth_root_negative_degree():
+    assert nth_root(Decimal("4"), -2, 4) == Decimal("0.5000")
+    assert nth_root(Decimal("2"), -2, 4) == Decimal("0.7071")
+
+
+def test_nth_root_invalid_inputs():
+    with pytest.raises(OperationError):
+        nth_root(Decimal("-8"), 3, 4)
+    with pytest.raises(OperationError):
+        nth_root(Decimal("8"), 0, 4)
+    with pytest.raises(OperationError):
+        nth_root(Decimal("0"), -2, 4)
+
+
+def test_newton_root_digits_grows_with_degree():
+    assert newton_root_digits(Decimal("2"), 1000, 1000) > newton_root_digits(Decimal("2"), 2, 1000)
+
+
+# -------------------------------
+# integer_power tests
+# -------------------------------
+def test_integer_power_positive_exponent_is_exact():
+    assert integer_power(Decimal("1.1"), 10, 10) == Decimal("2.5937424601")
+    assert integer_power(Decimal("-3"), 3, 4) == Decimal("-27.0000")
+
+
+def test_integer_power_negative_exponent_rounds_half_up():
+    # 2 ** -3 == 0.125 -> 0.13 at two places
+    assert integer_power(Decimal("2"), -3, 2) == Decimal("0.13")
+    assert integer_power(Decimal("-2"), -3, 2) == Decimal("-0.13")
+    assert integer_power(Decimal("3"), -1, 4) == Decimal("0.3333")
+
+
+def test_integer_power_zero_base_negative_exponent():
+    with pytest.raises(OperationError):
+        integer_power(Decimal("0"), -2, 4)
+
+
+@pytest.mark.parametrize("base, exponent, expected", [
+    ("0", "5", 1),
+    ("10", "0", 1),
+    ("0.5", "3", 1),
+    ("1000", "1000", 3001),
+])
+def test_estimate_power_digits(base, exponent, expected):
+    assert estimate_power_digits(Decimal(base), Decimal(exponent)) >= expected
+
+
+@pytest.mark.parametrize("value, exponent, at_least", [
+    ("2.0000", 10, 50),
+    ("1.0001", -1000000, 5000000),
+    ("1000.0000", 1000, 8000),
+])
+def test_integer_power_digits(value, exponent, at_least):
+    assert integer_power_digits(Decimal(value), exponent, 4) >= at_least
+
+
+# -------------------------------
+# transcendental functions
+# -------------------------------
+def reference(name, x, places):
+    # Decimal's own exp/ln/log10, computed with plenty of guard digits
+    with localcontext() as ctx:
+        ctx.prec = places + 500
+        return getattr(x, name)().quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP)
+
+
+@pytest.mark.parametrize("name, function", [("exp", exp), ("ln", ln), ("log10", log10)])
+@pytest.mark.parametrize("raw", ["0.001", "0.5", "1", "2.5", "10", "123.456", "999.9999"])
+@pytest.mark.parametrize("places", [4, 28, 100])
+def test_exp_ln_log10_match_decimal(name, function, raw, places):
+    assert function(Decimal(raw), places) == reference(name, Decimal(raw), places)
+
+
+def test_exp_of_negative_and_large_arguments():
+    assert exp(Decimal("-20"), 12) == reference("exp", Decimal("-20"), 12)
+    assert exp(Decimal("500"), 4) == reference("exp", Decimal("500"), 4)
+
+
+def test_log10_of_powers_of_ten_is_exact():
+    assert log10(Decimal("1000"), 4) == Decimal("3.0000")
+    assert log10(Decimal("0.01"), 50) == Decimal("-2." + "0" * 50)
+
+
+@pytest.mark.parametrize("function", [ln, log10])
+@pytest.mark.parametrize("raw", ["0", "-1"])
+def test_logarithms_reject_non_positive(function, raw):
+    with pytest.raises(OperationError):
+        function(Decimal(raw), 4)
+
+
+@pytest.mark.parametrize("function, raw, expected", [
+    (sin, "0", "0.0000"), (sin, "2", "0.9093"), (sin, "-2", "-0.9093"), (sin, "1000", "0.8269"),
+    (cos, "0", "1.0000"), (cos, "2", "-0.4161"), (cos, "1000", "0.5624"),
+    (atan, "0", "0.0000"), (atan, "1", "0.7854"), (atan, "2", "1.1071"), (atan, "-1000", "-1.5698"),
+])
+def test_sin_cos_atan_known_values(function, raw, expected):
+    assert function(Decimal(raw), 4) == Decimal(expected)
+
+
+def test_sin_cos_atan_high_precision():
+    assert atan(Decimal(1), 50) == Decimal("0.78539816339744830961566084581987572104929234984378")
+    # sin² + cos² = 1 to the last digits
+    s, c = sin(Decimal("0.7"), 60), cos(Decimal("0.7"), 60)
+    with localcontext() as ctx:
+        ctx.prec = 150
+        assert abs(s * s + c * c - 1) < Decimal("1e-58")
+
+
+def test_constants_are_cached_per_precision():
+    math_functions._pi.cache_clear()
+    sin(Decimal("2"), 30)
+    sin(Decimal("3"), 30)
+    info = math_functions._pi.cache_info()
+    assert info.misses == 1 and info.hits >= 1
@@ -5,10 +5,11 @@ from app.exceptions import HistoryError
 from unittest.mock import patch, MagicMock
 from unittest.mock import Mock
 from colorama import Fore, Style
-from app.exceptions import DataFormatError
+from app.exceptions import DataFormatError, FileAccessError
 import os
 from app.config import CALCULATOR_MAX_HISTORY_SIZE, CSV_COLUMNS, CALCULATOR_HISTORY_DIR
 import pandas as pd
+from app import history_csv
 
 # -------------------------------
 # MementoCalculator tests
@@ -70,13 +71,12 @@ def test_save_memento_raises_historyerror(caplog):
     assert any("append failed" in rec.message for rec in caplog.records)
     assert any("Failed to save memento" in rec.message for rec in caplog.records)
 
-def test_get_loaded_history_warns_when_no_csv_history(caplog):
+def test_get_loaded_history_warns_when_no_csv_history(tmp_path, caplog):
     originator = Originator()
     caretaker = CareTaker()
 
-    # Ensure CSV file does not exist
-    if caretaker.log_file and os.path.exists(caretaker.log_file):
-        os.remove(caretaker.log_file)
+    # Ensure CSV file does not exist (without touching the committed history file)
+    caretaker.log_file = str(tmp_path / "missing.csv")
 
     # Capture logger output and patch print
     with caplog.at_level("WARNING"), patch("builtins.print") as mock_print:
@@ -90,7 +90,7 @@ def test_get_loaded_history_warns_when_no_csv_history(caplog):
    # Mock the file checks so that the code attempts to read the CSV
     with patch("os.path.exists", return_value=True), \
          patch("os.path.getsize", return_value=1), \
-         patch("pandas.read_csv", side_effect=Exception("read_csv failed")):
+         patch("app.memento.read_history_csv", side_effect=Exception("read failed")):
 
         with caplog.at_level("ERROR"):
             with pytest.raises(DataFormatError) as exc_info:
@@ -104,7 +104,9 @@ def test_memento_creation_and_get_state():
     memento = MementoCalculator(state)
     # Ensure state is copied, not referenced
     assert memento.get_state() == state
-    assert memento.get_state() is not state  # deepcopy ensures different object
+    assert memento.get_state() is not state  # the copy ensures different object
+    state.append("10 - 1 = 9")
+    assert memento.get_state() == ["5 + 2 = 7", "3 * 4 = 12"]
 
 # -------------------------------
 # Originator tests
@@ -157,6 +159,66 @@ def test_originator_restore_memento():
     originator.restore_memento(memento)
     assert originator.history == ["5 + 2 = 7"]
 
+def test_restore_memento_logs_a_compact_summary(caplog):
+    originator = Originator()
+    originator.add_operation("5 + 2 = 7")
+    memento = originator.create_memento()
+    originator.add_operation("3 * 4 = 12")
+    version = originator.version
+    caplog.clear()
+
+    with caplog.at_level("INFO", logger="calculator"):
+        originator.restore_memento(memento)
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert f"✅ History restored from memento: version {version} -> {version + 1}, 2 -> 1 entries" in messages
+    # no history dump at info level
+    assert not any("3 * 4 = 12" in message for message in messages)
+
+def test_restore_memento_dumps_histories_at_debug(caplog):
+    originator = Originator()
+    originator.add_operation("5 + 2 = 7")
+    memento = originator.create_memento()
+    originator.add_operation("3 * 4 = 12")
+
+    with caplog.at_level("DEBUG", logger="calculator"):
+        originator.restore_memento(memento)
+    messages = [record.getMessage() for record in caplog.records]
+    assert "History change: 2 -> 1 entries, 1 removed, 0 added" in messages
+    assert any("History before restore" in message and "3 * 4 = 12" in message for message in messages)
+
+def test_restore_memento_summary_is_lazy():
+    from app.memento import HistoryDiff
+    originator = Originator()
+    originator.history = [str(n) for n in range(CALCULATOR_MAX_HISTORY_SIZE)]
+    memento = originator.create_memento()
+    # below DEBUG the histories are not compared at all, not even by the logging thread
+    with patch.object(HistoryDiff, "__str__") as mock_str, patch("app.memento.logger.isEnabledFor", return_value=False):
+        originator.restore_memento(memento)
+    mock_str.assert_not_called()
+
+
+def test_version_is_bumped_once_per_change():
+    originator = Originator()
+    caretaker = CareTaker()
+    assert originator.version == 0
+    originator.add_operation("5 + 2 = 7", caretaker)
+    assert originator.version == 1
+    caretaker.undo_memento(originator)
+    assert originator.version == 2
+    caretaker.redo_memento(originator)
+    assert originator.version == 3
+
+
+def test_create_memento_copies_history_once():
+    originator = Originator()
+    originator.add_operation("5 + 2 = 7")
+    with patch("app.memento.list", wraps=list, create=True) as mock_list:
+        memento = originator.create_memento()
+    assert mock_list.call_count == 1
+    originator.add_operation("3 * 4 = 12")
+    assert memento.get_state() == ["5 + 2 = 7"]
+
 
 
 # -------------------------------
@@ -229,35 +291,57 @@ def test_add_operation_trims_history(monkeypatch, caplog):
     # There should be a log about trimming
     assert any("History exceeded max size" in record.message for record in caplog.records)
 
-def test_get_loaded_history_reads_csv_and_updates_originator(monkeypatch, caplog):
+def test_get_loaded_history_reads_csv_and_updates_originator(tmp_path, caplog):
     originator = Originator()
     caretaker = CareTaker()
+    caretaker.log_file = str(tmp_path / "history.csv")
 
-    # Dummy CSV data
-    csv_data = pd.DataFrame([
-        {"timestamp": "2025-10-23 12:00", "operation": "add", "operand1": "2", "operand2": "3", "result": "5", "instance_id": "1"},
-        {"timestamp": "2025-10-23 12:01", "operation": "multiply", "operand1": "3", "operand2": "4", "result": "12", "instance_id": "1"}
-    ], columns=CSV_COLUMNS)
-
-    with patch("os.path.exists", return_value=True), \
-         patch("os.path.getsize", return_value=1), \
-         patch("pandas.read_csv", return_value=csv_data):
+    # Dummy CSV data, values are kept exactly as written
+    rows = [
+        "2025-10-23 12:00,add,2,3,5.0000,1",
+        "2025-10-23 12:01,multiply,3,4,12,",
+    ]
+    with open(caretaker.log_file, "w") as file:
+        file.write(",".join(CSV_COLUMNS) + "\n" + "\n".join(rows) + "\n")
 
-        with patch.object(Originator, "add_operation", wraps=originator.add_operation) as mock_add_op:
-            with caplog.at_level("INFO"):
-                caretaker.get_loaded_history(originator)
+    with patch.object(Originator, "add_operation", wraps=originator.add_operation) as mock_add_op:
+        with caplog.at_level("INFO"):
+            caretaker.get_loaded_history(originator)
 
     # Now add_operation should have been called for each CSV row
-    assert mock_add_op.call_count == len(csv_data)
-    assert len(originator.history) == len(csv_data)
+    assert mock_add_op.call_count == len(rows)
+    assert originator.history == rows
 
     # Logs should indicate successful load
     assert any("History loaded into instance successfully" in record.message for record in caplog.records)
-    assert any(f"Loaded {len(csv_data)} operations" in record.message for record in caplog.records)
+    assert any(f"Loaded {len(rows)} operations" in record.message for record in caplog.records)
 
-def test_save_history_to_csv_saves_valid_entries(monkeypatch, caplog):
+def test_get_loaded_history_rejects_missing_columns(tmp_path):
     originator = Originator()
+    originator.history = ["keep"]
     caretaker = CareTaker()
+    caretaker.log_file = str(tmp_path / "history.csv")
+    with open(caretaker.log_file, "w") as file:
+        file.write("timestamp,operation\n2025-10-23 12:00,add\n")
+
+    with pytest.raises(DataFormatError, match="missing columns"):
+        caretaker.get_loaded_history(originator)
+    # the file is parsed before anything is cleared
+    assert originator.history == ["keep"]
+
+def test_get_loaded_history_rejects_short_rows(tmp_path):
+    caretaker = CareTaker()
+    caretaker.log_file = str(tmp_path / "history.csv")
+    with open(caretaker.log_file, "w") as file:
+        file.write(",".join(CSV_COLUMNS) + "\n2025-10-23 12:00,add,2\n")
+
+    with pytest.raises(DataFormatError, match="row 2"):
+        caretaker.get_loaded_history(Originator())
+
+def test_save_history_to_csv_saves_valid_entries(tmp_path, caplog):
+    originator = Originator()
+    caretaker = CareTaker()
+    caretaker.log_file = str(tmp_path / "history.csv")
 
     # Prepare history with two valid entries and one wrong
     originator.history = [
@@ -266,8 +350,7 @@ def test_save_history_to_csv_saves_valid_entries(monkeypatch, caplog):
         "malformed entry without proper columns"
     ]
 
-    with patch("os.makedirs") as mock_makedirs, \
-         patch("pandas.DataFrame.to_csv") as mock_to_csv:
+    with patch("os.makedirs") as mock_makedirs:
         with caplog.at_level("INFO"):
             caretaker.save_history_to_csv(originator)
 
@@ -275,13 +358,34 @@ def test_save_history_to_csv_saves_valid_entries(monkeypatch, caplog):
     mock_makedirs.assert_called_once_with(CALCULATOR_HISTORY_DIR, exist_ok=True)
 
     # Only 2 valid entries should be written
-    mock_to_csv.assert_called_once()
-    args, kwargs = mock_to_csv.call_args
-    df_passed = args[0] if args else kwargs.get("index", None)
+    with open(caretaker.log_file) as file:
+        assert file.read() == ",".join(CSV_COLUMNS) + "\n" + "\n".join(originator.history[:2]) + "\n"
 
     assert any("Saved 2 operations to CSV" in record.message for record in caplog.records)
     assert any("Skipping unproperly formatted entry" in record.message for record in caplog.records)
 
+def test_save_history_to_csv_matches_pandas_output(tmp_path):
+    originator = Originator()
+    caretaker = CareTaker()
+    caretaker.log_file = str(tmp_path / "history.csv")
+    originator.history = [
+        "2025-10-23 12:00:00,Addition,2,3,5,abc",
+        "2025-10-23 12:01:00,Power,2.5,-3,0.064,",
+        'weird "quoted" value,Root,1e+3,2,31.62,x y',
+    ]
+    caretaker.save_history_to_csv(originator)
+
+    # byte for byte what the pandas DataFrame/to_csv path used to write
+    expected = tmp_path / "pandas.csv"
+    pd.DataFrame([dict(zip(CSV_COLUMNS, e.split(","))) for e in originator.history], columns=CSV_COLUMNS).to_csv(expected, index=False)
+    with open(caretaker.log_file, "rb") as ours, open(expected, "rb") as theirs:
+        assert ours.read() == theirs.read()
+
+    # and it loads back into the same entries
+    loaded = Originator()
+    caretaker.get_loaded_history(loaded)
+    assert loaded.history == originator.history
+
 def test_save_history_to_csv_no_history(caplog):
     originator = Originator()
     caretaker = CareTaker()
@@ -349,8 +453,8 @@ def test_delete_saved_history_file_missing(monkeypatch, caplog):
 def test_mementocalculator_init_exception():
     state = ["5 + 2 = 7", "3 * 4 = 12"]
     
-    # Patch deepcopy to raise an exception
-    with patch("app.memento.deepcopy", side_effect=Exception("deepcopy failed")):
+    # Patch the copy to raise an exception
+    with patch("app.memento.list", side_effect=Exception("copy failed"), create=True):
         with pytest.raises(HistoryError) as excinfo:
             MementoCalculator(state)
     
@@ -360,9 +464,225 @@ def test_mementocalculator_get_state_exception():
     state = ["5 + 2 = 7", "3 * 4 = 12"]
     memento = MementoCalculator(state)
     
-    # Patch deepcopy to raise an exception when get_state is called
-    with patch("app.memento.deepcopy", side_effect=Exception("deepcopy failed")):
+    # Patch the copy to raise an exception when get_state is called
+    with patch("app.memento.list", side_effect=Exception("copy failed"), create=True):
         with pytest.raises(HistoryError) as excinfo:
             memento.get_state()
     
-    assert "Failed to get memento state" in str(excinfo.value)
\ No newline at end of file
+    assert "Failed to get memento state" in str(excinfo.value)
+
+# -------------------------------
+# Bounded undo/redo stacks
+# -------------------------------
+def test_undo_stack_capped_by_depth():
+    originator, caretaker = Originator(), CareTaker(max_undo_depth=3, undo_memory_budget=0)
+    for n in range(10):
+        originator.add_operation(f"op{n}", caretaker=caretaker)
+
+    assert len(caretaker.stack_undo) == 3
+    # the oldest states were evicted, the most recent ones are still undoable
+    assert caretaker.stack_undo[-1].get_state() == [f"op{n}" for n in range(9)]
+    assert caretaker.stats()["evicted"] == 7
+
+
+def test_undo_stack_capped_by_memory_budget():
+    originator = Originator()
+    entry = "2025-10-21 10:00:00,Addition,1,2,3.0000,abc"
+    budget = MementoCalculator([entry] * 20).size * 2
+    caretaker = CareTaker(max_undo_depth=0, undo_memory_budget=budget)
+    for _ in range(20):
+        originator.add_operation(entry, caretaker=caretaker)
+
+    stats = caretaker.stats()
+    assert 0 < stats["undo_bytes"] <= budget
+    assert stats["undo_depth"] < 20
+    assert stats["evicted"] == 20 - stats["undo_depth"]
+
+
+def test_stats_track_redo_footprint():
+    originator, caretaker = Originator(), CareTaker()
+    for n in range(3):
+        originator.add_operation(f"op{n}", caretaker=caretaker)
+    caretaker.undo_memento(originator)
+
+    stats = caretaker.stats()
+    assert stats["undo_depth"] == 2
+    assert stats["redo_depth"] == 1
+    assert stats["redo_bytes"] == caretaker.stack_redo[0].size
+    assert stats["undo_bytes"] == sum(m.size for m in caretaker.stack_undo)
+
+
+# -------------------------------
+# Ring buffer backed history
+# -------------------------------
+def test_history_is_a_bounded_ring_buffer():
+    from app.ring_buffer import RingBuffer
+    originator = Originator()
+    assert isinstance(originator.history, RingBuffer)
+
+    for n in range(CALCULATOR_MAX_HISTORY_SIZE + 5):
+        originator.add_operation(f"op{n}")
+    assert originator.history[0] == "op5"
+    assert originator.history[-1] == f"op{CALCULATOR_MAX_HISTORY_SIZE + 4}"
+    assert originator.history[-2:] == [f"op{CALCULATOR_MAX_HISTORY_SIZE + 3}", f"op{CALCULATOR_MAX_HISTORY_SIZE + 4}"]
+
+
+def test_assigned_history_is_wrapped_and_trimmed():
+    originator = Originator()
+    originator.history = [f"op{n}" for n in range(CALCULATOR_MAX_HISTORY_SIZE + 3)]
+    assert len(originator.history) == CALCULATOR_MAX_HISTORY_SIZE
+    assert originator.history[0] == "op3"
+
+    originator.add_operation("new")
+    assert originator.history[-1] == "new"
+    assert originator.history.maxlen == CALCULATOR_MAX_HISTORY_SIZE
+
+
+def test_memento_round_trip_keeps_ring_buffer():
+    originator = Originator()
+    originator.add_operation("a")
+    originator.add_operation("b")
+    memento = originator.create_memento()
+    # the memento holds a plain list snapshot, independent of later changes
+    assert type(memento.get_state()) is list
+    originator.add_operation("c")
+    assert memento.get_state() == ["a", "b"]
+
+    originator.restore_memento(memento)
+    assert originator.history == ["a", "b"]
+    originator.add_operation("d")
+    assert originator.history == ["a", "b", "d"]
+
+
+# -------------------------------
+# Incremental save
+# -------------------------------
+def entry(n):
+    return f"2025-10-23 12:00:{n:02d},Addition,{n},1,{n + 1},abc"
+
+
+@pytest.fixture
+def saving(tmp_path):
+    originator = Originator()
+    caretaker = CareTaker()
+    caretaker.log_file = str(tmp_path / "history.csv")
+    return originator, caretaker
+
+
+def saved_entries(caretaker):
+    return list(history_csv.read_history_csv(caretaker.log_file))
+
+
+def test_second_save_appends_only_new_entries(saving):
+    originator, caretaker = saving
+    for n in range(3):
+        originator.add_operation(entry(n), caretaker=caretaker)
+    caretaker.save_history_to_csv(originator)
+    assert caretaker.save_watermark == 3
+
+    for n in range(3, 5):
+        originator.add_operation(entry(n), caretaker=caretaker)
+    with patch("app.memento.write_history_csv") as mock_rewrite, \
+         patch("app.memento.append_history_csv", wraps=history_csv.append_history_csv) as mock_append:
+        caretaker.save_history_to_csv(originator)
+
+    mock_rewrite.assert_not_called()
+    mock_append.assert_called_once_with(caretaker.log_file, [entry(3), entry(4)])
+    assert saved_entries(caretaker) == [entry(n) for n in range(5)]
+    assert caretaker.save_watermark == 5
+
+
+def test_undo_past_watermark_rewrites_file(saving):
+    originator, caretaker = saving
+    for n in range(3):
+        originator.add_operation(entry(n), caretaker=caretaker)
+    caretaker.save_history_to_csv(originator)
+
+    caretaker.undo_memento(originator)
+    caretaker.undo_memento(originator)
+    originator.add_operation(entry(9), caretaker=caretaker)
+    caretaker.save_history_to_csv(originator)
+    assert saved_entries(caretaker) == [entry(0), entry(9)]
+
+
+def test_replaced_last_entry_rewrites_file(saving):
+    originator, caretaker = saving
+    for n in range(2):
+        originator.add_operation(entry(n), caretaker=caretaker)
+    caretaker.save_history_to_csv(originator)
+
+    # same length as saved, but the last saved entry is gone
+    caretaker.undo_memento(originator)
+    originator.add_operation(entry(9), caretaker=caretaker)
+    originator.add_operation(entry(8), caretaker=caretaker)
+    caretaker.save_history_to_csv(originator)
+    assert saved_entries(caretaker) == [entry(0), entry(9), entry(8)]
+
+
+def test_trimmed_history_rewrites_file(saving):
+    originator, caretaker = saving
+    for n in range(CALCULATOR_MAX_HISTORY_SIZE):
+        originator.add_operation(entry(n % 60), caretaker=caretaker)
+    caretaker.save_history_to_csv(originator)
+
+    # the oldest saved entry falls out of the history
+    originator.add_operation(entry(59), caretaker=caretaker)
+    caretaker.save_history_to_csv(originator)
+    assert saved_entries(caretaker) == list(originator.history)
+
+
+def test_file_changed_elsewhere_rewrites_file(saving):
+    originator, caretaker = saving
+    originator.add_operation(entry(0), caretaker=caretaker)
+    caretaker.save_history_to_csv(originator)
+
+    with open(caretaker.log_file, "a") as file:
+        file.write(entry(7) + "\n")
+    originator.add_operation(entry(1), caretaker=caretaker)
+    caretaker.save_history_to_csv(originator)
+    assert saved_entries(caretaker) == [entry(0), entry(1)]
+
+
+def test_delete_resets_watermark(saving):
+    originator, caretaker = saving
+    originator.add_operation(entry(0), caretaker=caretaker)
+    caretaker.save_history_to_csv(originator)
+    with patch("builtins.print"):
+        caretaker.delete_saved_history(originator)
+    assert caretaker.save_watermark == 0
+
+    originator.add_operation(entry(1), caretaker=caretaker)
+    caretaker.save_history_to_csv(originator)
+    assert saved_entries(caretaker) == [entry(1)]
+
+
+def test_load_sets_watermark(saving):
+    originator, caretaker = saving
+    for n in range(2):
+        originator.add_operation(entry(n), caretaker=caretaker)
+    caretaker.save_history_to_csv(originator)
+
+    restarted = CareTaker()
+    restarted.log_file = caretaker.log_file
+    loaded = Originator()
+    restarted.get_loaded_history(loaded)
+    assert restarted.save_watermark == 2
+
+    loaded.add_operation(entry(2), caretaker=restarted)
+    with patch("app.memento.write_history_csv") as mock_rewrite:
+        restarted.save_history_to_csv(loaded)
+    mock_rewrite.assert_not_called()
+    assert saved_entries(restarted) == [entry(n) for n in range(3)]
+
+
+def test_failed_rewrite_keeps_previous_file(saving):
+    originator, caretaker = saving
+    originator.add_operation(entry(0), caretaker=caretaker)
+    caretaker.save_history_to_csv(originator)
+
+    caretaker.undo_memento(originator)
+    originator.add_operation(entry(1), caretaker=caretaker)
+    with patch("os.replace", side_effect=OSError("disk full")):
+        with pytest.raises(FileAccessError):
+            caretaker.save_history_to_csv(originator)
+    assert saved_entries(caretaker) == [entry(0)]
@@ -32,24 +32,77 @@ def test_loggingobserver_update_success(tmp_path):
     """Ensure JSONL is appended correctly"""
     log_file = tmp_path / "log.jsonl"
     with patch("os.path.join", return_value=str(log_file)):
-        observer = LoggingObserver()
+        observer = LoggingObserver(fsync_policy="none")
 
     message = {"timestamp": "2025-10-21", "operation": "add", "operand1": 2, "operand2": 3, "result": 5}
     with patch("builtins.open", mock_open()) as m:
         observer.update(message)
+        observer.flush()
         m.assert_called_once_with(observer.log_file, "a", encoding=CALCULATOR_DEFAULT_ENCODING)
         handle = m()
         handle.write.assert_called_once_with(json.dumps(message) + "\n")
 
 
 def test_loggingobserver_update_write_error(monkeypatch):
-    observer = LoggingObserver()
+    observer = LoggingObserver(batch_size=1)
     monkeypatch.setattr("builtins.open", lambda *a, **kw: (_ for _ in ()).throw(Exception("disk error")))
 
     with patch.object(logger, "error") as mock_err:
         observer.update({"dummy": "data"})
         mock_err.assert_called_once()
         assert "failed to save" in mock_err.call_args[0][0]
+    # the record is kept for the next flush
+    assert observer.buffer == [json.dumps({"dummy": "data"}) + "\n"]
+
+
+def test_loggingobserver_group_commit_keeps_file_open(tmp_path):
+    observer = LoggingObserver(batch_size=3, flush_interval=0, fsync_policy="batch")
+    observer.log_file = str(tmp_path / "log.jsonl")
+
+    with patch("builtins.open", wraps=open) as mock_file, patch("os.fsync") as mock_fsync:
+        for n in range(7):
+            observer.update({"n": n})
+        # two full batches written, one record still buffered
+        assert mock_file.call_count == 1
+        assert mock_fsync.call_count == 2
+        assert len(observer.buffer) == 1
+
+        observer.close()
+        assert mock_fsync.call_count == 3
+
+    lines = (tmp_path / "log.jsonl").read_text().splitlines()
+    assert [json.loads(line)["n"] for line in lines] == list(range(7))
+
+
+def test_loggingobserver_flushes_partial_batch_after_interval(tmp_path):
+    import time
+    observer = LoggingObserver(batch_size=100, flush_interval=0.05, fsync_policy="none")
+    observer.log_file = str(tmp_path / "log.jsonl")
+
+    observer.update({"n": 1})
+    deadline = time.monotonic() + 2
+    while observer.buffer and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert (tmp_path / "log.jsonl").read_text() == json.dumps({"n": 1}) + "\n"
+    observer.close()
+
+
+@pytest.mark.parametrize("policy, fsyncs", [("none", 0), ("batch", 1), ("every", 3)])
+def test_loggingobserver_fsync_policies(tmp_path, policy, fsyncs):
+    observer = LoggingObserver(batch_size=10, flush_interval=0, fsync_policy=policy)
+    observer.log_file = str(tmp_path / "log.jsonl")
+
+    with patch("os.fsync") as mock_fsync:
+        for n in range(3):
+            observer.update({"n": n})
+        observer.close()
+    assert mock_fsync.call_count == fsyncs
+    assert len((tmp_path / "log.jsonl").read_text().splitlines()) == 3
+
+
+def test_loggingobserver_invalid_fsync_policy():
+    with pytest.raises(ValueError):
+        LoggingObserver(fsync_policy="sometimes")
 
 
 # ----------------------------
@@ -65,7 +118,7 @@ def test_autosaveobserver_init_new_file(tmp_path):
 
 
 def test_autosaveobserver_update_appends(monkeypatch, tmp_path):
-    """Appends new row to DataFrame and saves CSV when auto-save enabled"""
+    """Appends the new row to the CSV when auto-save enabled, without rewriting it"""
     monkeypatch.setattr("app.observers.CALCULATOR_AUTO_SAVE", True)
     log_file = str(tmp_path / "auto.csv")
     obs = AutosaveObserver(log_file=log_file)
@@ -73,9 +126,11 @@ def test_autosaveobserver_update_appends(monkeypatch, tmp_path):
     message = {c: f"val_{c}" for c in CSV_COLUMNS}
     with patch("pandas.DataFrame.to_csv") as mock_to_csv:
         obs.update(message)
-        mock_to_csv.assert_called_once()
-        assert len(obs.df) == 1
-        assert all(col in obs.df.columns for col in CSV_COLUMNS)
+        mock_to_csv.assert_not_called()
+    with open(log_file) as file:
+        assert file.read() == ",".join(CSV_COLUMNS) + "\n" + ",".join(message.values()) + "\n"
+    assert len(obs.df) == 1
+    assert all(col in obs.df.columns for col in CSV_COLUMNS)
 
 
 def test_autosaveobserver_update_no_autosave(monkeypatch, tmp_path):
@@ -97,7 +152,7 @@ def test_autosaveobserver_update_write_error(monkeypatch, tmp_path):
     log_file = str(tmp_path / "auto.csv")
     obs = AutosaveObserver(log_file=log_file)
 
-    with patch("pandas.DataFrame.to_csv", side_effect=Exception("disk fail")), \
+    with patch("builtins.open", side_effect=Exception("disk fail")), \
          patch.object(logger, "error") as mock_err:
         obs.update({c: "x" for c in CSV_COLUMNS})
         mock_err.assert_called_once()
@@ -113,14 +168,16 @@ def test_autosaveobserver_load_existing_file(tmp_path):
         pd.testing.assert_frame_equal(obs.df, data)
         mock_logger.info.assert_called_with(f"✅ AutosaveObserver loaded existing file: {obs.log_file}")
 
-def test_autosaveobserver_init_exception(monkeypatch):
+def test_autosaveobserver_init_exception(tmp_path):
     """Simulate a failure during initialization"""
-    # Force pd.read_csv to throw an exception
-    monkeypatch.setattr("pandas.read_csv", lambda *args, **kwargs: (_ for _ in ()).throw(Exception("read fail")))
+    log_file = tmp_path / "existing.csv"
+    log_file.write_text(",".join(CSV_COLUMNS) + "\n")
 
-    with patch("app.observers.logger") as mock_logger:
+    # Force reading the header to throw an exception
+    with patch("app.observers.logger") as mock_logger, \
+         patch("builtins.open", side_effect=Exception("read fail")):
         with pytest.raises(FileAccessError) as excinfo:
-            AutosaveObserver(log_file="dummy.csv")
+            AutosaveObserver(log_file=str(log_file))
 
         # Check that logger.error was called
         mock_logger.error.assert_called_once()
@@ -147,7 +204,8 @@ def test_autosaveobserver_update_exception(tmp_path):
     log_file = tmp_path / "auto.csv"
     obs = AutosaveObserver(log_file=str(log_file))
     
-    # Patch pd.concat to raise an exception
+    # load df, then make the in-memory append fail
+    obs.df
     with patch("pandas.concat", side_effect=Exception("concat fail")), \
          patch("app.observers.logger") as mock_logger:
         
@@ -193,4 +251,140 @@ def test_subject_notify_multiple_observers():
     msg = ",".join(["a", "b", "c", "d", "e", "f"])
     subj.notify(msg)
     o1.update.assert_called_once()
-    o2.update.assert_called_once()
\ No newline at end of file
+    o2.update.assert_called_once()
+
+# ----------------------------
+# Batch updates and BatchingObserver
+# ----------------------------
+def test_loggingobserver_update_many_single_write():
+    observer = LoggingObserver(fsync_policy="none")
+    messages = [{"result": "1"}, None, {"result": "2"}]
+    with patch("builtins.open", mock_open()) as m:
+        observer.update_many(messages)
+        m.assert_called_once_with(observer.log_file, "a", encoding=CALCULATOR_DEFAULT_ENCODING)
+        m().write.assert_called_once_with(json.dumps(messages[0]) + "\n" + json.dumps(messages[2]) + "\n")
+
+
+def test_autosaveobserver_update_many_saves_once(monkeypatch, tmp_path):
+    monkeypatch.setattr("app.observers.CALCULATOR_AUTO_SAVE", True)
+    obs = AutosaveObserver(log_file=str(tmp_path / "auto.csv"))
+    with patch("builtins.open", wraps=open) as mock_open_file:
+        obs.update_many([{c: str(i) for c in CSV_COLUMNS} for i in range(5)])
+        mock_open_file.assert_called_once()
+    assert len(obs.df) == 5
+
+
+# ----------------------------
+# Tail-only AutosaveObserver start-up
+# ----------------------------
+def test_autosaveobserver_init_does_not_read_rows(tmp_path):
+    log_file = tmp_path / "big.csv"
+    log_file.write_text(",".join(CSV_COLUMNS) + "\n" + "t,add,1,2,3,id\n" * 1000)
+
+    with patch("pandas.read_csv") as mock_read_csv:
+        obs = AutosaveObserver(log_file=str(log_file))
+        mock_read_csv.assert_not_called()
+
+    # rows are read on first access only, and include rows appended since
+    obs.update(dict(zip(CSV_COLUMNS, ["t", "sub", "5", "1", "4", "id"])))
+    assert len(obs.df) == 1001
+    assert obs.df.iloc[-1]["operation"] == "sub"
+
+
+def test_autosaveobserver_moves_aside_unexpected_header(tmp_path):
+    log_file = tmp_path / "other.csv"
+    log_file.write_text("a,b,c\n1,2,3\n")
+    with patch("app.observers.logger") as mock_logger:
+        obs = AutosaveObserver(log_file=str(log_file))
+    assert "Unexpected header" in mock_logger.warning.call_args_list[0][0][0]
+
+    # the user's file is kept as it was, next to a new history file
+    backups = list(tmp_path.glob("other.csv.header-*.bak"))
+    assert len(backups) == 1 and backups[0].read_text() == "a,b,c\n1,2,3\n"
+    assert log_file.read_text() == ",".join(CSV_COLUMNS) + "\n"
+    obs.update(dict(zip(CSV_COLUMNS, ["t", "sub", "5", "1", "4", "id"])))
+    assert log_file.read_text().splitlines()[1:] == ["t,sub,5,1,4,id"]
+
+
+def test_autosaveobserver_drops_torn_last_row(tmp_path):
+    log_file = tmp_path / "torn.csv"
+    log_file.write_text(",".join(CSV_COLUMNS) + "\n" + "t,add,1,2,3,id\n" + "t,add,4,")
+
+    obs = AutosaveObserver(log_file=str(log_file))
+    obs.update(dict(zip(CSV_COLUMNS, ["t", "sub", "5", "1", "4", "id"])))
+    assert log_file.read_text().splitlines()[1:] == ["t,add,1,2,3,id", "t,sub,5,1,4,id"]
+
+    # the file as it was before the torn row was cut off
+    backups = list(tmp_path.glob("torn.csv.torn-*.bak"))
+    assert len(backups) == 1 and backups[0].read_text().endswith("t,add,1,2,3,id\nt,add,4,")
+
+
+@pytest.mark.parametrize("content", [
+    ",".join(CSV_COLUMNS),                                        # header only
+    ",".join(CSV_COLUMNS) + "\n" + "t,add,1,2,3,id",              # whole last row
+])
+def test_autosaveobserver_keeps_complete_last_line_without_newline(tmp_path, content):
+    log_file = tmp_path / "no_newline.csv"
+    log_file.write_text(content)
+
+    obs = AutosaveObserver(log_file=str(log_file))
+    obs.update(dict(zip(CSV_COLUMNS, ["t", "sub", "5", "1", "4", "id"])))
+    # nothing is cut, the next row starts on its own line
+    assert log_file.read_text() == content + "\n" + "t,sub,5,1,4,id\n"
+    assert not list(tmp_path.glob("*.bak"))
+
+
+def test_autosaveobserver_unsaved_rows_stay_in_df(monkeypatch, tmp_path):
+    monkeypatch.setattr("app.observers.CALCULATOR_AUTO_SAVE", False)
+    log_file = tmp_path / "auto.csv"
+    log_file.write_text(",".join(CSV_COLUMNS) + "\n" + "t,add,1,2,3,id\n")
+    obs = AutosaveObserver(log_file=str(log_file))
+
+    obs.update_many([{c: "x" for c in CSV_COLUMNS}, {c: "y" for c in CSV_COLUMNS}])
+    assert len(obs.df) == 3
+    assert log_file.read_text().count("\n") == 2
+
+
+def test_batchingobserver_flushes_on_batch_size():
+    from app.observers import BatchingObserver
+    downstream = MagicMock()
+    batching = BatchingObserver([downstream], batch_size=3, flush_interval=0)
+
+    batching.update({"n": 1})
+    batching.update({"n": 2})
+    downstream.update_many.assert_not_called()
+
+    batching.update({"n": 3})
+    downstream.update_many.assert_called_once_with([{"n": 1}, {"n": 2}, {"n": 3}])
+    assert batching.buffer == []
+
+
+def test_batchingobserver_flushes_on_interval_and_close():
+    import time
+    from app.observers import BatchingObserver
+    downstream = MagicMock()
+    batching = BatchingObserver([downstream], batch_size=100, flush_interval=0.05)
+
+    batching.update({"n": 1})
+    deadline = time.monotonic() + 2
+    while not downstream.update_many.called and time.monotonic() < deadline:
+        time.sleep(0.01)
+    downstream.update_many.assert_called_once_with([{"n": 1}])
+
+    batching.update({"n": 2})
+    batching.close()
+    assert downstream.update_many.call_count == 2
+    downstream.close.assert_called_once()
+
+
+def test_batchingobserver_isolates_failing_observer():
+    from app.observers import BatchingObserver
+    failing, plain = MagicMock(), MagicMock(spec=["update"])
+    failing.update_many.side_effect = Exception("disk full")
+    batching = BatchingObserver([failing, plain], batch_size=1, flush_interval=0)
+
+    with patch.object(logger, "error") as mock_err:
+        batching.update({"n": 1})
+        batching.update(None)
+    mock_err.assert_called_once()
+    plain.update.assert_called_once_with({"n": 1})
@@ -0,0 +1,165 @@
+import os
+import subprocess
+import sys
+import textwrap
+import pytest
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+from app.operation_registry import OperationRegistry, OperationSpec, registry
+from app.calculation import Addition, Root
+from app.calculator import Calculator
+from app.command_factory import CommandFactory
+from app.exceptions import CommandError, OperationError, ValidationError
+
+
+# -------------------------------
+# Fixtures
+# -------------------------------
+PLUGIN = '''
+from app.exceptions import ValidationError
+
+def positive_b(a, b):
+    if b <= 0:
+        raise ValidationError("b must be positive")
+
+def register(registry):
+    registry.register("hypot", "hypot_impl.operations:Hypotenuse", name="Hypotenuse", symbol="hypot",
+                      validators=[positive_b], batch_capable=True)
+'''
+
+IMPLEMENTATION = '''
+from app.calculation import CalculationTemplate
+
+class Hypotenuse(CalculationTemplate):
+    def runOperation(self, a, b):
+        return (a * a + b * b).sqrt()
+'''
+
+
+@pytest.fixture
+def plugin_dir(tmp_path):
+    (tmp_path / "hypot_plugin.py").write_text(textwrap.dedent(PLUGIN))
+    (tmp_path / "hypot_impl").mkdir()
+    (tmp_path / "hypot_impl" / "__init__.py").write_text("")
+    (tmp_path / "hypot_impl" / "operations.py").write_text(textwrap.dedent(IMPLEMENTATION))
+    (tmp_path / "_helpers.py").write_text("raise RuntimeError('not a plugin')")
+    yield str(tmp_path)
+    for module in ("hypot_plugin", "hypot_impl", "hypot_impl.operations"):
+        sys.modules.pop(module, None)
+    if str(tmp_path) in sys.path:
+        sys.path.remove(str(tmp_path))
+
+
+def empty_registry(**kwargs):
+    kwargs.setdefault("plugin_dir", None)
+    with patch("app.operation_registry.entry_points", return_value=[]):
+        fresh = OperationRegistry(**kwargs)
+        fresh.discover()
+    return fresh
+
+
+# -------------------------------
+# Built-in operations
+# -------------------------------
+def test_builtin_menu_letters():
+    menu = registry.menu()
+    assert menu["A"] == ["Percentage", "percentage"]
+    assert menu["G"] == ["Addition", "add"]
+    assert menu["J"] == ["Power", "power"]
+    assert Calculator.operations_dictionary["Q"] == ["Exit the program", "exit"]
+
+
+def test_builtin_symbols_are_used_for_direct_instances():
+    assert Addition()._operator_symbol() == "+"
+    assert Root()._operator_symbol() == "root"
+
+
+def test_unknown_operation_keeps_the_factory_message():
+    with pytest.raises(CommandError, match="Command 'nope' not allowed. Allowed commands:"):
+        CommandFactory("nope").createOperationObject()
+
+
+# -------------------------------
+# Registration
+# -------------------------------
+def test_duplicate_op_code_is_rejected():
+    fresh = empty_registry()
+    fresh.register("add", Addition)
+    with pytest.raises(CommandError, match="already registered"):
+        fresh.register("ADD", Addition)
+
+
+def test_menu_letters_are_checked_and_assigned():
+    fresh = empty_registry()
+    assert fresh.register("first", Addition).menu_letter == "A"
+    with pytest.raises(CommandError, match="already taken"):
+        fresh.register("second", Addition, menu_letter="a")
+    with pytest.raises(CommandError, match="already taken"):
+        fresh.register("third", Addition, menu_letter="Q")
+
+    # plugins next to the built-ins get the first letter after the calculator's commands
+    assert registry.register("extra_op", Addition).menu_letter == "X"
+    del registry._specs["extra_op"]
+
+
+def test_implementation_is_imported_on_first_use(plugin_dir):
+    fresh = empty_registry(plugin_dir=plugin_dir)
+    assert "hypot" in fresh
+    spec = fresh.get("hypot")
+    assert spec.batch_capable and spec.menu_letter == "A"
+    assert not spec.loaded
+    assert "hypot_impl" not in sys.modules
+
+    operation = fresh.create("HYPOT")
+    assert spec.loaded
+    assert operation.calculate(Decimal("3"), Decimal("4")) == Decimal("5.0000")
+    assert operation._operator_symbol() == "hypot"
+
+
+@pytest.mark.parametrize("module", ["app.calculator_repl", "app.server"])
+def test_startup_does_not_load_calculations_or_numpy(module, tmp_path):
+    # a fresh interpreter: this one has long imported everything
+    code = (f"import sys, {module}; "
+            "print(sorted(m for m in ('app.calculation', 'app.reductions', 'app.vector_mode', 'numpy', 'pandas') if m in sys.modules))")
+    env = dict(os.environ, CALCULATOR_LOG_DIR=str(tmp_path / "logs"), CALCULATOR_HISTORY_DIR=str(tmp_path / "history"))
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True).stdout
+    assert output.strip() == "[]"
+
+
+def test_plugin_validators_run_before_the_calculation(plugin_dir):
+    operation = empty_registry(plugin_dir=plugin_dir).create("hypot")
+    with pytest.raises(OperationError, match="b must be positive"):
+        operation.calculate(Decimal("3"), Decimal("-4"))
+
+
+def test_entry_point_plugins_are_registered():
+    entry_point = MagicMock()
+    entry_point.name = "hypot"
+    entry_point.load.return_value = lambda reg: reg.register("double", Addition, name="Double")
+    with patch("app.operation_registry.entry_points", return_value=[entry_point]) as mock_entry_points:
+        fresh = OperationRegistry(plugin_dir=None)
+        assert "double" in fresh
+    mock_entry_points.assert_called_once_with(group="calculator.operations")
+    assert isinstance(fresh.create("double"), Addition)
+
+
+def test_broken_plugin_is_skipped(caplog):
+    entry_point = MagicMock()
+    entry_point.name = "broken"
+    entry_point.load.side_effect = ImportError("missing dependency")
+    with patch("app.operation_registry.entry_points", return_value=[entry_point]):
+        fresh = OperationRegistry(plugin_dir=None)
+        with caplog.at_level("ERROR"):
+            assert list(fresh) == []
+    assert any("broken failed to register" in record.message for record in caplog.records)
+
+
+def test_missing_implementation_raises_operation_error():
+    fresh = empty_registry()
+    fresh.register("ghost", "app.calculation:Ghost")
+    with pytest.raises(OperationError, match="Failed to load operation 'ghost'"):
+        fresh.create("ghost")
+
+
+def test_spec_repr():
+    assert repr(OperationSpec("add", Addition, menu_letter="g")) == "OperationSpec('add', 'app.calculation:Addition', menu_letter='G')"
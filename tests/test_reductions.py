@@ -0,0 +1,172 @@
+import pytest
+from decimal import Decimal, getcontext, localcontext
+from unittest.mock import patch
+from app.reductions import (
+    Sum, Product, Mean, Minimum, Maximum, StandardDeviation, FoldReduction,
+    create_reduction, split_operands
+)
+from app.operation_registry import OperationRegistry
+from app.calculation import Addition
+from app.calculator import Calculator
+from app.exceptions import ValidationError, OperationError, CommandError
+
+
+# -------------------------------
+# Reductions
+# -------------------------------
+@pytest.mark.parametrize("reduction, operands, expected", [
+    (Sum, ["1", "2.5", "3"], Decimal("6.5000")),
+    (Product, ["2", "3", "-4"], Decimal("-24.0000")),
+    (Mean, ["1", "2", "4"], Decimal("2.3333")),
+    (Minimum, ["3", "-1.5", "2"], Decimal("-1.5000")),
+    (Maximum, ["3", "-1.5", "2"], Decimal("3.0000")),
+    (StandardDeviation, ["2", "4", "4", "4", "5", "5", "7", "9"], Decimal("2.1381")),
+])
+def test_reductions(reduction, operands, expected):
+    result, count = reduction().reduce(operands)
+    assert result == expected
+    assert str(result) == str(expected)
+    assert count == len(operands)
+
+
+def test_operands_are_rounded_like_binary_calculations():
+    # 0.00004 rounds to 0.0000 before it is added, as in Addition
+    assert Sum().reduce(["0.00004"] * 3)[0] == Decimal("0.0000")
+    assert Sum().reduce(["0.00005"] * 3)[0] == Decimal("0.0003")
+
+
+def test_reduction_consumes_a_generator_in_one_pass():
+    consumed = []
+
+    def stream():
+        for n in range(10000):
+            consumed.append(n)
+            yield n % 1000
+
+    result, count = Mean().reduce(stream())
+    assert result == Decimal("499.5000")
+    assert count == 10000 and len(consumed) == 10000
+
+
+def test_stddev_has_no_cancellation_error():
+    # naive floating point variance of these loses every significant digit
+    operands = ["999.9991", "999.9992", "999.9993"]
+    assert StandardDeviation().reduce(operands)[0] == Decimal("0.0001")
+
+
+def test_long_product_keeps_its_decimals():
+    result, _ = Product().reduce(["999.9999"] * 20)
+    with localcontext() as context:
+        context.prec = 200
+        exact = (Decimal("999.9999") ** 20).quantize(Decimal("1.0000"))
+    assert result == exact
+
+
+def test_product_precision_follows_the_operands():
+    precisions = []
+
+    class Recorded(Decimal):
+        def __rmul__(self, other):
+            precisions.append(getcontext().prec)
+            return Decimal.__rmul__(self, other)
+
+    assert Product().runReduction(Recorded(x) for x in ["1.5000", "2.5000", "-4.0000"])[0] == Decimal("-15")
+    # a few digits each, nowhere near the digit budget
+    assert max(precisions) < 100
+
+    # exact until the ceiling, then held there
+    precisions.clear()
+    with patch("app.reductions.CALCULATOR_MAX_RESULT_DIGITS", 200):
+        result, _ = Product().runReduction(Recorded("999.9999") for _ in range(60))
+    assert precisions[-1] == 200 + 4 + 10
+    assert result.adjusted() + 1 == 180
+
+
+def test_step_precision_is_exact_for_sums_and_products():
+    floor, ceiling = 10, 100
+    with patch("app.reductions.CALCULATOR_MAX_RESULT_DIGITS", ceiling - 4 - 10):
+        step = Sum()._step_precision
+        assert step(floor, Decimal("123456789.1234"), 13, Decimal("987654321.9876")) == 26
+        assert step(floor, Decimal("1E+30"), 1, Decimal("0.0001")) == 36
+        assert step(floor, Decimal("1.0000"), 5, Decimal("2.0000")) == floor
+        assert step(floor, Decimal("1" * 60), 60, Decimal("1" * 60 + ".0000")) == ceiling
+
+
+def test_product_over_digit_budget_is_rejected():
+    with patch("app.reductions.CALCULATOR_MAX_RESULT_DIGITS", 10):
+        with pytest.raises(ValidationError):
+            Product().reduce(["1000"] * 10)
+
+
+@pytest.mark.parametrize("reduction, operands", [
+    (Sum, []), (Minimum, []), (StandardDeviation, ["1"]),
+])
+def test_not_enough_operands(reduction, operands):
+    with pytest.raises(ValidationError):
+        reduction().reduce(operands)
+
+
+def test_invalid_operands_are_rejected():
+    with pytest.raises(ValidationError):
+        Sum().reduce(["1", "abc"])
+    with pytest.raises(ValidationError):
+        Sum().reduce(["1", "1001"])
+
+
+def test_unexpected_error_becomes_operation_error():
+    with patch.object(Sum, "runReduction", side_effect=RuntimeError("boom")):
+        with pytest.raises(OperationError):
+            Sum().reduce(["1"])
+
+
+# -------------------------------
+# Batch-capable operations
+# -------------------------------
+def test_fold_of_batch_capable_operation():
+    reduction = create_reduction("add")
+    assert isinstance(reduction, FoldReduction) and reduction.name == "Addition"
+    # the running result may exceed CALCULATOR_MAX_INPUT_VALUE
+    assert reduction.reduce(["600", "600", "600"]) == (Decimal("1800.0000"), 3)
+
+
+def test_fold_runs_operation_validators():
+    def positive_b(a, b):
+        if b <= 0:
+            raise ValidationError("b must be positive")
+
+    fresh = OperationRegistry(plugin_dir=None, entry_point_group="calculator.tests.none")
+    fresh.register("plus", Addition, validators=[positive_b], batch_capable=True)
+    with pytest.raises(ValidationError):
+        FoldReduction(fresh.get("plus")).reduce(["1", "2", "-3"])
+
+
+def test_create_reduction_rejects_unknown_and_binary_only_operations():
+    assert isinstance(create_reduction(" MEAN "), Mean)
+    with pytest.raises(CommandError):
+        create_reduction("median")
+    with pytest.raises(CommandError):
+        create_reduction("subtract")
+
+
+def test_split_operands():
+    assert list(split_operands(["1, 2 3", "", "  4\t5,"])) == ["1", "2", "3", "4", "5"]
+
+
+# -------------------------------
+# Calculator: one history entry per reduction
+# -------------------------------
+def test_calculator_records_one_entry_per_reduction():
+    calc = Calculator(observers=[])
+    result, count, entry = calc.reduce("sum", (str(n) for n in range(1, 101)))
+    assert (result, count) == (Decimal("5050.0000"), 100)
+    assert calc.history_snapshot() == [entry]
+    assert entry.split(",")[1:5] == ["Sum", "n=100", "", "5050.0000"]
+
+    # undone as one step
+    calc.undo()
+    assert calc.history_snapshot() == []
+
+
+def test_calculator_unknown_reduction():
+    with pytest.raises(OperationError):
+        Calculator(observers=[]).reduce("median", ["1"])
@@ -0,0 +1,197 @@
+import itertools
+import multiprocessing
+import sqlite3
+import pytest
+from decimal import Decimal
+from unittest.mock import patch
+from app import result_cache
+from app.result_cache import ResultCache, shared_cache
+from app.calculation import Addition, Power, Root, Exp
+from app.config import CALCULATOR_PRECISION
+
+
+def key(a, operation="app.calculation.Power", b="2.0000"):
+    return (operation, str(a), b, 4, "ROUND_HALF_UP/ROUND_HALF_EVEN")
+
+
+@pytest.fixture(autouse=True)
+def log_dir(tmp_path, monkeypatch):
+    # the processes spawned below read the environment: keep their logs out of the committed logs/
+    monkeypatch.setenv("CALCULATOR_LOG_DIR", str(tmp_path / "logs"))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"), min_seconds=0)
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def enabled(cache):
+    with patch.object(result_cache, "CALCULATOR_RESULT_CACHE_ENABLED", True), patch.object(result_cache, "_shared", cache):
+        yield cache
+
+
+# -------------------------------
+# Lookups and stores
+# -------------------------------
+def test_put_and_get(cache):
+    assert cache.get(key(3)) is None
+    assert cache.put(key(3), Decimal("9.0000"))
+    assert cache.get(key(3)) == Decimal("9.0000")
+    # every part of the key counts
+    assert cache.get(key(3, b="3.0000")) is None
+    assert cache.get(key(3)[:3] + (5, key(3)[4])) is None
+    stats = cache.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"], stats["stores"]) == (1, 1, 3, 1)
+
+
+def test_fast_results_are_not_stored(cache):
+    cache.min_seconds = 0.01
+    assert not cache.put(key(3), Decimal("9.0000"), seconds=0.001)
+    assert cache.put(key(4), Decimal("16.0000"), seconds=0.02)
+    assert cache.stats()["entries"] == 1
+
+
+def test_cache_survives_restart(cache):
+    cache.put(key(3), Decimal("9.0000"))
+    cache.close()
+    reopened = ResultCache(cache.path)
+    assert reopened.get(key(3)) == Decimal("9.0000")
+    reopened.close()
+
+
+def test_schema_change_empties_cache(cache):
+    cache.put(key(3), Decimal("9.0000"))
+    cache.close()
+    with patch.object(result_cache, "SCHEMA_VERSION", result_cache.SCHEMA_VERSION + 1):
+        reopened = ResultCache(cache.path)
+        assert reopened.get(key(3)) is None
+        reopened.close()
+
+
+def test_clear(cache):
+    cache.put(key(3), Decimal("9.0000"))
+    assert cache.clear()
+    assert cache.stats()["entries"] == 0
+    with patch.object(cache, "_connection", side_effect=sqlite3.OperationalError("database is locked")):
+        assert not cache.clear()
+    assert cache.disabled
+
+
+def test_broken_file_disables_cache(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    path.write_bytes(b"not a database" * 100)
+    cache = ResultCache(str(path), min_seconds=0)
+    assert cache.get(key(3)) is None
+    assert cache.disabled
+    assert not cache.put(key(3), Decimal("9.0000"))
+
+
+# -------------------------------
+# Eviction
+# -------------------------------
+def test_evicts_least_recently_used_entries(cache):
+    cache.max_entries = 10
+    clock = itertools.count(1000, 100)
+    with patch.object(result_cache, "EVICT_EVERY", 1), patch("app.result_cache.time.time", side_effect=lambda: next(clock)):
+        for i in range(10):
+            cache.put(key(i), Decimal(i * i))
+        # a hit makes the oldest entry the most recently used
+        assert cache.get(key(0)) == Decimal(0)
+        cache.put(key(10), Decimal(100))
+
+    # down to 90% of the limit: 1, 2 (the least recently used) are gone, 0 survives
+    assert cache.stats()["entries"] == 9
+    assert cache.get(key(0)) == Decimal(0)
+    assert cache.get(key(1)) is None and cache.get(key(2)) is None
+    assert cache.get(key(10)) == Decimal(100)
+
+
+def test_evicts_by_size(cache):
+    cache.max_bytes = 2000
+    with patch.object(result_cache, "EVICT_EVERY", 1):
+        for i in range(20):
+            cache.put(key(i), Decimal("1" * 200))
+    assert cache.stats()["bytes"] <= 2000
+
+
+def test_lowered_limits_apply_on_open(cache):
+    for i in range(20):
+        cache.put(key(i), Decimal(i))
+    cache.close()
+    reopened = ResultCache(cache.path, max_entries=5)
+    assert reopened.stats()["entries"] <= 5
+    reopened.close()
+
+
+# -------------------------------
+# Several processes
+# -------------------------------
+def _fill(path, start):
+    cache = ResultCache(path, min_seconds=0)
+    for i in range(start, start + 50):
+        cache.put(key(i), Decimal(i))
+        cache.get(key(i - start))
+    cache.close()
+
+
+def test_processes_share_one_file(cache):
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_fill, args=(cache.path, start)) for start in (0, 50, 100)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+    assert [process.exitcode for process in processes] == [0, 0, 0]
+    assert cache.stats()["entries"] == 150
+    assert cache.get(key(120)) == Decimal(120)
+
+
+# -------------------------------
+# Calculations
+# -------------------------------
+def test_disabled_by_default():
+    with patch.object(result_cache, "CALCULATOR_RESULT_CACHE_ENABLED", False):
+        assert shared_cache() is None
+
+
+def test_calculate_uses_cache(enabled):
+    first = Power().calculate(Decimal("1.5"), Decimal("2.5"))
+    assert enabled.stats()["stores"] == 1
+
+    with patch.object(Power, "runOperation", side_effect=AssertionError("computed again")):
+        assert Power().calculate(Decimal("1.5"), Decimal("2.5")) == first
+    assert enabled.hits == 1
+
+
+@pytest.mark.parametrize("operation, a, b", [(Root(), "27", "3"), (Exp(), "2", None)])
+def test_costly_operations_are_cached(enabled, operation, a, b):
+    b = None if b is None else Decimal(b)
+    result = operation.calculate(Decimal(a), b)
+    assert operation.calculate(Decimal(a), b) == result
+    assert (enabled.stores, enabled.hits) == (1, 1)
+
+
+def test_cheap_operations_and_bulk_evaluation_skip_cache(enabled):
+    Addition().calculate(Decimal(1), Decimal(2))
+    Power().evaluate(Decimal(2), Decimal(3))
+    assert enabled.stats()["entries"] == 0 and enabled.misses == 0
+
+
+def test_cache_key():
+    assert Power().cache_key(Decimal("2.0000"), Decimal("3.0000")) == (
+        "app.calculation.Power", "2.0000", "3.0000", CALCULATOR_PRECISION, "ROUND_HALF_UP/ROUND_HALF_EVEN")
+
+
+def test_cache_errors_do_not_fail_calculations(enabled):
+    with patch.object(enabled, "_connection", side_effect=sqlite3.OperationalError("database is locked")):
+        assert Power().calculate(Decimal(2), Decimal("0.5")) == Decimal("1.4142")
+    assert enabled.disabled
+
+
+def test_memory_report_lists_open_cache(enabled):
+    from app.diagnostics import cache_report
+    enabled.put(key(3), Decimal(9))
+    assert cache_report()["result_cache"] == {"entries": 1, "bytes": None}
@@ -0,0 +1,51 @@
+import pytest
+from app.ring_buffer import RingBuffer
+
+
+def test_append_evicts_oldest_beyond_maxlen():
+    buffer = RingBuffer(maxlen=3)
+    evicted = buffer.extend([1, 2, 3, 4, 5])
+    assert evicted == [1, 2]
+    assert buffer == [3, 4, 5]
+    assert buffer.evicted == 2
+
+
+def test_weight_budget_keeps_newest_item():
+    buffer = RingBuffer(max_weight=10, weight=len)
+    buffer.extend(["aaaa", "bbbb"])
+    assert buffer.append("cccc") == ["aaaa"]
+    assert buffer.total_weight == 8
+
+    # an item over the whole budget is still kept on its own
+    buffer.append("x" * 20)
+    assert buffer == ["x" * 20]
+    assert buffer.total_weight == 20
+
+
+def test_pop_and_clear_update_weight():
+    buffer = RingBuffer(["ab", "cde"], weight=len)
+    assert buffer.pop() == "cde"
+    assert buffer.total_weight == 2
+    assert buffer.popleft() == "ab"
+    assert not buffer
+    buffer.extend(["a", "b"])
+    buffer.clear()
+    assert buffer == [] and buffer.total_weight == 0
+
+
+def test_indexing_and_slicing():
+    buffer = RingBuffer(range(6), maxlen=5)
+    assert buffer[0] == 1
+    assert buffer[-1] == 5
+    assert buffer[1:3] == [2, 3]
+    assert buffer[-2:] == [4, 5]
+    assert buffer[::-2] == [5, 3, 1]
+    with pytest.raises(IndexError):
+        buffer[5]
+
+
+def test_equality_and_repr():
+    assert RingBuffer([1, 2]) == RingBuffer([1, 2], maxlen=5)
+    assert RingBuffer([1, 2]) != [2, 1]
+    assert RingBuffer([1]) != (1,)
+    assert "maxlen=2" in repr(RingBuffer(maxlen=2))
@@ -0,0 +1,494 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+from app.server import (
+    CalculatorServer, CalculatorSession,
+    PARSE_ERROR, INVALID_REQUEST, METHOD_NOT_FOUND, INVALID_PARAMS, ERROR_CODES
+)
+from app.session_manager import SessionManager
+from app import vector_mode
+from app.exceptions import ValidationError, OperationError, CommandError, HistoryError
+
+
+# -------------------------------
+# Fixture: session manager without file observers
+# -------------------------------
+@pytest.fixture(autouse=True)
+def manager(tmp_path):
+    global _manager
+    _manager = SessionManager(spill_dir=str(tmp_path / "sessions"), pipeline=MagicMock())
+    yield _manager
+
+
+# -------------------------------
+# Helpers
+# -------------------------------
+async def start_server(**kwargs):
+    server = CalculatorServer(workers=2, session_manager=_manager, **kwargs)
+    await server.start(host="127.0.0.1", port=0)
+    return server
+
+
+async def exchange(port, requests):
+    # send all requests at once (pipelined), then read one line per expected answer
+    reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=2**20)
+    payload = "".join((r if isinstance(r, str) else json.dumps(r)) + "\n" for r in requests)
+    writer.write(payload.encode())
+    await writer.drain()
+
+    expected = sum(1 for r in requests if not isinstance(r, dict) or "id" in r)
+    responses = [json.loads(await reader.readline()) for _ in range(expected)]
+    writer.close()
+    await writer.wait_closed()
+    return responses
+
+
+def rpc(request_id, method, params=None):
+    request = {"jsonrpc": "2.0", "id": request_id, "method": method}
+    if params is not None:
+        request["params"] = params
+    return request
+
+
+# -------------------------------
+# Calculation, history, undo / redo
+# -------------------------------
+def test_pipelined_calculations_answered_in_order():
+    async def scenario():
+        server = await start_server()
+        try:
+            return await exchange(server.port, [
+                rpc(1, "calculate", {"operation": "add", "a": "2", "b": "3"}),
+                rpc(2, "calculate", ["power", 2, 10]),
+                rpc(3, "calculate", {"operation": "J", "a": "3", "b": "2"}),
+                rpc(4, "history"),
+            ])
+        finally:
+            await server.close()
+
+    responses = asyncio.run(scenario())
+    assert [r["id"] for r in responses] == [1, 2, 3, 4]
+    assert responses[0]["result"]["result"] == "5.0000"
+    assert responses[1]["result"]["result"] == "1024.0000"
+    assert responses[2]["result"]["result"] == "9.0000"
+    assert len(responses[3]["result"]["history"]) == 3
+    assert responses[3]["result"]["history"][0] == responses[0]["result"]["entry"]
+
+
+def test_unary_calculation_needs_no_b():
+    async def scenario():
+        server = await start_server()
+        try:
+            return await exchange(server.port, [
+                rpc(1, "calculate", {"operation": "exp", "a": "2"}),
+                rpc(2, "calculate", ["SIN", 2]),
+                rpc(3, "calculate", ["add", 2]),
+            ])
+        finally:
+            await server.close()
+
+    responses = asyncio.run(scenario())
+    assert responses[0]["result"]["result"] == "7.3891"
+    assert responses[0]["result"]["entry"].split(",")[1:5] == ["Exp", "2", "", "7.3891"]
+    assert responses[1]["result"]["result"] == "0.9093"
+    assert responses[2]["error"]["code"] == INVALID_PARAMS
+
+
+def test_history_pages_and_filters():
+    async def scenario():
+        server = await start_server()
+        try:
+            return await exchange(server.port, [
+                rpc(1, "calculate", ["add", 1, 1]),
+                rpc(2, "calculate", ["power", 2, 3]),
+                rpc(3, "calculate", ["add", 2, 2]),
+                rpc(4, "history", {"reverse": True, "limit": 2}),
+                rpc(5, "history", {"operation": "Addition", "offset": 1}),
+                rpc(6, "history", {"limit": -1}),
+                rpc(7, "history", {"sort": "asc"}),
+            ])
+        finally:
+            await server.close()
+
+    responses = asyncio.run(scenario())
+    entries = [r["result"]["entry"] for r in responses[:3]]
+    assert responses[3]["result"]["history"] == [entries[2], entries[1]]
+    assert responses[4]["result"]["history"] == [entries[2]]
+    assert responses[5]["error"]["code"] == INVALID_PARAMS
+    assert responses[6]["error"]["code"] == INVALID_PARAMS
+
+
+def test_undo_redo_over_rpc():
+    async def scenario():
+        server = await start_server()
+        try:
+            return await exchange(server.port, [
+                rpc(1, "calculate", {"operation": "add", "a": "1", "b": "1"}),
+                rpc(2, "calculate", {"operation": "multiplication", "a": "3", "b": "4"}),
+                rpc(3, "undo"),
+                rpc(4, "history"),
+                rpc(5, "redo"),
+                rpc(6, "history"),
+            ])
+        finally:
+            await server.close()
+
+    responses = asyncio.run(scenario())
+    first, second = responses[0]["result"]["entry"], responses[1]["result"]["entry"]
+    assert responses[2]["result"]["undone"] == second
+    assert responses[3]["result"]["history"] == [first]
+    assert responses[4]["result"]["redone"] == second
+    assert responses[5]["result"]["history"] == [first, second]
+
+
+def test_nothing_to_undo_or_redo_is_a_history_error(capsys):
+    async def scenario():
+        server = await start_server()
+        try:
+            return await exchange(server.port, [rpc(1, "undo"), rpc(2, "redo")])
+        finally:
+            await server.close()
+
+    responses = asyncio.run(scenario())
+    assert [r["error"]["code"] for r in responses] == [ERROR_CODES[HistoryError]] * 2
+    assert "No operation to undo" in responses[0]["error"]["message"]
+    assert "No operation to redo" in responses[1]["error"]["message"]
+    # nothing printed on the server's console
+    assert capsys.readouterr().out == ""
+
+
+def test_history_waiting_for_a_busy_calculator_does_not_block_other_connections():
+    async def scenario():
+        server = await start_server()
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        try:
+            writer.write((json.dumps(rpc(1, "session")) + "\n").encode())
+            await reader.readline()
+            calculator = next(iter(server.sessions.values())).calculator
+
+            # a calculation of this session in progress holds the calculator's lock
+            locked, release = threading.Event(), threading.Event()
+            def hold_lock():
+                with calculator._lock:
+                    locked.set()
+                    release.wait(5)
+            holder = threading.Thread(target=hold_lock)
+            holder.start()
+            locked.wait()
+
+            writer.write((json.dumps(rpc(2, "history")) + "\n").encode())
+            start = time.perf_counter()
+            other = await exchange(server.port, [rpc(1, "calculate", ["add", 1, 1])])
+            elapsed = time.perf_counter() - start
+            release.set()
+            holder.join()
+            history = json.loads(await reader.readline())
+            return other, elapsed, history
+        finally:
+            writer.close()
+            await server.close()
+
+    other, elapsed, history = asyncio.run(scenario())
+    assert other[0]["result"]["result"] == "2.0000"
+    assert elapsed < 2
+    assert history["result"]["history"] == []
+
+
+def test_failed_responder_releases_session_and_closes_connection(manager):
+    async def failing_dispatch(self, request):
+        raise RuntimeError("responder broke")
+
+    async def scenario():
+        server = await start_server(pipeline_depth=1)
+        try:
+            with patch.object(CalculatorSession, "dispatch", failing_dispatch):
+                reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+                # more requests than the queue holds, and the client keeps the connection open
+                writer.write("".join(json.dumps(rpc(n, "history")) + "\n" for n in range(5)).encode())
+                await writer.drain()
+                closed = await asyncio.wait_for(reader.read(), timeout=5)
+                writer.close()
+                await asyncio.sleep(0.05)
+            return closed, dict(manager._in_use)
+        finally:
+            await server.close()
+
+    closed, in_use = asyncio.run(scenario())
+    assert closed == b""
+    assert list(in_use.values()) == [0]
+
+
+def test_overlong_request_is_answered_with_an_error():
+    async def scenario():
+        server = await start_server(max_request_bytes=1024)
+        try:
+            large = rpc(2, "vector", {"operation": "add", "a": ["1"] * 500, "b": "1"})
+            return await exchange(server.port, [rpc(1, "calculate", ["add", 1, 1]), large])
+        finally:
+            await server.close()
+
+    responses = asyncio.run(scenario())
+    assert responses[0]["result"]["result"] == "2.0000"
+    assert responses[1]["error"]["code"] == INVALID_REQUEST
+    assert "longer than 1024 bytes" in responses[1]["error"]["message"]
+
+
+@pytest.mark.skipif(vector_mode.np is None, reason="numpy is not installed")
+def test_large_request_within_limit():
+    async def scenario():
+        server = await start_server()
+        try:
+            # larger than asyncio's default 64 KiB line limit
+            return await exchange(server.port, [rpc(1, "vector", {"operation": "add", "a": ["1.5"] * 10000, "b": "1"})])
+        finally:
+            await server.close()
+
+    response = asyncio.run(scenario())[0]
+    assert response["result"]["result"] == ["2.5000"] * 10000
+
+
+def test_close_cancels_open_connections():
+    async def scenario():
+        server = await start_server()
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        writer.write((json.dumps(rpc(1, "session")) + "\n").encode())
+        await reader.readline()
+        connections = set(server._connections)
+        await server.close(grace_period=0.01)
+        writer.close()
+        return connections
+
+    connections = asyncio.run(scenario())
+    assert len(connections) == 1
+    assert all(task.cancelled() for task in connections)
+
+
+def test_each_connection_has_its_own_session():
+    async def scenario():
+        server = await start_server()
+        try:
+            first, second = await asyncio.gather(
+                exchange(server.port, [rpc(1, "session"), rpc(2, "calculate", ["add", 1, 1]), rpc(3, "history")]),
+                exchange(server.port, [rpc(1, "session"), rpc(2, "history")]),
+            )
+            return first, second, server.sessions
+        finally:
+            await server.close()
+
+    first, second, sessions = asyncio.run(scenario())
+    assert first[0]["result"]["instance_id"] != second[0]["result"]["instance_id"]
+    assert first[1]["result"]["entry"].endswith(first[0]["result"]["instance_id"])
+    assert len(first[2]["result"]["history"]) == 1
+    assert second[1]["result"]["history"] == []
+    # connections are forgotten once closed, their sessions stay in the manager
+    assert sessions == {}
+
+
+def test_session_can_be_resumed_after_reconnect(manager):
+    async def scenario():
+        server = await start_server()
+        try:
+            first = await exchange(server.port, [rpc(1, "session"), rpc(2, "calculate", ["add", 2, 2])])
+            instance_id = first[0]["result"]["instance_id"]
+            # park the session on disk, then resume it from a new connection
+            manager.evict(instance_id)
+            second = await exchange(server.port, [
+                rpc(1, "session", {"instance_id": instance_id}),
+                rpc(2, "history"),
+                rpc(3, "session", {"instance_id": "does-not-exist"}),
+            ])
+            return first, second
+        finally:
+            await server.close()
+
+    first, second = asyncio.run(scenario())
+    assert second[0]["result"]["instance_id"] == first[0]["result"]["instance_id"]
+    assert second[1]["result"]["history"] == [first[1]["result"]["entry"]]
+    assert second[2]["error"]["code"] == ERROR_CODES[HistoryError]
+
+
+def test_idle_sessions_are_spilled_without_traffic(manager):
+    manager.idle_timeout = 0.05
+
+    async def scenario():
+        server = await start_server(sweep_interval=0.05)
+        try:
+            first = await exchange(server.port, [rpc(1, "session")])
+            instance_id = first[0]["result"]["instance_id"]
+            # no request reaches the manager meanwhile: only the sweep can spill the session
+            for _ in range(100):
+                if instance_id not in manager:
+                    break
+                await asyncio.sleep(0.02)
+            return instance_id
+        finally:
+            await server.close()
+
+    instance_id = asyncio.run(scenario())
+    assert instance_id not in manager
+    assert os.path.exists(manager._spill_path(instance_id))
+
+
+def test_sweep_can_be_turned_off(manager):
+    async def scenario():
+        server = await start_server(sweep_interval=0)
+        try:
+            return server._sweeper
+        finally:
+            await server.close()
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_many_concurrent_clients():
+    async def scenario():
+        server = await start_server()
+        try:
+            return await asyncio.gather(*[
+                exchange(server.port, [rpc(i, "calculate", ["add", i, 1])]) for i in range(200)
+            ])
+        finally:
+            await server.close()
+
+    results = asyncio.run(scenario())
+    assert [r[0]["result"]["result"] for r in results] == [f"{i + 1}.0000" for i in range(200)]
+
+
+def test_reduce_over_rpc():
+    async def scenario():
+        server = await start_server()
+        try:
+            return await exchange(server.port, [
+                rpc(1, "reduce", {"operation": "mean", "operands": ["1", "2", 4]}),
+                rpc(2, "reduce", {"operation": "stddev", "operands": ["1"]}),
+                rpc(3, "reduce", {"operation": "median", "operands": ["1"]}),
+                rpc(4, "reduce", {"operation": "sum"}),
+                rpc(5, "history"),
+            ])
+        finally:
+            await server.close()
+
+    responses = asyncio.run(scenario())
+    assert responses[0]["result"]["result"] == "2.3333"
+    assert responses[0]["result"]["count"] == 3
+    assert responses[1]["error"]["code"] == ERROR_CODES[ValidationError]
+    assert responses[2]["error"]["code"] == ERROR_CODES[OperationError]
+    assert responses[3]["error"]["code"] == INVALID_PARAMS
+    assert responses[4]["result"]["history"] == [responses[0]["result"]["entry"]]
+
+
+@pytest.mark.skipif(vector_mode.np is None, reason="numpy is not installed")
+def test_vector_over_rpc():
+    async def scenario():
+        server = await start_server()
+        try:
+            return await exchange(server.port, [
+                rpc(1, "vector", {"operation": "add", "a": [[1, 2], [3, 4]], "b": "10"}),
+                rpc(2, "vector", {"operation": "sum", "a": "1 2; 3 4", "axis": 0}),
+                rpc(3, "vector", {"operation": "matmul", "a": [1, 2], "b": [1, 2, 3]}),
+                rpc(4, "vector", {"operation": "add"}),
+            ])
+        finally:
+            await server.close()
+
+    responses = asyncio.run(scenario())
+    assert responses[0]["result"]["result"] == [["11.0000", "12.0000"], ["13.0000", "14.0000"]]
+    assert responses[1]["result"]["result"] == ["4.0000", "6.0000"]
+    assert responses[2]["error"]["code"] == ERROR_CODES[ValidationError]
+    assert responses[3]["error"]["code"] == INVALID_PARAMS
+
+
+def test_sweep_over_rpc(tmp_path):
+    async def scenario():
+        server = await start_server()
+        try:
+            return await exchange(server.port, [
+                rpc(1, "sweep", {"operation": "power", "a": "1:10", "b": 2}),
+                rpc(2, "sweep", {"operation": "power", "a": "1:10:0"}),
+            ])
+        finally:
+            await server.close()
+
+    with patch("app.sweep.CALCULATOR_HISTORY_DIR", str(tmp_path)):
+        responses = asyncio.run(scenario())
+    result = responses[0]["result"]
+    assert (result["rows"], result["errors"]) == (10, 0)
+    assert result["path"].startswith(str(tmp_path)) and "PowerSweep" in result["entry"]
+    assert responses[1]["error"]["code"] == INVALID_PARAMS
+
+
+# -------------------------------
+# Errors
+# -------------------------------
+def test_protocol_and_calculator_errors():
+    async def scenario():
+        server = await start_server()
+        try:
+            return await exchange(server.port, [
+                "{not json",
+                {"id": 1, "method": "history"},
+                rpc(2, "missing"),
+                rpc(3, "calculate", {"operation": "add"}),
+                rpc(4, "calculate", ["div", 1, 0]),
+                rpc(5, "calculate", ["add", "abc", 1]),
+                rpc(6, "calculate", ["undo", 1, 1]),
+                {"jsonrpc": "2.0", "method": "calculate", "params": ["add", 1, 1]},
+                rpc(7, "history"),
+            ])
+        finally:
+            await server.close()
+
+    responses = asyncio.run(scenario())
+    codes = [r.get("error", {}).get("code") for r in responses]
+    assert codes == [
+        PARSE_ERROR, INVALID_REQUEST, METHOD_NOT_FOUND, INVALID_PARAMS,
+        ERROR_CODES[OperationError],
+        ERROR_CODES[ValidationError], ERROR_CODES[CommandError], None,
+    ]
+    # the notification was executed but not answered
+    assert len(responses[-1]["result"]["history"]) == 1
+    assert "plus 'b' for operations of two operands" in responses[3]["error"]["message"]
+
+
+def test_missing_b_names_the_operation():
+    async def scenario():
+        server = await start_server()
+        try:
+            return await exchange(server.port, [rpc(1, "calculate", ["add", 1]), rpc(2, "calculate", ["exp", 1])])
+        finally:
+            await server.close()
+
+    responses = asyncio.run(scenario())
+    assert responses[0]["error"] == {"code": INVALID_PARAMS, "message": "calculate expects 'b': Addition takes two operands"}
+    assert "result" in responses[1]
+
+
+def test_unix_socket_server(tmp_path):
+    async def scenario():
+        path = str(tmp_path / "calc.sock")
+        server = CalculatorServer(workers=1, session_manager=_manager)
+        await server.start(unix_path=path)
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write((json.dumps(rpc(1, "calculate", ["root", 27, 3])) + "\n").encode())
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            writer.close()
+            await writer.wait_closed()
+            return response
+        finally:
+            await server.close()
+
+    assert asyncio.run(scenario())["result"]["result"] == "3.0000"
+
+
+def test_dispatch_internal_error_is_reported():
+    session = CalculatorSession(MagicMock(instance_ID="abc"), executor=None)
+    session.methods["history"] = MagicMock(side_effect=RuntimeError("boom"))
+    response = asyncio.run(session.dispatch(rpc(1, "history")))
+    assert response["error"]["code"] == -32603
+    assert "boom" in response["error"]["message"]
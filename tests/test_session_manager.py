@@ -0,0 +1,109 @@
+import json
+import os
+import pytest
+from unittest.mock import MagicMock
+from app.session_manager import SessionManager
+from app.exceptions import HistoryError, DataFormatError
+
+
+# -------------------------------
+# Fixtures
+# -------------------------------
+@pytest.fixture
+def manager(tmp_path):
+    return SessionManager(max_sessions=3, idle_timeout=60, spill_dir=str(tmp_path), pipeline=MagicMock())
+
+
+def add_ops(calculator, *messages):
+    for message in messages:
+        calculator.add_operation(message)
+
+
+# -------------------------------
+# Session lifecycle
+# -------------------------------
+def test_sessions_share_the_pipeline(manager):
+    first = manager.create()
+    second = manager.create()
+    assert first.instance_ID != second.instance_ID
+    assert first.subject.observers == [manager.pipeline]
+    assert second.subject.observers == [manager.pipeline]
+
+    first.notify_observers("t,Addition,1,1,2.0000," + first.instance_ID)
+    manager.pipeline.update.assert_called_once()
+
+
+def test_acquire_returns_the_same_calculator(manager):
+    calculator = manager.create()
+    assert manager.acquire(calculator.instance_ID) is calculator
+
+
+def test_acquire_unknown_session_raises(manager):
+    with pytest.raises(HistoryError):
+        manager.acquire("missing")
+
+
+# -------------------------------
+# Eviction and restore
+# -------------------------------
+def test_idle_session_is_spilled_and_restored(manager, tmp_path):
+    calculator = manager.create()
+    add_ops(calculator, "a", "b", "c")
+    calculator.undo()
+    instance_id = calculator.instance_ID
+
+    # still in use: never evicted
+    assert manager.evict_idle(now=float("inf")) == 0
+
+    manager.release(instance_id)
+    assert manager.evict_idle(now=float("inf")) == 1
+    assert instance_id not in manager
+    assert os.path.exists(tmp_path / f"{instance_id}.json")
+
+    restored = manager.acquire(instance_id)
+    assert restored is not calculator
+    assert restored.instance_ID == instance_id
+    assert restored.originator.history == ["a", "b"]
+    assert restored.redo() == "c"
+    assert restored.originator.history == ["a", "b", "c"]
+    assert not os.path.exists(tmp_path / f"{instance_id}.json")
+
+
+def test_max_sessions_evicts_least_recently_used(manager):
+    calculators = [manager.create() for _ in range(3)]
+    for calculator in calculators:
+        manager.release(calculator.instance_ID)
+
+    manager.acquire(calculators[0].instance_ID)
+    manager.create()
+
+    # the oldest released session that was not touched again goes to disk first
+    assert calculators[1].instance_ID not in manager
+    assert calculators[0].instance_ID in manager
+    assert len(manager) == 3
+
+
+def test_corrupted_spill_file_raises(manager, tmp_path):
+    (tmp_path / "broken.json").write_text("{not json")
+    with pytest.raises(DataFormatError):
+        manager.acquire("broken")
+
+
+def test_discard_removes_memory_and_disk(manager, tmp_path):
+    calculator = manager.create()
+    manager.release(calculator.instance_ID)
+    manager.evict(calculator.instance_ID)
+    manager.discard(calculator.instance_ID)
+    with pytest.raises(HistoryError):
+        manager.acquire(calculator.instance_ID)
+
+
+def test_close_spills_everything_and_flushes(manager, tmp_path):
+    calculator = manager.create()
+    add_ops(calculator, "x")
+    manager.close()
+
+    with open(tmp_path / f"{calculator.instance_ID}.json") as file:
+        assert json.load(file)["history"] == ["x"]
+    manager.pipeline.close.assert_called_once()
+    assert len(manager) == 0
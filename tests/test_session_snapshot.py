@@ -0,0 +1,109 @@
+import json
+import pytest
+from unittest.mock import patch
+from app.memento import Originator, CareTaker
+from app.session_snapshot import encode_state, decode_state, write_snapshot, read_snapshot, SNAPSHOT_FORMAT
+from app.exceptions import DataFormatError, FileAccessError
+from app.config import CALCULATOR_MAX_HISTORY_SIZE
+
+
+# -------------------------------
+# Helpers
+# -------------------------------
+def entry(n):
+    return f"2025-10-21 10:00:00,Addition,{n},1,{n + 1},abc"
+
+
+def session(additions, undos=0):
+    originator, caretaker = Originator(), CareTaker()
+    for n in range(additions):
+        originator.add_operation(entry(n), caretaker=caretaker)
+    for _ in range(undos):
+        caretaker.undo_memento(originator)
+    return originator, caretaker
+
+
+# -------------------------------
+# Codec tests
+# -------------------------------
+def test_round_trip_keeps_history_and_stacks():
+    originator, caretaker = session(CALCULATOR_MAX_HISTORY_SIZE + 20, undos=7)
+    state = caretaker.export_state(originator)
+    assert decode_state(json.loads(json.dumps(encode_state(state)))) == state
+
+
+def test_round_trip_of_unrelated_states():
+    state = {"history": ["a", "b"], "undo": [[], ["x", "a", "y"], ["b", "b", "a"]], "redo": [["c"]], "instance_id": "id"}
+    encoded = encode_state(state)
+    assert encoded["format"] == SNAPSHOT_FORMAT
+    assert encoded["instance_id"] == "id"
+    assert decode_state(encoded) == state
+
+
+def test_stacks_are_stored_as_small_deltas():
+    originator, caretaker = session(CALCULATOR_MAX_HISTORY_SIZE + 20, undos=3)
+    encoded = encode_state(caretaker.export_state(originator))
+    # every memento differs from its neighbour by about one entry
+    for head, drop, keep, tail in encoded["undo"] + encoded["redo"]:
+        assert len(head) + len(tail) <= 1
+    plain = json.dumps(caretaker.export_state(originator))
+    assert len(json.dumps(encoded)) * 10 < len(plain)
+
+
+def test_decoded_states_share_entries():
+    state = {"history": ["a", "b", "c"], "undo": [["a"], ["a", "b"]], "redo": []}
+    decoded = decode_state(encode_state(state))
+    assert decoded["undo"][0][0] is decoded["history"][0]
+
+
+def test_plain_state_is_decoded_as_is():
+    state = {"history": ["a"], "undo": [[]], "redo": []}
+    assert decode_state(state) is state
+
+
+def test_unknown_format_raises():
+    with pytest.raises(DataFormatError, match="Unsupported"):
+        decode_state({"format": "calculator-session/99"})
+
+
+def test_invalid_snapshot_raises():
+    with pytest.raises(DataFormatError, match="Invalid session snapshot"):
+        decode_state({"format": SNAPSHOT_FORMAT, "history": [], "undo": [[1, 2]], "redo": []})
+
+
+# -------------------------------
+# File tests
+# -------------------------------
+def test_write_and_read_snapshot(tmp_path):
+    originator, caretaker = session(12, undos=4)
+    path = str(tmp_path / "session.json")
+    write_snapshot(path, caretaker.export_state(originator))
+
+    restored_originator, restored_caretaker = Originator(), CareTaker()
+    restored_caretaker.import_state(restored_originator, read_snapshot(path))
+    assert restored_caretaker.export_state(restored_originator) == caretaker.export_state(originator)
+
+    # undo and redo carry on from the restored stacks
+    restored_caretaker.redo_memento(restored_originator)
+    assert restored_originator.history == [entry(n) for n in range(9)]
+
+
+def test_write_failure_keeps_previous_snapshot(tmp_path):
+    path = str(tmp_path / "session.json")
+    write_snapshot(path, {"history": ["a"], "undo": [], "redo": []})
+    with patch("os.replace", side_effect=OSError("disk full")):
+        with pytest.raises(FileAccessError):
+            write_snapshot(path, {"history": ["b"], "undo": [], "redo": []})
+    assert read_snapshot(path)["history"] == ["a"]
+
+
+def test_read_corrupt_snapshot_raises(tmp_path):
+    path = tmp_path / "session.json"
+    path.write_text("{not json")
+    with pytest.raises(DataFormatError):
+        read_snapshot(str(path))
+
+
+def test_read_missing_snapshot_raises(tmp_path):
+    with pytest.raises(FileAccessError):
+        read_snapshot(str(tmp_path / "missing.json"))
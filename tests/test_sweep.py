@@ -0,0 +1,142 @@
+import csv
+import os
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import patch
+from app.sweep import SweepRange, grid, evaluate_chunk, run_sweep, SWEEP_COLUMNS
+from app.calculation import Power
+from app.calculator import Calculator
+from app.exceptions import ValidationError, OperationError, FileAccessError
+
+
+def read_rows(path):
+    with open(path, newline="") as file:
+        return list(csv.reader(file))
+
+
+# -------------------------------
+# SweepRange
+# -------------------------------
+@pytest.mark.parametrize("spec, values, summary", [
+    ("1:3", ["1", "2", "3"], "1:3:1"),
+    ("1:2:0.5", ["1.0", "1.5", "2.0"], "1:2:0.5"),
+    ("3:1:-1", ["3", "2", "1"], "3:1:-1"),
+    ("0:1:0.3", ["0.0", "0.3", "0.6", "0.9"], "0:1:0.3"),
+    ("2, 4 8", ["2", "4", "8"], "list(3)[2 4 8]"),
+    ("1 2 3 4 5", ["1", "2", "3", "4", "5"], "list(5)[1 2 3 .. 5]"),
+    ("7", ["7"], "7"),
+])
+def test_sweep_range(spec, values, summary):
+    sweep_range = SweepRange(spec)
+    assert [str(v) for v in sweep_range] == values
+    assert len(sweep_range) == len(values)
+    # iterable more than once, values generated again
+    assert [str(v) for v in sweep_range] == values
+    assert str(sweep_range) == summary
+
+
+@pytest.mark.parametrize("spec", ["1:10:0", "1:10:-1", "10:1", "1:2:3:4", "", "1:abc", "0:2000", "1:2:x"])
+def test_invalid_sweep_range(spec):
+    with pytest.raises(ValidationError):
+        SweepRange(spec)
+
+
+@pytest.mark.parametrize("spec", ["1:2:1e-40", "0:1:1e-10", "1:-1:-1e-60"])
+def test_sweep_range_with_too_many_points(spec):
+    with pytest.raises(ValidationError) as exc_info:
+        SweepRange(spec)
+    assert "too many points" in str(exc_info.value)
+
+
+def test_grid_and_chunk_evaluation():
+    assert list(grid(SweepRange("1:2"), SweepRange("5 6"))) == [
+        (Decimal(1), Decimal(5)), (Decimal(1), Decimal(6)), (Decimal(2), Decimal(5)), (Decimal(2), Decimal(6))]
+    rows = evaluate_chunk("div", [(Decimal(1), Decimal(4)), (Decimal(1), Decimal(0))])
+    assert rows[0] == [Decimal(1), Decimal(4), Decimal("0.2500"), ""]
+    assert rows[1][2] == "" and "zero" in rows[1][3] and "\x1b" not in rows[1][3]
+
+
+# -------------------------------
+# run_sweep
+# -------------------------------
+def test_run_sweep_streams_rows_in_chunks(tmp_path):
+    path = str(tmp_path / "power.csv")
+    written = []
+    original = evaluate_chunk
+
+    def spy(op_code, pairs, operation=None):
+        written.append(len(pairs))
+        return original(op_code, pairs, operation)
+
+    with patch("app.sweep.evaluate_chunk", side_effect=spy):
+        operation, a_range, b_range, path, rows, errors = run_sweep("power", "1:1000:0.5", "3", path, workers=1, chunk_size=500)
+
+    assert isinstance(operation, Power) and (rows, errors) == (1999, 0)
+    assert written == [500, 500, 500, 499]
+    table = read_rows(path)
+    assert table[0] == SWEEP_COLUMNS
+    assert table[1] == ["1.0", "3", "1.0000", ""]
+    assert table[-1] == ["1000.0", "3", "1000000000.0000", ""]
+    assert not os.path.exists(path + ".tmp")
+
+
+def test_parallel_sweep_matches_sequential(tmp_path):
+    sequential = run_sweep("div", "-5:5", "-2:2", str(tmp_path / "seq.csv"), workers=1, chunk_size=7)
+    parallel = run_sweep("div", "-5:5", "-2:2", str(tmp_path / "par.csv"), workers=2, chunk_size=7)
+    assert sequential[4:] == parallel[4:] == (55, 11)
+    assert read_rows(sequential[3]) == read_rows(parallel[3])
+
+
+def test_sweep_point_limit(tmp_path):
+    with patch("app.sweep.CALCULATOR_SWEEP_MAX_POINTS", 10):
+        with pytest.raises(ValidationError):
+            run_sweep("add", "1:4", "1:3", str(tmp_path / "big.csv"))
+
+
+def test_failed_sweep_leaves_no_file(tmp_path):
+    path = str(tmp_path / "fail.csv")
+    with patch("app.sweep.evaluate_chunk", side_effect=RuntimeError("boom")):
+        with pytest.raises(OperationError):
+            run_sweep("add", "1:3", "1", path)
+    assert os.listdir(tmp_path) == []
+
+
+def test_default_paths_are_unique_within_a_second(tmp_path):
+    fixed = datetime(2025, 10, 21, 10, 0, 0, 123456)
+    with patch("app.sweep.CALCULATOR_HISTORY_DIR", str(tmp_path)), patch("app.sweep.datetime") as mock_datetime:
+        mock_datetime.now.return_value = fixed
+        first = run_sweep("add", "1:3", "1", workers=1)[3]
+        second = run_sweep("add", "1:3", "2", workers=1)[3]
+        with patch("app.sweep.evaluate_chunk", side_effect=RuntimeError("boom")):
+            with pytest.raises(OperationError):
+                run_sweep("add", "1:3", "3", workers=1)
+
+    assert first == str(tmp_path / "sweep_add_20251021_100000_123456.csv")
+    assert second == str(tmp_path / "sweep_add_20251021_100000_123456_1.csv")
+    assert read_rows(first)[1][2] == "2.0000" and read_rows(second)[1][2] == "3.0000"
+    # the failed sweep left neither its table nor its reserved name
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(p) for p in (first, second))
+
+
+def test_unwritable_sweep_path(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("x")
+    with pytest.raises(FileAccessError):
+        run_sweep("add", "1:3", "1", str(blocker / "sweep.csv"))
+
+
+# -------------------------------
+# Calculator: one summarizing history entry
+# -------------------------------
+def test_calculator_sweep_records_one_entry(tmp_path):
+    calc = Calculator(observers=[])
+    path, rows, errors, entry = calc.sweep("root", "0:100:10", "2 3", path=str(tmp_path / "roots.csv"))
+    assert (rows, errors) == (22, 0)
+    assert calc.history_snapshot() == [entry]
+    assert entry.split(",")[1:5] == ["RootSweep", "0:100:10", "list(2)[2 3]", "22 rows (0 errors) in roots.csv"]
+
+
+def test_calculator_sweep_unknown_operation(tmp_path):
+    with pytest.raises(OperationError):
+        Calculator(observers=[]).sweep("median", "1:3", "1", path=str(tmp_path / "x.csv"))
@@ -0,0 +1,139 @@
+import pytest
+from decimal import Decimal
+from unittest.mock import patch
+from app import vector_mode
+from app.vector_mode import parse_array, summarize, elementwise, matmul, reduce_array, run, format_array, to_list
+from app.calculation import Addition, Division
+from app.reductions import Sum, StandardDeviation
+from app.calculator import Calculator
+from app.exceptions import ValidationError, OperationError
+
+# numpy is optional: without it only the error of vector mode itself can be tested
+np = vector_mode.np
+requires_numpy = pytest.mark.skipif(np is None, reason="numpy is not installed")
+
+
+# -------------------------------
+# Parsing and summaries
+# -------------------------------
+@requires_numpy
+def test_parse_array_shapes():
+    assert parse_array("1, 2 3").shape == (3,)
+    assert parse_array("1 2; 3 4").shape == (2, 2)
+    assert parse_array([[1, "2.5"], [3, 4]])[0, 1] == Decimal("2.5")
+    assert parse_array("5") == Decimal("5")
+
+
+@requires_numpy
+@pytest.mark.parametrize("value", ["1 2; 3", [[1, 2], [3]], "1 abc", "2000 1", " ; "])
+def test_parse_array_rejects_invalid_input(value):
+    with pytest.raises(ValidationError):
+        parse_array(value)
+
+
+@requires_numpy
+def test_parse_array_size_limit():
+    with patch("app.vector_mode.CALCULATOR_VECTOR_MAX_ELEMENTS", 3):
+        with pytest.raises(ValidationError):
+            parse_array("1 2 3 4")
+
+
+@requires_numpy
+def test_summarize_is_compact_and_comma_free():
+    assert summarize(parse_array("1 2")) == "vector(2)[1 2]"
+    assert summarize(parse_array(list(range(1000)))) == "vector(1000)[0 1 2 .. 999]"
+    assert summarize(parse_array("1 2 3; 4 5 6")) == "matrix(2x3)[1 2 3 .. 6]"
+    assert summarize(Decimal("2.5")) == "2.5"
+
+
+# -------------------------------
+# Element-wise, matmul, reductions
+# -------------------------------
+@requires_numpy
+def test_elementwise_matches_scalar_calculations_with_broadcasting():
+    a, b = parse_array("1 2; 3 4"), parse_array("3 7")
+    result = elementwise(Division(), a, b)
+    assert result.shape == (2, 2)
+    for (i, j), value in np.ndenumerate(result):
+        assert value == Division().calculate(a[i, j], b[j])
+    assert str(result[0, 0]) == "0.3333"
+
+
+@requires_numpy
+def test_elementwise_errors():
+    with pytest.raises(ValidationError):
+        elementwise(Addition(), parse_array("1 2 3"), parse_array("1 2"))
+    with pytest.raises(OperationError):
+        elementwise(Division(), parse_array("1 2"), parse_array("1 0"))
+
+
+@requires_numpy
+def test_matmul_and_dot_product():
+    result = matmul(parse_array("1 2; 3 4"), parse_array("0.5 0; 0 0.25"))
+    assert to_list(result) == [["0.5000", "0.5000"], ["1.5000", "1.0000"]]
+    assert matmul(parse_array("1 2 3"), parse_array("4 5 6")) == Decimal("32.0000")
+    with pytest.raises(ValidationError):
+        matmul(parse_array("1 2 3"), parse_array("1 2"))
+    with pytest.raises(ValidationError):
+        matmul(parse_array("1 2"), parse_array("3"))
+
+
+@requires_numpy
+def test_matmul_above_default_context_precision():
+    # 40 decimals: operands and results are wider than the default 28 digit context
+    third = "0." + "3" * 40
+    with patch("app.vector_mode.CALCULATOR_PRECISION", 40), patch("app.calculation.CALCULATOR_PRECISION", 40):
+        result = matmul(parse_array(f"{third} 1; 2 {third}"), parse_array("3 0; 0 3"))
+    assert to_list(result) == [["0." + "9" * 40, "3." + "0" * 40], ["6." + "0" * 40, "0." + "9" * 40]]
+
+
+@requires_numpy
+def test_reduce_array_whole_and_along_axis():
+    a = parse_array("1 2; 3 5")
+    assert reduce_array(Sum(), a) == Decimal("11.0000")
+    assert to_list(reduce_array(Sum(), a, axis=0)) == ["4.0000", "7.0000"]
+    assert to_list(reduce_array(StandardDeviation(), a, axis=1)) == ["0.7071", "1.4142"]
+    with pytest.raises(ValidationError):
+        reduce_array(Sum(), a, axis=2)
+
+
+@requires_numpy
+def test_run_dispatch_and_errors():
+    assert run("ADD", "1 2", "1")[0] == "Addition"
+    assert run("mean", "1 2")[0] == "Mean"
+    assert run("matmul", "1 2", "3 4")[0] == "MatrixMultiplication"
+    with pytest.raises(ValidationError):
+        run("add", "1 2")
+
+
+@requires_numpy
+def test_format_array():
+    assert format_array(parse_array("1 2; 3 4")) == "[[1 2]\n [3 4]]"
+    assert format_array(Decimal("1.5000")) == "1.5000"
+
+
+def test_vector_mode_without_numpy():
+    with patch("app.vector_mode.np", None):
+        with pytest.raises(OperationError):
+            run("add", "1 2", "1")
+
+
+# -------------------------------
+# Calculator: one summarized history entry
+# -------------------------------
+@requires_numpy
+def test_calculator_vector_records_one_summary_entry():
+    calc = Calculator(observers=[])
+    result, entry = calc.vector("add", list(range(100)), "1")
+    assert result.shape == (100,)
+    assert calc.history_snapshot() == [entry]
+    assert entry.split(",")[1:5] == ["Addition", "vector(100)[0 1 2 .. 99]", "1", "vector(100)[1.0000 2.0000 3.0000 .. 100.0000]"]
+
+    _, entry = calc.vector("sum", "1 2; 3 4", axis=1)
+    assert entry.split(",")[1:5] == ["Sum", "matrix(2x2)[1 2 3 .. 4]", "axis=1", "vector(2)[3.0000 7.0000]"]
+
+
+@requires_numpy
+def test_calculator_vector_unknown_operation():
+    with pytest.raises(OperationError):
+        Calculator(observers=[]).vector("median_filter", "1 2", "1")
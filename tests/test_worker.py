@@ -0,0 +1,99 @@
+import time
+import pytest
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+from app.worker import WorkerSupervisor, CalculationWorker, UnpicklableOperation
+from app.calculation import Addition, Division, Power
+from app.server import CalculatorSession
+from app.exceptions import OperationError, ValidationError
+
+
+class SlowAddition(Addition):
+    # stands in for a calculation that never finishes; imported by the worker when unpickled
+    def runOperation(self, a, b):
+        time.sleep(30)
+        return a + b
+
+
+@pytest.fixture(scope="module", autouse=True)
+def log_dir(tmp_path_factory):
+    # spawned workers read the environment: keep anything they create out of the committed logs/
+    with patch.dict("os.environ", {"CALCULATOR_LOG_DIR": str(tmp_path_factory.mktemp("logs"))}):
+        yield
+
+
+@pytest.fixture(scope="module")
+def supervisor(log_dir):
+    supervisor = WorkerSupervisor(processes=1, timeout=5)
+    yield supervisor
+    supervisor.close()
+
+
+# -------------------------------
+# Calculations in the worker
+# -------------------------------
+@pytest.mark.parametrize("operation, a, b", [
+    (Addition(), "2", "3"),
+    (Power(), "2", "0.5"),
+    (Division(), "10", "3"),
+])
+def test_worker_result_matches_in_process(supervisor, operation, a, b):
+    assert supervisor.calculate(operation, Decimal(a), Decimal(b)) == operation.calculate(Decimal(a), Decimal(b))
+
+
+def test_worker_errors_keep_their_type(supervisor):
+    with pytest.raises(OperationError):
+        supervisor.calculate(Division(), Decimal(1), Decimal(0))
+    with pytest.raises(ValidationError):
+        supervisor.calculate(Power(), Decimal("0.0001"), Decimal("-5000"))
+
+
+def test_timeout_kills_and_replaces_worker(supervisor):
+    replaced = supervisor.replaced
+    start = time.monotonic()
+    with pytest.raises(OperationError) as exc_info:
+        supervisor.calculate(SlowAddition(), Decimal(1), Decimal(2), timeout=0.5)
+    assert "longer than 0.5 seconds" in str(exc_info.value)
+    assert time.monotonic() - start < 5
+    assert supervisor.replaced == replaced + 1
+    # the replacement takes the next calculation
+    assert supervisor.calculate(Addition(), Decimal(1), Decimal(2)) == Decimal("3.0000")
+
+
+def test_unpicklable_operation_runs_in_process(supervisor):
+    operation = Addition()
+    operation.validators = (lambda a, b: None,)
+    assert supervisor.calculate(operation, Decimal(1), Decimal(2)) == Decimal("3.0000")
+
+
+def test_unpicklable_job_detected_before_sending():
+    worker = CalculationWorker.__new__(CalculationWorker)
+    operation = Addition()
+    operation.validators = (lambda a, b: None,)
+    with pytest.raises(UnpicklableOperation):
+        worker.run(operation, Decimal(1), Decimal(2))
+
+
+def test_closed_supervisor_rejects_calculations():
+    supervisor = WorkerSupervisor(processes=1)
+    supervisor.close()
+    supervisor.close()
+    with pytest.raises(OperationError):
+        supervisor.calculate(Addition(), Decimal(1), Decimal(2))
+
+
+# -------------------------------
+# Server sessions
+# -------------------------------
+def test_server_session_uses_worker():
+    worker = MagicMock()
+    worker.calculate.return_value = Decimal("3.0000")
+    calculator = MagicMock()
+    session = CalculatorSession(calculator, executor=None, worker=worker)
+    operation = Addition()
+
+    result, _ = session._calculate_blocking(operation, Decimal(1), Decimal(2))
+
+    assert result == Decimal("3.0000")
+    worker.calculate.assert_called_once_with(operation, Decimal(1), Decimal(2))
+    calculator.record_calculation.assert_called_once_with(operation, Decimal(1), Decimal(2), Decimal("3.0000"))
@@ -0,0 +1,181 @@
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+from app.write_ahead_log import WriteAheadLog
+from app.calculator import Calculator
+from app.exceptions import DataFormatError, FileAccessError
+
+
+# -------------------------------
+# Fixtures
+# -------------------------------
+@pytest.fixture
+def wal_path(tmp_path):
+    # an absolute file name is kept as is by os.path.join
+    return str(tmp_path / "calculator_wal.jsonl")
+
+
+def make_calculator(wal_path, **kwargs):
+    return Calculator(observers=[MagicMock()], wal=WriteAheadLog(log_file=wal_path, fsync=False, **kwargs))
+
+
+# a crashed process leaves its log behind, and the system releases its lock
+def crash(wal):
+    wal.close(discard=False)
+
+
+# -------------------------------
+# WriteAheadLog tests
+# -------------------------------
+def test_append_and_read_records(wal_path):
+    wal = WriteAheadLog(log_file=wal_path, fsync=False)
+    wal.append("add", entry="a")
+    wal.append("undo")
+    wal.close(discard=False)
+
+    assert WriteAheadLog(log_file=wal_path).read() == [{"op": "add", "entry": "a"}, {"op": "undo"}]
+
+
+def test_append_fsyncs_every_record(wal_path):
+    wal = WriteAheadLog(log_file=wal_path, fsync=True)
+    with patch("os.fsync") as mock_fsync:
+        wal.append("add", entry="a")
+        wal.append("add", entry="b")
+    assert mock_fsync.call_count == 2
+
+
+def test_read_missing_log_is_empty(wal_path):
+    assert WriteAheadLog(log_file=wal_path).read() == []
+
+
+def test_read_drops_torn_tail(wal_path):
+    with open(wal_path, "w") as file:
+        file.write(json.dumps({"op": "add", "entry": "a"}) + "\n")
+        file.write('{"op": "add", "en')
+
+    wal = WriteAheadLog(log_file=wal_path, fsync=False)
+    assert wal.read() == [{"op": "add", "entry": "a"}]
+
+    # the torn record is cut off, so new appends start on a clean line
+    wal.append("undo")
+    crash(wal)
+    assert WriteAheadLog(log_file=wal_path).read() == [{"op": "add", "entry": "a"}, {"op": "undo"}]
+
+
+def test_append_failure_raises_file_access_error(wal_path):
+    wal = WriteAheadLog(log_file=wal_path)
+    with patch("builtins.open", side_effect=OSError("disk full")):
+        with pytest.raises(FileAccessError):
+            wal.append("undo")
+
+
+def test_second_owner_is_refused_until_close(wal_path):
+    wal = WriteAheadLog(log_file=wal_path, fsync=False)
+    wal.append("add", entry="a")
+    with pytest.raises(FileAccessError) as exc_info:
+        WriteAheadLog(log_file=wal_path)
+    assert "in use by another calculator" in str(exc_info.value)
+
+    wal.close()
+    other = WriteAheadLog(log_file=wal_path)
+    assert other.read() == []
+    other.close()
+
+
+def test_close_discards_log(wal_path, tmp_path):
+    wal = WriteAheadLog(log_file=wal_path, fsync=False)
+    wal.append("add", entry="a")
+    wal.close()
+    assert not (tmp_path / "calculator_wal.jsonl").exists()
+
+
+# -------------------------------
+# Calculator recovery tests
+# -------------------------------
+def test_recover_rebuilds_history_and_stacks(wal_path):
+    calc = make_calculator(wal_path)
+    for entry in ("a", "b", "c"):
+        calc.add_operation(entry)
+    calc.undo()
+    calc.undo()
+    calc.redo()
+    calc.add_operation("d")
+    calc.undo_to("1")
+    expected = calc.caretaker.export_state(calc.originator)
+
+    # simulate a crash: no clean close(), the log stays behind
+    crash(calc.wal)
+    recovered = make_calculator(wal_path)
+    assert recovered.recover() == 8
+    assert recovered.caretaker.export_state(recovered.originator) == expected
+
+
+def test_recover_replays_clear_and_load(wal_path):
+    calc = make_calculator(wal_path)
+    calc.add_operation("a")
+    with patch("builtins.input", return_value="Y"), patch.object(calc.caretaker, "delete_saved_history", wraps=calc.caretaker.delete_saved_history) as mock_delete, \
+         patch("os.remove"):
+        calc.delete_history()
+        mock_delete.assert_called_once()
+
+    def fake_load(originator):
+        for entry in ("x", "y"):
+            originator.add_operation(entry, caretaker=calc.caretaker)
+    with patch.object(calc.caretaker, "get_loaded_history", side_effect=fake_load):
+        calc.load_history()
+
+    crash(calc.wal)
+    recovered = make_calculator(wal_path)
+    recovered.recover()
+    assert recovered.originator.history == ["x", "y"]
+    assert len(recovered.caretaker.stack_undo) == 2
+
+
+def test_noop_undo_redo_are_not_journaled(wal_path):
+    calc = make_calculator(wal_path)
+    with patch("builtins.print"):
+        calc.undo()
+        calc.redo()
+    assert calc.wal.records == 0
+
+
+def test_log_is_compacted_into_a_snapshot(wal_path):
+    calc = make_calculator(wal_path, compact_records=5)
+    for n in range(12):
+        calc.add_operation(str(n))
+
+    crash(calc.wal)
+    records = WriteAheadLog(log_file=wal_path).read()
+    assert records[0]["op"] == "snapshot"
+    assert len(records) < 5
+
+    recovered = make_calculator(wal_path)
+    recovered.recover()
+    assert recovered.originator.history == [str(n) for n in range(12)]
+
+
+def test_clean_close_leaves_nothing_to_recover(wal_path):
+    calc = make_calculator(wal_path)
+    calc.add_operation("a")
+    calc.close()
+    assert make_calculator(wal_path).recover() == 0
+
+
+def test_recover_unknown_record_raises(wal_path):
+    with open(wal_path, "w") as file:
+        file.write(json.dumps({"op": "explode"}) + "\n")
+    with pytest.raises(DataFormatError):
+        make_calculator(wal_path).recover()
+
+
+def test_recover_undo_to_after_compaction(wal_path):
+    calc = make_calculator(wal_path, compact_records=4)
+    for n in range(6):
+        calc.add_operation(str(n))
+    calc.undo_to("2")
+    expected = calc.caretaker.export_state(calc.originator)
+
+    crash(calc.wal)
+    recovered = make_calculator(wal_path)
+    recovered.recover()
+    assert recovered.caretaker.export_state(recovered.originator) == expected